@@ -16,16 +16,24 @@ from ayx.export import (
     help,
     read,
     write,
-    # writePlot,
+    writePlot,
+    writePlots,
     readMetadata,
+    readPartitions,
+    query,
+    createIndex,
+    session,
     getIncomingConnectionNames,
     installPackage,
     installPackages,
+    checkRequirements,
     importPythonModule,
     getWorkflowConstant,
     getWorkflowConstants,
     getWorkflowConstantNames,
     setTempFormatAs,
+    enableStats,
+    getStats,
 )
 
 ### the reason for this file is so that the imported modules in ayx.export
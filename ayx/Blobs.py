@@ -0,0 +1,157 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import re
+import numpy
+import pandas as pd
+
+# how Blob and SpatialObj columns are returned when read (see Datafile.getData)
+blob_modes = ["bytes", "memoryview"]
+
+# a Blob or SpatialObj column type (yxdb, or sqlite -- eg, "Blob" or
+# "AlteryxSpatialObjectBlob")
+blob_type_regex = re.compile(r"^(blob|spatialobj|alteryxspatialobjectblob)\b", re.I)
+
+
+def checkBlobs(blobs):
+    if blobs not in blob_modes:
+        raise ValueError(
+            "blobs must be one of {} (not {})".format(blob_modes, repr(blobs))
+        )
+    return blobs
+
+
+# is a column type (eg, from Datafile.getMetadata) a Blob or a SpatialObj?
+def isBlobType(type_name):
+    # (yxdb types may be the extension's enum -- eg, "FieldType.spatialobj")
+    type_name = str(type_name).split(".")[-1].strip()
+    return blob_type_regex.match(type_name) is not None
+
+
+def isNull(value):
+    return value is None or (isinstance(value, float) and numpy.isnan(value))
+
+
+# the address of the first byte of a buffer
+def bufferAddress(buffer):
+    return numpy.frombuffer(buffer, dtype=numpy.uint8).ctypes.data
+
+
+class BlobColumn:
+    """
+    The values of a Blob or SpatialObj column stored back to back in one
+    contiguous buffer, with the offset and length of each value in it (a
+    length of -1 is a null). Values are appended one at a time while reading,
+    so only the current batch of records is ever held as separate bytes
+    objects. The values can then be handed to pandas as memoryviews into the
+    buffer, which don't copy it.
+    """
+
+    def __init__(self, buffer=None, offsets=None, lengths=None):
+        self.buffer = bytearray() if buffer is None else buffer
+        self.__offsets = [] if offsets is None else offsets
+        self.__lengths = [] if lengths is None else lengths
+
+    @property
+    def offsets(self):
+        return numpy.asarray(self.__offsets, dtype=numpy.int64)
+
+    @property
+    def lengths(self):
+        return numpy.asarray(self.__lengths, dtype=numpy.int64)
+
+    def __len__(self):
+        return len(self.__lengths)
+
+    def append(self, value):
+        if isNull(value):
+            self.__offsets.append(len(self.buffer))
+            self.__lengths.append(-1)
+        else:
+            self.__offsets.append(len(self.buffer))
+            self.__lengths.append(memoryview(value).nbytes)
+            self.buffer += value
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    # the values as an array of read-only memoryviews into the buffer (None
+    # for nulls) -- the buffer itself isn't copied, but the values can't be
+    # changed through them
+    def memoryviews(self):
+        view = memoryview(self.buffer)
+        if not view.readonly and hasattr(view, "toreadonly"):
+            # (python 3.8+)
+            view = view.toreadonly()
+        values = numpy.empty(len(self), dtype=object)
+        values[:] = [
+            None if length < 0 else view[offset : offset + length]
+            for offset, length in zip(self.__offsets, self.__lengths)
+        ]
+        return values
+
+    def toSeries(self, index=None, name=None):
+        return pd.Series(self.memoryviews(), index=index, name=name, dtype=object)
+
+    # the values as bytes (a copy of each value -- None for nulls)
+    def tolist(self):
+        return [
+            None if length < 0 else bytes(self.buffer[offset : offset + length])
+            for offset, length in zip(self.__offsets, self.__lengths)
+        ]
+
+    @classmethod
+    def fromSeries(cls, series):
+        """
+        The BlobColumn of a column of bytes, bytearrays and/or memoryviews. A
+        column read with blobs="memoryview" (memoryviews into one buffer)
+        gives back its buffer, offsets and lengths without copying anything.
+        Otherwise, the values are copied into a new buffer.
+        """
+        values = [None if isNull(value) else value for value in series.tolist()]
+        views = [value for value in values if value is not None]
+        buffers = set(id(value.obj) for value in views if isinstance(value, memoryview))
+        if (
+            len(views) > 0
+            and len(buffers) == 1
+            and all(isinstance(value, memoryview) for value in views)
+            and all(value.contiguous for value in views)
+        ):
+            buffer = views[0].obj
+            base = bufferAddress(buffer) if len(buffer) > 0 else 0
+            offsets = []
+            lengths = []
+            for value in values:
+                if value is None:
+                    offsets.append(0)
+                    lengths.append(-1)
+                elif value.nbytes == 0:
+                    offsets.append(0)
+                    lengths.append(0)
+                else:
+                    offsets.append(bufferAddress(value) - base)
+                    lengths.append(value.nbytes)
+            return cls(buffer, offsets, lengths)
+        column = cls()
+        column.extend(values)
+        return column
+
+
+# a batch of Blob or SpatialObj values, as the bytes objects the yxdb
+# extension writes (only the batch being written is ever copied)
+def blobBatch(values):
+    return [
+        bytes(value) if isinstance(value, (memoryview, bytearray)) else value
+        for value in values
+    ]
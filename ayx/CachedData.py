@@ -13,12 +13,66 @@
 # under the License.
 
 
+import os
+import re
+import json
+from collections import OrderedDict
+from hashlib import blake2b
+from copy import deepcopy
+import sqlite3
+from pathlib import Path
+from contextlib import contextmanager
 from uuid import uuid1
+from time import perf_counter
 import pandas as pd
-from matplotlib.figure import Figure
-from ayx.DatastreamUtils import MetadataTools, Config, savePlotToFile
-from ayx.Datafiles import Datafile, FileFormat
+from ayx.DatastreamUtils import (
+    MetadataTools,
+    Config,
+    savePngToFile,
+    renderPlot,
+    renderPlots,
+    displayPlot,
+    plotDataUri,
+    dataFingerprint,
+    isInteractive,
+)
+from ayx.Datafiles import Datafile, FileFormat, Partition, checkPartitionCount
+from ayx.Compression import checkCompression, codec_extensions
+from ayx.Compression import decompressFile, localTempFilepath
+from ayx.OutOfCore import readOutOfCore
+from ayx.helpers import deleteFile
+from ayx.Utils import getCacheDirectory
 from ayx.Settings import default_temp_file_format as temp_format
+from ayx import Settings
+from ayx.Stats import collector as stats_collector, null_call_stats
+from ayx import Session
+
+# {connection name} placeholders in Alteryx.query() sql (eg, "{#1}")
+query_placeholder_regex = re.compile(r"\{([^{}\s]+)\}")
+
+# number of Alteryx.read(where=...) calls seen for each cached input file and
+# set of filtered columns (see Settings.auto_index_threshold)
+where_observations = {}
+
+# compiled write plans (output metadata and renames), by schema signature
+write_plans = OrderedDict()
+
+
+# schema signature of a write -- None if the column overrides can't be
+# serialized (those writes are always compiled from scratch)
+def writePlanKey(pandas_df, columns, filetype):
+    try:
+        return json.dumps(
+            [
+                [[str(column), type(column).__name__] for column in pandas_df.columns],
+                [str(dtype) for dtype in pandas_df.dtypes],
+                columns,
+                filetype,
+            ],
+            sort_keys=True,
+        )
+    except (TypeError, ValueError):
+        return None
 
 
 class CachedData:
@@ -32,7 +86,10 @@ class CachedData:
             raise TypeError("debug parameter must True or False")
 
         # obtain input data mappings and workflow constants
+        # (time it so it can be included in the stats for the calls made)
+        config_start = perf_counter()
         self.config = Config(filepath=config_filepath, debug=debug)
+        self.config_seconds = perf_counter() - config_start
         # output format
         if (
             isinstance(self.config.temp_file_format, str)
@@ -48,7 +105,16 @@ class CachedData:
         self.output_datafile_format = {
             "filetype": temp_output_format,
             "extension": temp_output_format,
+            "compression": checkCompression(self.config.temp_file_compression),
         }
+        # (compressed outputs get the codec's extension too, eg .sqlite.lz4)
+        if self.output_datafile_format["compression"] is not None:
+            self.output_datafile_format["extension"] = ".".join(
+                [
+                    temp_output_format,
+                    codec_extensions[self.output_datafile_format["compression"]],
+                ]
+            )
 
     def __getIncomingConnectionMetadata(self, incoming_connection_name):
         if self.debug:
@@ -183,7 +249,60 @@ class CachedData:
             val = self.config.constant_map[constant_name]
             return val
 
-    def read(self, incoming_connection_name, batch_size=1):
+    # an open Datafile for a cached input -- borrowed from the connection pool
+    # of the current Alteryx.session() (and left open for the next call), or
+    # opened and closed for just this call when not in a session
+    @contextmanager
+    def __inputDatafile(self, filename, filetype, call_stats):
+        session = Session.current_session
+        if session is None:
+            with Datafile(
+                filename,
+                create_new=False,
+                fileformat=filetype,
+                debug=self.debug,
+                stats=call_stats,
+            ) as db:
+                yield db
+            return
+        db = session.getDatafile(filename, fileformat=filetype, stats=call_stats)
+        try:
+            yield db
+        finally:
+            db.stats = null_call_stats
+
+    # count a where= read of a cached sqlite input, and index the filtered
+    # columns once they are filtered on often enough
+    def __observeWhere(self, db, where):
+        if (
+            db.fileformat.filetype != "sqlite"
+            or db.compression is not None
+            or Settings.auto_index_threshold is None
+        ):
+            return
+        columns = sorted(where)
+        key = (os.path.abspath(db.filepath), tuple(columns))
+        where_observations[key] = where_observations.get(key, 0) + 1
+        if where_observations[key] < Settings.auto_index_threshold:
+            return
+        # (an index is only an optimization, so failing to create one -- eg,
+        # if the file is locked or read only -- doesn't fail the read)
+        try:
+            if db.findIndex(columns) is None:
+                index_name = db.createIndex(columns)
+                print('Created index "{}" on cached input data'.format(index_name))
+        except Exception as error:
+            print("WARNING: unable to index cached input data: {}".format(error))
+
+    def read(
+        self,
+        incoming_connection_name,
+        batch_size="auto",
+        where=None,
+        fixed_decimal="float",
+        blobs="bytes",
+        out_of_core=False,
+    ):
 
         if self.debug:
             print(
@@ -198,23 +317,261 @@ class CachedData:
         )
         input_data_filename = input_data_metadata["filename"]
         input_data_filetype = input_data_metadata["filetype"]
+        call_stats = stats_collector.startCall(
+            "read",
+            connection=incoming_connection_name,
+            filetype=input_data_filetype,
+            batch_size=batch_size,
+            where=None if where is None else sorted(where),
+        )
+        call_stats.addPhase("config", self.config_seconds)
         # create datafile object
         # (by not specifying the fileformat paramter, it will assume the file
         # type from the file's extension)
-        with Datafile(
-            input_data_filename, fileformat=input_data_filetype, debug=self.debug
+        with self.__inputDatafile(
+            input_data_filename, input_data_filetype, call_stats
         ) as db:
             msg_action = 'reading input data "{}"'.format(incoming_connection_name)
             try:
                 # get the data from the sql db (if only one table exists, no need to specify the table name)
-                data = db.getData(batch_size=batch_size)
+                if out_of_core:
+                    if fixed_decimal != "float" or blobs != "bytes":
+                        raise ValueError(
+                            "fixed_decimal and blobs can't be set for out-of-core reads"
+                        )
+                    # (decoded a chunk at a time into memory mapped files)
+                    data = readOutOfCore(
+                        db.iterData(
+                            chunk_rows=Settings.out_of_core_chunk_rows, where=where
+                        ),
+                        db.columnKinds(),
+                    )
+                else:
+                    data = db.getData(
+                        batch_size=batch_size,
+                        where=where,
+                        fixed_decimal=fixed_decimal,
+                        blobs=blobs,
+                    )
                 # print success message
                 print("".join(["SUCCESS: ", msg_action]))
-                # return the data
-                return data
             except:
                 print("".join(["ERROR: ", msg_action]))
                 raise
+            if where is not None:
+                self.__observeWhere(db, where)
+        call_stats.finish()
+        # return the data
+        return data
+
+    def createIndex(self, incoming_connection_name, columns):
+        if self.debug:
+            print(
+                'Attempting to index cached data for incoming connection "{}"'.format(
+                    incoming_connection_name
+                )
+            )
+        input_data_metadata = self.__getIncomingConnectionMetadata(
+            incoming_connection_name
+        )
+        input_data_filename = input_data_metadata["filename"]
+        input_data_filetype = input_data_metadata["filetype"]
+        if input_data_filetype != "sqlite":
+            raise ValueError(
+                "".join(
+                    [
+                        'Input connection "{}" was cached as {}'.format(
+                            incoming_connection_name, input_data_filetype
+                        ),
+                        " -- indexes can only be created on sqlite cached data.",
+                        ' Run Alteryx.setTempFormatAs("sqlite") and re-run',
+                        " the workflow to refresh the cached data.",
+                    ]
+                )
+            )
+        call_stats = stats_collector.startCall(
+            "createIndex",
+            connection=incoming_connection_name,
+            filetype=input_data_filetype,
+        )
+        call_stats.addPhase("config", self.config_seconds)
+        with self.__inputDatafile(
+            input_data_filename, input_data_filetype, call_stats
+        ) as db:
+            msg_action = 'indexing input data "{}"'.format(incoming_connection_name)
+            try:
+                index_name = db.createIndex(columns)
+                print("".join(["SUCCESS: ", msg_action]))
+            except:
+                print("".join(["ERROR: ", msg_action]))
+                raise
+        call_stats.finish()
+        return index_name
+
+    def readPartitions(self, incoming_connection_name, n):
+        checkPartitionCount(n)
+        if self.debug:
+            print(
+                'Attempting to partition cached data for incoming connection "{}"'.format(
+                    incoming_connection_name
+                )
+            )
+        input_data_metadata = self.__getIncomingConnectionMetadata(
+            incoming_connection_name
+        )
+        input_data_filename = input_data_metadata["filename"]
+        input_data_filetype = input_data_metadata["filetype"]
+        call_stats = stats_collector.startCall(
+            "readPartitions",
+            connection=incoming_connection_name,
+            filetype=input_data_filetype,
+            partitions=n,
+        )
+        call_stats.addPhase("config", self.config_seconds)
+        with self.__inputDatafile(
+            input_data_filename, input_data_filetype, call_stats
+        ) as db:
+            msg_action = 'partitioning input data "{}"'.format(incoming_connection_name)
+            try:
+                table = None
+                if db.fileformat.filetype == "sqlite":
+                    table = db.getSingularTable()
+                # (only the boundaries are read -- each partition is read by
+                # whichever process it is given to)
+                partitions = [
+                    Partition(
+                        os.path.abspath(input_data_filename),
+                        input_data_filetype,
+                        table,
+                        rows,
+                        index=index,
+                        count=n,
+                    )
+                    for index, rows in enumerate(db.partitionRanges(n, table))
+                ]
+                print("".join(["SUCCESS: ", msg_action]))
+            except:
+                print("".join(["ERROR: ", msg_action]))
+                raise
+        call_stats.finish()
+        return partitions
+
+    # the distinct connection names referenced by {...} placeholders in sql
+    def __queryConnectionNames(self, sql):
+        if not isinstance(sql, str):
+            raise TypeError("sql must be a string")
+        connection_names = []
+        for connection_name in query_placeholder_regex.findall(sql):
+            if connection_name not in connection_names:
+                connection_names.append(connection_name)
+        if len(connection_names) == 0:
+            raise ValueError(
+                'sql does not reference any input connections (eg, "select * from {#1}")'
+            )
+        return connection_names
+
+    # attach the cached sqlite file of each referenced input connection to an
+    # in-memory connection (read only), and swap each placeholder for the
+    # attached table name -- compressed inputs are decompressed to a local
+    # temp file first (added to local_filepaths, to delete after the query)
+    def __attachInputs(self, connection, sql, call_stats, local_filepaths):
+        schemas = {}
+        tables = {}
+        for connection_name in self.__queryConnectionNames(sql):
+            input_data_metadata = self.__getIncomingConnectionMetadata(connection_name)
+            filename = input_data_metadata["filename"]
+            filetype = input_data_metadata["filetype"]
+            if filetype != "sqlite":
+                raise ValueError(
+                    "".join(
+                        [
+                            'Input connection "{}" was cached as {}'.format(
+                                connection_name, filetype
+                            ),
+                            " -- Alteryx.query() requires sqlite cached data.",
+                            ' Run Alteryx.setTempFormatAs("sqlite") and re-run',
+                            " the workflow to refresh the cached data.",
+                        ]
+                    )
+                )
+            # (the same file may be referenced by more than one name)
+            filepath = os.path.abspath(filename)
+            if filepath not in schemas:
+                with self.__inputDatafile(filename, filetype, call_stats) as db:
+                    table = db.getSingularTable()
+                compression = FileFormat(filepath).compression
+                attach_filepath = filepath
+                if compression is not None:
+                    attach_filepath = localTempFilepath(filetype)
+                    local_filepaths.append(attach_filepath)
+                    decompressFile(filepath, attach_filepath, compression)
+                schema = "input_{}".format(len(schemas) + 1)
+                uri = "{}?mode=ro".format(Path(attach_filepath).as_uri())
+                connection.execute("attach database ? as {}".format(schema), (uri,))
+                schemas[filepath] = schema
+                tables[filepath] = table.replace('"', '""')
+            tables[connection_name] = '{}."{}"'.format(
+                schemas[filepath], tables[filepath]
+            )
+        return query_placeholder_regex.sub(lambda match: tables[match.group(1)], sql)
+
+    def __closeQuery(self, connection, local_filepaths):
+        connection.close()
+        for local_filepath in local_filepaths:
+            deleteFile(local_filepath, debug=self.debug)
+
+    # yield the result in chunks, closing the connection once it is consumed
+    def __queryChunks(self, connection, sql, chunksize, call_stats, local_filepaths):
+        rows = 0
+        try:
+            for chunk in pd.read_sql_query(sql, connection, chunksize=chunksize):
+                rows += len(chunk)
+                yield chunk
+        finally:
+            self.__closeQuery(connection, local_filepaths)
+            call_stats.set(rows=rows)
+            call_stats.finish()
+
+    def query(self, sql, chunksize=None):
+        if self.debug:
+            print("Attempting to query cached data: {}".format(sql))
+        if chunksize is not None and (
+            isinstance(chunksize, bool) or not isinstance(chunksize, int)
+        ):
+            raise TypeError("chunksize must be an integer value (or None)")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+
+        call_stats = stats_collector.startCall("query", filetype="sqlite")
+        call_stats.addPhase("config", self.config_seconds)
+        msg_action = "querying input data"
+        connection = sqlite3.connect("file::memory:", uri=True)
+        local_filepaths = []
+        try:
+            with call_stats.phase("open"):
+                attached_sql = self.__attachInputs(
+                    connection, sql, call_stats, local_filepaths
+                )
+            if self.debug:
+                print("Running query: {}".format(attached_sql))
+            if chunksize is not None:
+                chunks = self.__queryChunks(
+                    connection, attached_sql, chunksize, call_stats, local_filepaths
+                )
+                print("".join(["SUCCESS: ", msg_action]))
+                return chunks
+            # (sqlite runs the query, pandas only sees the result)
+            with call_stats.phase("decode"):
+                data = pd.read_sql_query(attached_sql, connection)
+        except:
+            self.__closeQuery(connection, local_filepaths)
+            print("".join(["ERROR: ", msg_action]))
+            raise
+        self.__closeQuery(connection, local_filepaths)
+        print("".join(["SUCCESS: ", msg_action]))
+        call_stats.set(rows=len(data), columns=len(data.columns))
+        call_stats.finish()
+        return data
 
     def __checkOutgoingConnectionNumber__(self, outgoing_connection_number):
         if not isinstance(outgoing_connection_number, int):
@@ -233,7 +590,54 @@ class CachedData:
             )
         return outgoing_connection_number
 
-    def writePlot(self, matplotlib_figure, outgoing_connection_number):
+    def __checkPlotOutputType__(self, output_type):
+        if output_type is None:
+            output_type = Settings.plot_output_type
+        if output_type not in ("path", "data_uri", "blob"):
+            raise ValueError(
+                'output_type must be "path", "data_uri" or "blob" (not "{}")'.format(
+                    output_type
+                )
+            )
+        return output_type
+
+    def __checkFigure__(self, matplotlib_figure):
+        # (matplotlib is slow to import, so only import it when needed)
+        from matplotlib.figure import Figure
+
+        if matplotlib_figure is None:
+            raise TypeError("A matplotlib plot is required")
+        elif not isinstance(matplotlib_figure, Figure):
+            raise TypeError(
+                "Currently only matplotlib figures can be used to pass plots to outgoing connections in Alteryx"
+            )
+        return matplotlib_figure
+
+    # values (and field metadata) for the plot column of a plot output
+    def __plotColumn__(self, png_bytes_list, filenames, output_type):
+        if output_type == "path":
+            # img tags pointing to the saved png files
+            values = [
+                '<img src="{}" />'.format(savePngToFile(png_bytes, filename))
+                for png_bytes, filename in zip(png_bytes_list, filenames)
+            ]
+            metadata = {"type": "V_String", "length": 2147483647}
+        elif output_type == "data_uri":
+            # embed the png itself, so no file has to be written (or be
+            # reachable from wherever the output ends up)
+            values = [
+                '<img src="{}" />'.format(plotDataUri(png_bytes))
+                for png_bytes in png_bytes_list
+            ]
+            metadata = {"type": "V_String", "length": 2147483647}
+        else:
+            values = list(png_bytes_list)
+            metadata = {"type": "Blob", "length": 2147483647}
+        return values, metadata
+
+    def writePlot(
+        self, matplotlib_figure, outgoing_connection_number, output_type=None
+    ):
         if self.debug:
             print(
                 'Alteryx.writePlot() -- attempting to write out plot to outgoing connection "{}"'.format(
@@ -245,12 +649,8 @@ class CachedData:
             outgoing_connection_number = self.__checkOutgoingConnectionNumber__(
                 outgoing_connection_number
             )
-            if matplotlib_figure is None:
-                raise TypeError("A matplotlib plot is required")
-            elif not isinstance(matplotlib_figure, Figure):
-                raise TypeError(
-                    "Currently only matplotlib figures can be used to pass plots to outgoing connections in Alteryx"
-                )
+            self.__checkFigure__(matplotlib_figure)
+            output_type = self.__checkPlotOutputType__(output_type)
         except Exception as err:
             print(
                 "ERROR: Alteryx.writePlot(matplotlib_figure, outgoing_connection_number):"
@@ -258,25 +658,25 @@ class CachedData:
             print(err)
             raise
 
-        filename = "plot_{}".format(outgoing_connection_number)
-        saved_plot_filepath = savePlotToFile(
-            matplotlib_figure, "plot_{}.png".format(outgoing_connection_number)
-        )
-
-        # create html for img tag
-        img_ref_html = '<img src="{}" />'.format(saved_plot_filepath)
-        plot_df = pd.DataFrame({"Plot": [img_ref_html]})
-        self.write(
-            plot_df,
-            outgoing_connection_number,
-            {"Plot": {"type": "V_String", "length": 2147483647}},
+        png_bytes = renderPlot(matplotlib_figure)
+        displayPlot(png_bytes)
+        values, metadata = self.__plotColumn__(
+            [png_bytes], ["plot_{}.png".format(outgoing_connection_number)], output_type
         )
-
-    def write(self, pandas_df, outgoing_connection_number, batch_size=1, columns=None):
-
+        plot_df = pd.DataFrame({"Plot": values})
+        self.write(plot_df, outgoing_connection_number, columns={"Plot": metadata})
+
+    def writePlots(
+        self,
+        matplotlib_figures,
+        outgoing_connection_number,
+        labels=None,
+        output_type=None,
+        processes=None,
+    ):
         if self.debug:
             print(
-                'Alteryx.write() -- attempting to write out cached data to outgoing connection "{}"'.format(
+                'Alteryx.writePlots() -- attempting to write out plots to outgoing connection "{}"'.format(
                     outgoing_connection_number
                 )
             )
@@ -285,26 +685,109 @@ class CachedData:
             outgoing_connection_number = self.__checkOutgoingConnectionNumber__(
                 outgoing_connection_number
             )
-            if pandas_df is None:
-                raise TypeError(
-                    "A pandas dataframe is required for passing data to outgoing connections in Alteryx"
-                )
-            elif not isinstance(pandas_df, pd.core.frame.DataFrame):
-                raise TypeError(
-                    "Currently only pandas dataframes can be used to pass data to outgoing connections in Alteryx"
+            if not isinstance(matplotlib_figures, (list, tuple)):
+                raise TypeError("A list of matplotlib figures is required")
+            for matplotlib_figure in matplotlib_figures:
+                self.__checkFigure__(matplotlib_figure)
+            if labels is None:
+                labels = [
+                    "plot_{}".format(index + 1)
+                    for index in range(len(matplotlib_figures))
+                ]
+            elif not isinstance(labels, (list, tuple)):
+                raise TypeError("labels must be a list")
+            elif len(labels) != len(matplotlib_figures):
+                raise ValueError(
+                    "labels must have one label for each figure ({} labels, {} figures)".format(
+                        len(labels), len(matplotlib_figures)
+                    )
                 )
+            output_type = self.__checkPlotOutputType__(output_type)
+            if processes is not None and (
+                isinstance(processes, bool)
+                or not isinstance(processes, int)
+                or processes < 1
+            ):
+                raise ValueError("processes must be a positive integer")
         except Exception as err:
-            print("ERROR: Alteryx.write(pandas_df, outgoing_connection_number):")
+            print(
+                "ERROR: Alteryx.writePlots(matplotlib_figures, outgoing_connection_number):"
+            )
             print(err)
             raise
 
-        if columns is None:
-            pass
-        elif not isinstance(columns, dict):
-            raise TypeError(
-                "columns (metadata) is optional, but if provided, must be a dict or list"
-            )
+        png_bytes_list = renderPlots(matplotlib_figures, processes=processes)
+        for png_bytes in png_bytes_list:
+            displayPlot(png_bytes)
+        values, metadata = self.__plotColumn__(
+            png_bytes_list,
+            [
+                "plot_{}_{}.png".format(outgoing_connection_number, index + 1)
+                for index in range(len(png_bytes_list))
+            ],
+            output_type,
+        )
+        plot_df = pd.DataFrame(
+            {"Label": [str(label) for label in labels], "Plot": values}
+        )
+        self.write(
+            plot_df,
+            outgoing_connection_number,
+            columns={"Label": {"type": "V_WString"}, "Plot": metadata},
+        )
 
+    # the fingerprint of an output's content is kept in the per-user cache
+    # directory (not alongside the output, where the engine picks up files),
+    # with the output file's mtime and size (so a changed or replaced output
+    # file isn't mistaken for an unchanged one) -- None if there's no cache
+    # directory
+    def __fingerprintFilepath(self, output_filepath):
+        cache_dir = getCacheDirectory("fingerprints")
+        if cache_dir is None:
+            return None
+        path_hash = blake2b(
+            os.path.abspath(output_filepath).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return os.path.join(cache_dir, "{}.json".format(path_hash))
+
+    # skip unchanged outputs? (by default, only when running interactively --
+    # see Settings.skip_unchanged_outputs)
+    def __skipUnchangedOutputs(self):
+        if Settings.skip_unchanged_outputs is None:
+            return isInteractive()
+        return bool(Settings.skip_unchanged_outputs)
+
+    def __outputUnchanged(self, output_filepath, fingerprint):
+        fingerprint_filepath = self.__fingerprintFilepath(output_filepath)
+        if fingerprint is None or fingerprint_filepath is None:
+            return False
+        try:
+            with open(fingerprint_filepath) as fp:
+                written = json.load(fp)
+        except (OSError, ValueError):
+            return False
+        signature = Session.fileSignature(output_filepath)
+        if signature is None:
+            return False
+        return written == {"fingerprint": fingerprint, "signature": list(signature)}
+
+    def __writeFingerprint(self, output_filepath, fingerprint):
+        signature = Session.fileSignature(output_filepath)
+        fingerprint_filepath = self.__fingerprintFilepath(output_filepath)
+        if signature is None or fingerprint_filepath is None:
+            return
+        try:
+            with open(fingerprint_filepath, "w") as fp:
+                json.dump(
+                    {"fingerprint": fingerprint, "signature": list(signature)}, fp
+                )
+        except OSError as err:
+            if self.debug:
+                print("Unable to write output fingerprint: {}".format(err))
+
+    # resolve the output metadata of each column (pandas -> yxdb -> output
+    # format, with any user overrides) and the columns to rename
+    def __compileWritePlan(self, pandas_df, columns):
         # get list of columns in input data frame
         pandas_cols = list(pandas_df.columns)
 
@@ -327,6 +810,9 @@ class CachedData:
         to_context = "yxdb"
         for index, colname in enumerate(pandas_df.columns):
             coltype = str(pandas_df.dtypes[index])
+            # (all resolutions and timezones are the same type -- see MetadataTools)
+            if coltype.startswith("datetime64["):
+                coltype = "datetime64"
             try:
                 db_col_metadata = metadata_tools.convertTypeString(
                     coltype, from_context=from_context, to_context=to_context
@@ -471,9 +957,75 @@ class CachedData:
 
         if len(write_metadata.keys()) == 0:
             write_metadata = None
-
         if len(renames.keys()) == 0:
             renames = None
+        return {"write_metadata": write_metadata, "renames": renames}
+
+    # the write plan for a dataframe's shape -- compiled once per schema
+    # signature (column names and dtypes, column overrides, output format)
+    def __writePlan(self, pandas_df, columns):
+        key = writePlanKey(pandas_df, columns, self.output_datafile_format["filetype"])
+        if key is not None and key in write_plans:
+            write_plans.move_to_end(key)
+            plan = write_plans[key]
+        else:
+            plan = self.__compileWritePlan(pandas_df, columns)
+            if key is not None and Settings.write_plan_cache_size > 0:
+                write_plans[key] = plan
+                while len(write_plans) > Settings.write_plan_cache_size:
+                    write_plans.popitem(last=False)
+        # (copied, so the cached plan can't be changed by the write)
+        return deepcopy(plan)
+
+    def write(
+        self, pandas_df, outgoing_connection_number, batch_size="auto", columns=None
+    ):
+
+        if self.debug:
+            print(
+                'Alteryx.write() -- attempting to write out cached data to outgoing connection "{}"'.format(
+                    outgoing_connection_number
+                )
+            )
+
+        try:
+            outgoing_connection_number = self.__checkOutgoingConnectionNumber__(
+                outgoing_connection_number
+            )
+            if pandas_df is None:
+                raise TypeError(
+                    "A pandas dataframe is required for passing data to outgoing connections in Alteryx"
+                )
+            elif not isinstance(pandas_df, pd.core.frame.DataFrame):
+                raise TypeError(
+                    "Currently only pandas dataframes can be used to pass data to outgoing connections in Alteryx"
+                )
+        except Exception as err:
+            print("ERROR: Alteryx.write(pandas_df, outgoing_connection_number):")
+            print(err)
+            raise
+
+        if columns is None:
+            pass
+        elif not isinstance(columns, dict):
+            raise TypeError(
+                "columns (metadata) is optional, but if provided, must be a dict or list"
+            )
+
+        call_stats = stats_collector.startCall(
+            "write",
+            connection=outgoing_connection_number,
+            filetype=self.output_datafile_format["filetype"],
+            batch_size=batch_size,
+        )
+        call_stats.addPhase("config", self.config_seconds)
+        metadata_start = perf_counter()
+
+        plan = self.__writePlan(pandas_df, columns)
+        write_metadata = plan["write_metadata"]
+        renames = plan["renames"]
+
+        if renames is None:
             pandas_df_out = pandas_df
         else:
             if self.debug:
@@ -481,14 +1033,42 @@ class CachedData:
                 print(renames)
             pandas_df_out = pandas_df.rename(columns=renames, inplace=False)
 
+        call_stats.addPhase("metadata", perf_counter() - metadata_start)
+
+        output_filepath = "output_{}.{}".format(
+            outgoing_connection_number, self.output_datafile_format["extension"]
+        )
+        # skip re-encoding an output that is already identical (eg, a notebook
+        # cell being re-run)
+        fingerprint = None
+        if self.__skipUnchangedOutputs():
+            with call_stats.phase("fingerprint"):
+                fingerprint = dataFingerprint(
+                    pandas_df_out, write_metadata, self.output_datafile_format
+                )
+            if self.__outputUnchanged(output_filepath, fingerprint):
+                print(
+                    "SUCCESS: outgoing connection data {} is unchanged".format(
+                        outgoing_connection_number
+                    )
+                )
+                call_stats.set(unchanged=True)
+                call_stats.finish()
+                # (the same dataframe that Datafile.writeData returns)
+                return pandas_df_out
+            # (forgotten before writing, so a failed write can't leave a
+            # stale match)
+            fingerprint_filepath = self.__fingerprintFilepath(output_filepath)
+            if fingerprint_filepath is not None:
+                deleteFile(fingerprint_filepath, debug=self.debug)
+
         # create custom sqlite object
         # (TODO: update to yxdb)
         with Datafile(
-            "output_{}.{}".format(
-                outgoing_connection_number, self.output_datafile_format["extension"]
-            ),
+            output_filepath,
             create_new=True,
             debug=self.debug,
+            stats=call_stats,
         ) as db:
             msg_action = "writing outgoing connection data {}".format(
                 outgoing_connection_number
@@ -503,11 +1083,17 @@ class CachedData:
                 )
                 # print success message
                 print("".join(["SUCCESS: ", msg_action]))
-                # return the data
-                return data
             except:
                 print("".join(["ERROR: ", msg_action]))
                 raise
+        if fingerprint is not None:
+            self.__writeFingerprint(output_filepath, fingerprint)
+        # (file size is only final once the connection has been closed)
+        if stats_collector.enabled and os.path.isfile(db.filepath):
+            call_stats.set(bytes=os.path.getsize(db.filepath))
+        call_stats.finish()
+        # return the data
+        return data
 
     def getIncomingConnectionNames(self):
         if self.debug:
@@ -526,6 +1112,11 @@ class CachedData:
         pandas_df_input_flag = isinstance(
             incoming_connection_name, pd.core.frame.DataFrame
         )
+        call_stats = stats_collector.startCall(
+            "readMetadata",
+            connection=None if pandas_df_input_flag else incoming_connection_name,
+        )
+        call_stats.addPhase("config", self.config_seconds)
 
         # if the input is a dataframe, then write the first row to a temporary
         # sqlite file, and get the metadata from it
@@ -534,7 +1125,7 @@ class CachedData:
             temp_table_name = str(uuid1())
             filetype = self.output_datafile_format["filetype"]
             temp_file_path = ".".join(
-                [temp_table_name, self.output_datafile_format["extension"]]
+                [temp_table_name, self.output_datafile_format["filetype"]]
             )
             with Datafile(
                 temp_file_path,
@@ -542,9 +1133,11 @@ class CachedData:
                 temporary=True,
                 fileformat=filetype,
                 debug=self.debug,
+                stats=call_stats,
             ) as db:
                 db.writeData(input_df_head, "data")
-                raw_metadata = db.getMetadata()
+                with call_stats.phase("metadata"):
+                    raw_metadata = db.getMetadata()
         # otherwise, if not a dataframe, assume input argument value is a
         # connection name string (function called will validate string type)
         else:
@@ -556,14 +1149,12 @@ class CachedData:
             input_data_filename = input_data_metadata["filename"]
             filetype = input_data_metadata["filetype"]
             # get the data from the sqlite file
-            with Datafile(
-                input_data_filename,
-                create_new=False,
-                fileformat=filetype,
-                debug=self.debug,
-            ) as db:
-                raw_metadata = db.getMetadata()
+            with self.__inputDatafile(input_data_filename, filetype, call_stats) as db:
+                with call_stats.phase("metadata"):
+                    raw_metadata = db.getMetadata()
+        call_stats.set(filetype=filetype)
 
+        metadata_start = perf_counter()
         # initiate the a MetadataTools object
         metadata_tools = MetadataTools(debug=self.debug)
         metadata_dict = {}
@@ -613,10 +1204,10 @@ class CachedData:
                 metadata_dict[field_name]["length"],
                 context="yxdb",
             )
-            updated_field_metadata[
-                "length"
-            ] = metadata_tools.convertLengthTupleToContext(
-                updated_field_metadata["length"], context="yxdb"
+            updated_field_metadata["length"] = (
+                metadata_tools.convertLengthTupleToContext(
+                    updated_field_metadata["length"], context="yxdb"
+                )
             )
             metadata_dict[field_name] = updated_field_metadata
 
@@ -638,4 +1229,7 @@ class CachedData:
                 )
             )
 
+        call_stats.addPhase("metadata", perf_counter() - metadata_start)
+        call_stats.set(columns=len(metadata_dict))
+        call_stats.finish()
         return metadata_dict
@@ -0,0 +1,167 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+### framed compression of the temp files handed between Alteryx and the
+### python tool (eg, output_1.sqlite.lz4) -- sqlite and yxdb files have to be
+### read and written in place, so a compressed file is decompressed to (or
+### compressed from) a local temp file one chunk at a time
+import gzip
+import os
+import shutil
+import tempfile
+from ayx import Settings
+
+# codec name: file extension (lz4 and zstd are optional packages -- gzip is
+# always available, but much slower)
+codec_extensions = {"lz4": "lz4", "zstd": "zst", "gzip": "gz"}
+codec_packages = {"lz4": "lz4", "zstd": "zstandard"}
+valid_codecs = list(codec_extensions)
+
+
+# check a compression argument is None (no compression) or a codec name
+def checkCompression(compression):
+    if compression is None:
+        return None
+    if not isinstance(compression, str):
+        raise TypeError("compression must be a string (or None for no compression)")
+    if compression not in valid_codecs:
+        raise ValueError(
+            "compression ({}) is invalid -- valid codecs: {}".format(
+                compression, valid_codecs
+            )
+        )
+    return compression
+
+
+# codec for a file extension (or None if it isn't a compressed file)
+def codecFromExtension(extension):
+    for codec, codec_extension in codec_extensions.items():
+        if extension == codec_extension:
+            return codec
+    return None
+
+
+def isCodecAvailable(codec):
+    try:
+        importCodec(codec)
+        return True
+    except ImportError:
+        return False
+
+
+def importCodec(codec):
+    checkCompression(codec)
+    try:
+        if codec == "lz4":
+            import lz4.frame
+
+            return lz4.frame
+        elif codec == "zstd":
+            import zstandard
+
+            return zstandard
+        return gzip
+    except ImportError:
+        raise ImportError(
+            "".join(
+                [
+                    "{} compression requires the {} package".format(
+                        codec, codec_packages[codec]
+                    ),
+                    ' -- run Alteryx.installPackages("{}")'.format(
+                        codec_packages[codec]
+                    ),
+                ]
+            )
+        )
+
+
+# open a compressed file as a binary file object (mode "rb" or "wb")
+def openCompressed(filepath, mode, codec):
+    module = importCodec(codec)
+    level = Settings.temp_compression_levels[codec]
+    if codec == "lz4":
+        if mode == "wb":
+            return module.open(filepath, mode, compression_level=level)
+        return module.open(filepath, mode)
+    elif codec == "zstd":
+        fp = open(filepath, mode)
+        try:
+            if mode == "wb":
+                stream = module.ZstdCompressor(level=level).stream_writer(fp)
+            else:
+                stream = module.ZstdDecompressor().stream_reader(fp)
+        except:
+            fp.close()
+            raise
+        return ClosingStream(stream, fp)
+    if mode == "wb":
+        return module.open(filepath, mode, compresslevel=level)
+    return module.open(filepath, mode)
+
+
+# a zstandard stream that also closes the file it wraps
+class ClosingStream:
+    def __init__(self, stream, fp):
+        self.stream = stream
+        self.fp = fp
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+    def write(self, data):
+        return self.stream.write(data)
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            if not self.fp.closed:
+                self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+def compressFile(source_filepath, filepath, codec):
+    # (written next to the destination first, so a partly written file is
+    # never mistaken for the output)
+    partial_filepath = "{}.partial".format(filepath)
+    try:
+        with open(source_filepath, "rb") as source, openCompressed(
+            partial_filepath, "wb", codec
+        ) as destination:
+            shutil.copyfileobj(source, destination, Settings.temp_compression_chunk)
+        os.replace(partial_filepath, filepath)
+    finally:
+        if os.path.isfile(partial_filepath):
+            os.remove(partial_filepath)
+
+
+def decompressFile(filepath, destination_filepath, codec):
+    with openCompressed(filepath, "rb", codec) as source, open(
+        destination_filepath, "wb"
+    ) as destination:
+        shutil.copyfileobj(source, destination, Settings.temp_compression_chunk)
+
+
+# path of a new (empty) local temp file for a compressed datafile's contents
+def localTempFilepath(filetype):
+    fd, filepath = tempfile.mkstemp(prefix="ayx_", suffix=".{}".format(filetype))
+    os.close(fd)
+    os.remove(filepath)
+    return filepath
@@ -15,13 +15,597 @@
 
 import os, re, builtins, numpy
 import sqlite3
+import json
+import decimal
+from collections import OrderedDict
+from time import perf_counter
 import pandas as pd
 from ayx.helpers import fileErrorMsg, fileExists, deleteFile, tableNameIsValid
 from ayx.Compiled import pyxdb, pyxdbLookupFieldTypeEnum
+from ayx.Stats import null_call_stats
+from ayx.Blobs import BlobColumn, checkBlobs, isBlobType, blobBatch
+from ayx.Compression import (
+    codecFromExtension,
+    compressFile,
+    decompressFile,
+    localTempFilepath,
+)
+from ayx import Settings
 
 # from ayx.DatastreamUtils import MetadataTools
 
 
+# quote a table/column name for sqlite
+def quoteIdentifier(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+# check that a where argument is a dict of {column name: value or list of
+# values} (records are kept if every column matches one of its values)
+def checkWhere(where):
+    if not isinstance(where, dict):
+        raise TypeError(
+            'where must be a dict of column names and values (eg, {"id": 5})'
+        )
+    if len(where) == 0:
+        raise ValueError("where must include at least one column")
+    for column in where:
+        if not isinstance(column, str):
+            raise TypeError("where column names must be strings")
+    return where
+
+
+def whereValues(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+# sqlite where clause (and its parameters) for a where dict
+def whereClause(where):
+    conditions = []
+    parameters = []
+    for column, value in where.items():
+        values = whereValues(value)
+        column_conditions = []
+        if None in values:
+            column_conditions.append("{} is null".format(quoteIdentifier(column)))
+            values = [value for value in values if value is not None]
+        if len(values) == 1:
+            column_conditions.append("{} = ?".format(quoteIdentifier(column)))
+        elif len(values) > 1:
+            column_conditions.append(
+                "{} in ({})".format(
+                    quoteIdentifier(column), ", ".join(["?"] * len(values))
+                )
+            )
+        elif len(column_conditions) == 0:
+            # (an empty list of values matches nothing)
+            column_conditions.append("0")
+        parameters.extend(values)
+        conditions.append("({})".format(" or ".join(column_conditions)))
+    return " and ".join(conditions), parameters
+
+
+# filter a dataframe by a where dict (for formats that can't filter on read)
+def whereFilter(data, where):
+    keep = pd.Series(True, index=data.index)
+    for column, value in where.items():
+        values = whereValues(value)
+        matches = data[column].isin([value for value in values if value is not None])
+        if None in values:
+            matches = matches | data[column].isnull()
+        keep = keep & matches
+    return data[keep].reset_index(drop=True)
+
+
+# check that a rows argument is a (start, stop) range (see
+# Datafile.partitionRanges)
+def checkRows(rows):
+    if (
+        not isinstance(rows, (tuple, list))
+        or len(rows) != 2
+        or not all(
+            isinstance(value, int) and not isinstance(value, bool)
+            for value in rows
+            if value is not None
+        )
+        or rows[0] is None
+    ):
+        raise TypeError(
+            "rows must be a (start, stop) tuple of ints -- stop may be None (not {})".format(
+                repr(rows)
+            )
+        )
+    if rows[0] < 0 or (rows[1] is not None and rows[1] < rows[0]):
+        raise ValueError("rows must be a (start, stop) range (not {})".format(rows))
+    return tuple(rows)
+
+
+# check that a number of partitions is a positive integer
+def checkPartitionCount(n):
+    if not isinstance(n, int) or isinstance(n, bool):
+        raise TypeError(
+            "n (the number of partitions) must be an integer (not {})".format(repr(n))
+        )
+    if n < 1:
+        raise ValueError(
+            "n (the number of partitions) must be at least 1 (not {})".format(n)
+        )
+    return n
+
+
+# the sql condition for a (start, stop) range of rowids
+def rowidClause(rows):
+    start, stop = rows
+    if stop is None:
+        return "rowid >= {:d}".format(start)
+    return "rowid >= {:d} and rowid < {:d}".format(start, stop)
+
+
+# check that a batch_size argument is either "auto" or a positive integer
+def checkBatchSize(batch_size):
+    if batch_size == "auto":
+        return batch_size
+    elif isinstance(batch_size, bool) or not isinstance(batch_size, int):
+        raise TypeError(
+            'batch_size must be "auto" or an integer, not {}'.format(type(batch_size))
+        )
+    elif batch_size < 1:
+        raise ValueError("batch_size must be at least 1 ({})".format(batch_size))
+    return batch_size
+
+
+# estimate how many bytes a record takes up in memory (as a list of python
+# objects) from the yxdb field types and sizes -- fields is a list of
+# (type, size) tuples, eg [("Int64", 8), ("V_WString", 2147483647)]
+def recordWidth(fields):
+    # list object + one pointer per field
+    width = 56 + 8 * len(fields)
+    for field_type, field_size in fields:
+        field_type = str(field_type).split(".")[-1].lower().replace(" ", "")
+        if field_type in (
+            "v_string",
+            "v_wstring",
+            "string",
+            "wstring",
+            "blob",
+            "spatialobj",
+        ):
+            # sizes of string-like fields are the max length, not the typical
+            # length (which would be 2GB for a default V_WString)
+            if field_type in ("wstring", "v_wstring"):
+                field_size = field_size * 2
+            field_size = min(field_size, Settings.batch_variable_field_bytes)
+        # plus the overhead of a python object for each value
+        width += 32 + max(field_size, 0)
+    return width
+
+
+# chooses the number of records to read/write per extension call when
+# batch_size="auto": starts with as many records as fit in the target memory
+# per batch, then keeps doubling the batch size for as long as doing so
+# improves the measured throughput (and the batch stays within 4x the target
+# memory), and settles on the best size found
+class BatchSizer:
+    def __init__(self, record_width, target_bytes=None, max_size=None):
+        if target_bytes is None:
+            target_bytes = Settings.batch_target_bytes
+        if max_size is None:
+            max_size = Settings.batch_max_size
+        self.record_width = max(int(record_width), 1)
+        self.max_size = max(min(max_size, (4 * target_bytes) // self.record_width), 1)
+        self.batch_size = max(min(target_bytes // self.record_width, self.max_size), 1)
+        self.best_size = self.batch_size
+        self.best_throughput = None
+        self.settled = False
+
+    # record how long a batch took, and adjust the size of the next batch
+    def update(self, rows, seconds):
+        if self.settled or rows < self.batch_size or seconds <= 0:
+            return self.batch_size
+        throughput = rows / seconds
+        if self.best_throughput is None or throughput > self.best_throughput * 1.05:
+            self.best_throughput = throughput
+            self.best_size = self.batch_size
+            if self.batch_size < self.max_size:
+                self.batch_size = min(self.batch_size * 2, self.max_size)
+            else:
+                self.settled = True
+        else:
+            # bigger batches aren't paying off any more, so go back to the
+            # best batch size seen so far and stop exploring
+            self.batch_size = self.best_size
+            self.settled = True
+        return self.batch_size
+
+
+# string formats of the yxdb Date, Time and DateTime fields
+yxdb_datetime_formats = {
+    "Date": "%Y-%m-%d",
+    "Time": "%H:%M:%S",
+    "DateTime": "%Y-%m-%d %H:%M:%S",
+}
+
+
+def isTimezoneAware(series):
+    return getattr(series.dtype, "tz", None) is not None
+
+
+# a timezone-aware datetime column as naive UTC times (Alteryx DateTime
+# fields have no time zone -- every output format writes them in UTC)
+def naiveDatetimeColumn(series):
+    if isTimezoneAware(series):
+        return series.dt.tz_convert("UTC").dt.tz_localize(None)
+    return series
+
+
+# format a whole column as the strings a yxdb Date, Time or DateTime field is
+# written from (None for nulls) -- datetime64 columns are formatted by numpy
+# (timezone aware values are converted to UTC first), timedelta64 columns are
+# times of day, and any other values are formatted one at a time
+def encodeDatetimeColumn(series, alteryx_type):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = naiveDatetimeColumn(series).values
+    elif pd.api.types.is_timedelta64_dtype(series.dtype):
+        values = numpy.datetime64(0, "s") + series.values.astype("timedelta64[s]")
+    else:
+        time_format = yxdb_datetime_formats[alteryx_type]
+        return [
+            (
+                None
+                if value is None or (not isinstance(value, str) and pd.isnull(value))
+                else (
+                    value.strftime(time_format) if hasattr(value, "strftime") else value
+                )
+            )
+            for value in series.tolist()
+        ]
+    nulls = numpy.isnat(values)
+    if alteryx_type == "Date":
+        strings = numpy.datetime_as_string(values, unit="D")
+    elif alteryx_type == "Time":
+        # (the time of day on 1970-01-01, so the time is always at [11:19])
+        seconds = values.astype("datetime64[s]")
+        time_of_day = numpy.datetime64(0, "s") + (
+            seconds - seconds.astype("datetime64[D]")
+        )
+        strings = numpy.datetime_as_string(time_of_day, unit="s").astype("U19")
+        strings = strings.view("U1").reshape(-1, 19)[:, 11:].copy().view("U8")
+        strings = strings.ravel()
+    else:
+        strings = numpy.char.replace(
+            numpy.datetime_as_string(values, unit="s"), "T", " "
+        )
+    encoded = strings.astype(object)
+    encoded[nulls] = None
+    return encoded.tolist()
+
+
+# numpy types of the python types that yxdb values are converted to
+conversion_dtypes = {"bool": numpy.bool_, "int": numpy.int64, "float": numpy.float64}
+
+
+# a column's values as an array of python objects, ready to write to a yxdb
+# file -- converted to the column's python type (see compileYxdbWritePlan)
+# and with every null (NaN, NaT, None, pd.NA) replaced with None
+def encodeColumn(series, conversion=None, nulls=None):
+    if isinstance(conversion, tuple) and conversion[0] == "Fixed Decimal":
+        return encodeFixedDecimalColumn(series, *conversion[1:])
+    if nulls is None:
+        nulls = series.isna().values
+    if conversion in yxdb_datetime_formats:
+        values = encodeDatetimeColumn(series, conversion)
+        encoded = numpy.empty(len(values), dtype=object)
+        encoded[:] = values
+        return encoded
+    if conversion in conversion_dtypes:
+        try:
+            # (nulls are filled so they can be cast, and then replaced)
+            values = series.values
+            if nulls.any():
+                values = numpy.where(nulls, 0, values)
+            encoded = values.astype(conversion_dtypes[conversion]).astype(object)
+        except (TypeError, ValueError, OverflowError):
+            # (eg, ints too big for int64 -- convert them one at a time)
+            to_type = getattr(builtins, conversion)
+            encoded = numpy.empty(len(series), dtype=object)
+            encoded[:] = [
+                None if null else to_type(value)
+                for value, null in zip(series.tolist(), nulls)
+            ]
+    else:
+        encoded = series.astype(object).values.copy()
+    encoded[nulls] = None
+    return encoded
+
+
+# how Fixed Decimal columns are returned when read (see Datafile.getData)
+fixed_decimal_modes = ["float", "scaled", "decimal"]
+
+
+def checkFixedDecimal(fixed_decimal):
+    if fixed_decimal not in fixed_decimal_modes:
+        raise ValueError(
+            "fixed_decimal must be one of {} (not {})".format(
+                fixed_decimal_modes, repr(fixed_decimal)
+            )
+        )
+    return fixed_decimal
+
+
+# (enough digits for the widest Fixed Decimal, so values are never rounded
+# by the decimal context itself)
+fixed_decimal_context = decimal.Context(prec=100, rounding=decimal.ROUND_HALF_EVEN)
+
+# a sqlite decimal column type -- eg, "decimal(19,6)", or "decimal text(19,6)"
+# as Fixed Decimal columns are written (see sqliteDecimalType)
+sqlite_decimal_regex = re.compile(
+    r"^\s*decimal(?:\s+text)?\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)\s*$", re.I
+)
+
+
+# the column type a Fixed Decimal column is written to sqlite with -- a
+# decimal(p,s) column has NUMERIC affinity, so sqlite would convert the
+# decimal strings to floats (which only keep 15 significant digits), but
+# "text" gives it TEXT affinity, so the strings are stored exactly
+def sqliteDecimalType(precision, scale):
+    return "decimal text({},{})".format(precision, scale)
+
+
+# a sqlite column type as it is reported (see Datafile.getMetadata) -- ie,
+# Fixed Decimal columns as decimal(p,s), however they were written
+def sqliteColumnType(type_name):
+    match = sqlite_decimal_regex.match(str(type_name))
+    if match is None:
+        return type_name
+    return "decimal({},{})".format(match.group(1), match.group(2))
+
+
+# an array of ints as int64 if they all fit, otherwise as python ints (object)
+def integerArray(values):
+    try:
+        return numpy.array(values, dtype=numpy.int64)
+    except OverflowError:
+        array = numpy.empty(len(values), dtype=object)
+        array[:] = [int(value) for value in values]
+        return array
+
+
+# a Fixed Decimal column's values as integers scaled by 10 ** scale (eg, 12.34
+# at scale 2 is 1234), and its nulls -- floats are rounded to the scale, ints
+# are multiplied by it (unless they are already scaled), and decimal.Decimal
+# values and strings are rounded exactly (half to even)
+def scaleFixedDecimalColumn(series, scale, scaled=False):
+    nulls = series.isna().values
+    factor = 10**scale
+    dtype = series.dtype
+    # (nulls are filled so the column can be cast, and ignored from then on)
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        values = series.to_numpy(dtype=numpy.int64, na_value=0)
+        if scaled:
+            return values, nulls
+        limit = numpy.iinfo(numpy.int64).max // factor
+        if len(values) == 0 or numpy.abs(values).max() <= limit:
+            return values * factor, nulls
+        return integerArray([int(value) * factor for value in values.tolist()]), nulls
+    if pd.api.types.is_float_dtype(dtype) and not scaled:
+        values = numpy.rint(series.to_numpy(dtype=numpy.float64, na_value=0) * factor)
+        if len(values) == 0 or numpy.abs(values).max() < 2**63:
+            return values.astype(numpy.int64), nulls
+        return integerArray([int(value) for value in values.tolist()]), nulls
+    # everything else one value at a time (exactly, with decimal)
+    exponent = decimal.Decimal(1).scaleb(-scale)
+    ints = []
+    for value, null in zip(series.tolist(), nulls):
+        if null:
+            ints.append(0)
+        elif scaled:
+            ints.append(int(value))
+        else:
+            if isinstance(value, float):
+                value = repr(value)
+            elif not isinstance(value, decimal.Decimal):
+                value = str(value).strip()
+            number = fixed_decimal_context.create_decimal(value)
+            ints.append(
+                int(
+                    number.quantize(exponent, context=fixed_decimal_context).scaleb(
+                        scale, context=fixed_decimal_context
+                    )
+                )
+            )
+    return integerArray(ints), nulls
+
+
+# a Fixed Decimal column as the exact decimal strings it is written as (None
+# for nulls) -- a Fixed Decimal's precision is its width, including the sign
+# and decimal point, so values wider than that are an error
+def encodeFixedDecimalColumn(series, precision, scale, scaled=False):
+    values, nulls = scaleFixedDecimalColumn(series, scale, scaled=scaled)
+    negative = values < 0
+    magnitude = numpy.abs(values)
+    strings = numpy.char.add(
+        numpy.where(negative, "-", ""), (magnitude // 10**scale).astype(str)
+    )
+    if scale > 0:
+        fractions = numpy.char.zfill((magnitude % 10**scale).astype(str), scale)
+        strings = numpy.char.add(numpy.char.add(strings, "."), fractions)
+    widths = numpy.char.str_len(strings)
+    too_wide = ~nulls & (widths > precision)
+    if too_wide.any():
+        raise ValueError(
+            "column {} has values too wide for Fixed Decimal {}.{} (eg, {})".format(
+                series.name, precision, scale, strings[too_wide][0]
+            )
+        )
+    encoded = strings.astype(object)
+    encoded[nulls] = None
+    return encoded
+
+
+# Fixed Decimal values as read (decimal strings, or floats, with nulls) as
+# integers scaled by 10 ** scale, and their nulls
+def unscaleFixedDecimalValues(series, scale):
+    nulls = series.isna().values
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        # (floats are already rounded -- they only need scaling)
+        values = series.to_numpy(dtype=numpy.float64, na_value=0)
+        return integerArray(numpy.rint(values * 10**scale).tolist()), nulls
+    strings = numpy.array(
+        ["0" if null else str(value) for value, null in zip(series.tolist(), nulls)],
+        dtype=str,
+    )
+    parts = numpy.char.partition(numpy.char.strip(strings), ".")
+    wholes, fractions = parts[:, 0], parts[:, 2]
+    try:
+        if len(strings) and numpy.char.str_len(fractions).max() > scale:
+            raise ValueError("more decimal places than the scale")
+        if scale > 0:
+            fractions = numpy.char.ljust(fractions, scale, "0")
+        negative = numpy.char.startswith(wholes, "-")
+        digits = numpy.char.add(numpy.char.lstrip(wholes, "+-"), fractions)
+        values = integerArray(digits.tolist())
+        values[negative] = -values[negative]
+    except ValueError:
+        # (eg, exponents, or more decimal places -- rounded exactly instead)
+        return (
+            scaleFixedDecimalColumn(pd.Series(strings, dtype=object), scale)[0],
+            nulls,
+        )
+    return values, nulls
+
+
+# a Fixed Decimal column as read, returned as floats, as integers scaled by
+# 10 ** scale (nullable Int64), or as decimal.Decimal values
+def decodeFixedDecimalColumn(series, scale, fixed_decimal="float"):
+    if fixed_decimal == "float":
+        return pd.to_numeric(series, errors="coerce").astype(numpy.float64)
+    values, nulls = unscaleFixedDecimalValues(series, scale)
+    if fixed_decimal == "scaled":
+        if values.dtype == numpy.int64:
+            values = pd.arrays.IntegerArray(values, nulls)
+        else:
+            values[nulls] = None
+        return pd.Series(values, index=series.index, name=series.name)
+    decoded = numpy.empty(len(values), dtype=object)
+    decoded[:] = [
+        (
+            None
+            if null
+            else decimal.Decimal(value).scaleb(-scale, context=fixed_decimal_context)
+        )
+        for value, null in zip(values.tolist(), nulls)
+    ]
+    return pd.Series(decoded, index=series.index, name=series.name)
+
+
+# the kinds of values held by the yxdb field types (see Datafile.columnKinds)
+yxdb_column_kinds = {
+    "bool": "bool",
+    "byte": "int",
+    "int16": "int",
+    "int32": "int",
+    "int64": "int",
+    "float": "float",
+    "double": "float",
+}
+
+
+# the yxdb field definitions (for AlteryxYXDB().create_from_dict) and the
+# python type each column's values are converted to, for a metadata dict
+def compileYxdbWritePlan(metadata, debug=False):
+    # prepare metadata dict for AlteryxYXDB().create_from_dict (list)
+    metadata_list = []
+    column_conversions = {}
+    pythontool_source = "PythonTool:"
+    for index, col in enumerate(metadata.keys()):
+        metadata_col = metadata[col]
+        if debug:
+            print("\n[Datafile.writeData] input column: {}".format(metadata_col))
+        field_name = col
+        alteryx_type = metadata_col["type"]
+        field_type = pyxdbLookupFieldTypeEnum(alteryx_type)
+        field_length = metadata_col["length"]
+        field_size = field_length[0]
+        if len(field_length) > 1:
+            field_scale = int(field_length[1])
+        else:
+            field_scale = -1
+        # prepare source metadata
+        if "source" in metadata_col:
+            source = metadata_col["source"]
+        else:
+            source = ""
+        if len(source) > 0:
+            if source[-1:] == ":":
+                source = "{}{}".format(source, pythontool_source)
+        else:
+            source = pythontool_source
+        if "description" in metadata_col:
+            description = metadata_col["description"]
+        else:
+            description = ""
+
+        yxdb_metadata = {
+            "name": field_name,
+            "type": field_type,
+            "size": field_size,
+            "scale": field_scale,
+            "source": source,
+            "description": description,
+        }
+
+        if alteryx_type == "Boolean":
+            column_conversions[index] = "bool"
+        elif alteryx_type in ("Byte", "Int16", "Int32", "Int64"):
+            column_conversions[index] = "int"
+        elif alteryx_type == "Fixed Decimal":
+            # (written as exact decimal strings -- see encodeFixedDecimalColumn)
+            column_conversions[index] = (
+                alteryx_type,
+                int(field_size),
+                max(field_scale, 0),
+                bool(metadata_col.get("scaled", False)),
+            )
+        elif alteryx_type in ("Float", "Double"):
+            column_conversions[index] = "float"
+        elif alteryx_type in yxdb_datetime_formats:
+            column_conversions[index] = alteryx_type
+        elif alteryx_type in ("Blob", "SpatialObj"):
+            # (memoryviews are copied to bytes a batch at a time -- see blobBatch)
+            column_conversions[index] = "blob"
+
+        if debug:
+            print("[Datafile.writeData] yxdb column: {}".format(yxdb_metadata))
+
+        metadata_list.append(yxdb_metadata)
+    return metadata_list, column_conversions
+
+
+# compiled yxdb write plans, by metadata (see Settings.write_plan_cache_size)
+yxdb_write_plans = OrderedDict()
+
+
+def yxdbWritePlan(metadata, debug=False):
+    try:
+        # (columns are in order -- only their attributes are sorted)
+        key = json.dumps(list(metadata.items()), sort_keys=True)
+    except (TypeError, ValueError):
+        key = None
+    if key is not None and key in yxdb_write_plans:
+        yxdb_write_plans.move_to_end(key)
+        metadata_list, column_conversions = yxdb_write_plans[key]
+    else:
+        metadata_list, column_conversions = compileYxdbWritePlan(metadata, debug=debug)
+        if key is not None and Settings.write_plan_cache_size > 0:
+            yxdb_write_plans[key] = (metadata_list, column_conversions)
+            while len(yxdb_write_plans) > Settings.write_plan_cache_size:
+                yxdb_write_plans.popitem(last=False)
+    # (copied, so the cached plan can't be changed by the write)
+    return [dict(field) for field in metadata_list], dict(column_conversions)
+
+
 class FileFormat:
     def __init__(self, filepath=None, fileformat=None):
         # metadata for data formats
@@ -30,11 +614,17 @@ class FileFormat:
             "sqlite": {"connection_class": sqlite3.Connection},
         }
         self.valid_formats = list(data_formats)
+        self.compression = None
 
         if filepath is not None:
             # if no fileformat provided, then try to guess based on the file extension
             # (either way, throw an error if invalid format)
             self.extension = filepath.split(".")[-1].lower()
+            # compressed files have the codec's extension after the format's
+            # (eg, output_1.sqlite.lz4)
+            self.compression = codecFromExtension(self.extension)
+            if self.compression is not None and len(filepath.split(".")) > 2:
+                self.extension = filepath.split(".")[-2].lower()
             if fileformat is None:
                 if self.extension in ("db"):
                     self.filetype = "sqlite"
@@ -73,10 +663,18 @@ class Datafile:
         temporary=False,
         fileformat=None,
         debug=None,
+        stats=None,
     ):
 
         fresh_dir = dir(self)
 
+        # stats for the read/write call this datafile is used for
+        # (see ayx.Stats -- all no-ops unless stats are enabled)
+        if stats is None:
+            self.stats = null_call_stats
+        else:
+            self.stats = stats
+
         # check debug parameter
         if debug is None:
             self.debug = False
@@ -155,7 +753,17 @@ class Datafile:
             raise TypeError("temporary parameter must be boolean")
 
         self.fileformat = FileFormat(self.filepath, fileformat)
+        # sqlite and yxdb files are read and written in place, so a compressed
+        # file is decompressed to (and compressed from) a local temp file
+        self.compression = self.fileformat.compression
+        if self.compression is None:
+            self.local_filepath = self.filepath
+        else:
+            self.local_filepath = None
         self.connection = None
+        # table names and metadata are cached for as long as the connection
+        # is open (a Datafile kept open by a session is read many times)
+        self.__clearMetadataCache()
 
         if self.debug:
             for key in dir(self):
@@ -168,7 +776,7 @@ class Datafile:
         return self
 
     def __exit__(self, type, value, traceback):
-        self.closeConnection()
+        self.closeConnection(compress=type is None)
         # if temporary file, attempt to clean up on exit
         if self.temporary:
             try:
@@ -191,7 +799,8 @@ class Datafile:
             if self.debug:
                 print("Attempting to open connection to {}".format(self.filepath))
             try:
-                self.connection = self.__returnConnection()
+                with self.stats.phase("open"):
+                    self.connection = self.__returnConnection()
                 if self.connection is None:
                     del self.connection
             except FileNotFoundError as e:
@@ -259,7 +868,7 @@ class Datafile:
                     raise ValueError(
                         "metadata not currently supported for creating an empty sqlite file"
                     )
-                connection = sqlite3.connect(self.filepath)
+                connection = sqlite3.connect(self.local_filepath)
                 connection.execute("select * from sqlite_master limit 1")
                 self.connection = connection
             elif self.fileformat.filetype == "yxdb":
@@ -298,7 +907,7 @@ class Datafile:
                     )
 
                 self.connection = pyxdb.AlteryxYXDB()
-                self.connection.create_from_dict(self.filepath, metadata)
+                self.connection.create_from_dict(self.local_filepath, metadata)
             else:
                 self.__formatNotSupportedYet()
 
@@ -334,7 +943,9 @@ class Datafile:
                         raise PermissionError(
                             "unable to write to filepath: {}".format(self.filepath)
                         )
-                    return None
+                if self.compression is not None:
+                    self.local_filepath = localTempFilepath(self.fileformat.filetype)
+                return None
 
             elif fileExists(
                 self.filepath, throw_error=not (self.create_new), msg=error_msg
@@ -342,12 +953,20 @@ class Datafile:
                 # open connection and attempt to read one row
                 # to confirm that it is a valid file
 
+                if self.compression is not None:
+                    with self.stats.phase("decompress"):
+                        self.local_filepath = localTempFilepath(
+                            self.fileformat.filetype
+                        )
+                        decompressFile(
+                            self.filepath, self.local_filepath, self.compression
+                        )
                 if self.fileformat.filetype == "sqlite":
-                    connection = sqlite3.connect(self.filepath)
+                    connection = sqlite3.connect(self.local_filepath)
                     connection.execute("select * from sqlite_master limit 1")
                 elif self.fileformat.filetype == "yxdb":
                     connection = pyxdb.AlteryxYXDB()
-                    connection.open(self.filepath)
+                    connection.open(self.local_filepath)
                     # test that its a real yxdb file
                     connection.get_num_records()
                 else:
@@ -358,6 +977,9 @@ class Datafile:
                 connection.close()
             except:
                 pass
+            if self.compression is not None and self.local_filepath is not None:
+                deleteFile(self.local_filepath, debug=self.debug)
+                self.local_filepath = None
             raise ConnectionError(fileErrorMsg(error_msg, self.filepath))
 
     # return table names in a list
@@ -367,21 +989,39 @@ class Datafile:
 
         self.__isConnectionOpen(error_if_closed=True)
         if self.fileformat.filetype == "sqlite":
-            return pd.read_sql_query(
-                "select name from sqlite_master where type='table'", self.connection
-            )["name"].tolist()
+            if self.__table_names is None:
+                self.__table_names = pd.read_sql_query(
+                    "select name from sqlite_master where type='table'",
+                    self.connection,
+                )["name"].tolist()
+            return list(self.__table_names)
         elif self.fileformat.filetype == "yxdb":
             # if yxdb, return the filename (without extension) as the one table
             filename = os.path.basename(self.filepath)
             table = os.path.splitext(filename)[0]
+            if self.compression is not None:
+                table = os.path.splitext(table)[0]
             return [table]
         else:
             self.__formatNotSupportedYet()
 
-    # close database connection
-    def closeConnection(self):
+    def __clearMetadataCache(self):
+        self.__table_names = None
+        self.__metadata_cache = {}
+        self.__record_meta = None
+
+    # raw yxdb record metadata (cached while the connection is open)
+    def __getRecordMeta(self):
+        if self.__record_meta is None:
+            self.__record_meta = self.connection.get_record_meta()
+        return self.__record_meta
+
+    # close database connection (and, if compressed, compress anything that
+    # was written -- unless compress=False, eg after an error)
+    def closeConnection(self, compress=True):
         if self.debug:
             print("Attempting to close connection to {}".format(self.filepath))
+        self.__clearMetadataCache()
         if hasattr(self, "connection"):
             if self.fileformat.filetype == "sqlite":
                 self.connection.close()
@@ -394,6 +1034,16 @@ class Datafile:
             else:
                 self.__formatNotSupportedYet()
             self.connection = None
+        if self.compression is not None and self.local_filepath is not None:
+            try:
+                if compress and self.create_new and os.path.isfile(self.local_filepath):
+                    with self.stats.phase("compress"):
+                        compressFile(
+                            self.local_filepath, self.filepath, self.compression
+                        )
+            finally:
+                deleteFile(self.local_filepath, debug=self.debug)
+                self.local_filepath = None
 
     def __validateTableName(self, table):
         if self.fileformat.filetype == "sqlite":
@@ -466,6 +1116,9 @@ class Datafile:
 
         self.__validateTableName(table)
 
+        if table in self.__metadata_cache:
+            return [dict(field) for field in self.__metadata_cache[table]]
+
         try:
             if self.fileformat.filetype == "sqlite":
                 query = "pragma table_info({})"
@@ -480,7 +1133,7 @@ class Datafile:
                     field_dict = {
                         "name": field["name"],
                         # type is a string concatenation of "{type} {size}.{scale}"
-                        "type": field["type"],
+                        "type": sqliteColumnType(field["type"]),
                         # source and description are lost/unavailable with sqlite
                         "source": "",
                         "description": "",
@@ -488,9 +1141,7 @@ class Datafile:
                     column_metadata_list.append(field_dict)
             elif self.fileformat.filetype == "yxdb":
 
-                # reset pointer back to first line
-                self.openConnection()
-                raw_metadata = self.connection.get_record_meta()
+                raw_metadata = self.__getRecordMeta()
 
                 # now massage the metadata returned into our expected format...
                 column_metadata_list = []
@@ -525,7 +1176,8 @@ class Datafile:
                         self.filepath,
                     )
                 )
-            return column_metadata_list
+            self.__metadata_cache[table] = column_metadata_list
+            return [dict(field) for field in column_metadata_list]
         except:
             print(
                 fileErrorMsg(
@@ -535,53 +1187,336 @@ class Datafile:
             )
             raise
 
-    def getData(self, table=None, batch_size=1):
+    # the scale of each Fixed Decimal column in a table
+    def fixedDecimalScales(self, table=None):
+        scales = {}
+        if self.fileformat.filetype == "yxdb":
+            self.__isConnectionOpen(error_if_closed=True)
+            for field in self.__getRecordMeta():
+                type_name = re.sub("[^a-z]", "", str(field["type"]).lower())
+                if type_name.endswith("fixeddecimal"):
+                    scales[field["name"]] = max(int(field["scale"]), 0)
+        else:
+            for field in self.getMetadata(table):
+                match = sqlite_decimal_regex.match(str(field["type"]))
+                if match is not None:
+                    scales[field["name"]] = int(match.group(2))
+        return scales
+
+    # the names of the Blob and SpatialObj columns in a table
+    def blobColumnNames(self, table=None):
+        if self.fileformat.filetype == "yxdb":
+            self.__isConnectionOpen(error_if_closed=True)
+            fields = self.__getRecordMeta()
+        else:
+            fields = self.getMetadata(table)
+        return [field["name"] for field in fields if isBlobType(field["type"])]
+
+    def getData(
+        self,
+        table=None,
+        batch_size="auto",
+        where=None,
+        fixed_decimal="float",
+        blobs="bytes",
+        rows=None,
+    ):
+        checkBatchSize(batch_size)
+        if where is not None:
+            checkWhere(where)
+        checkFixedDecimal(fixed_decimal)
+        checkBlobs(blobs)
+        if rows is not None:
+            checkRows(rows)
+        # (memory is only measured if enabled -- see ayx.Stats)
+        with self.stats.memory("getData"):
+            data = self.__getData(
+                table=table,
+                batch_size=batch_size,
+                where=where,
+                blobs=blobs,
+                rows=rows,
+            )
+            # fixed decimals are returned the same way whether they were
+            # stored as decimal strings or as floats
+            with self.stats.phase("dataframe"):
+                for column, scale in self.fixedDecimalScales(table).items():
+                    if column in data.columns:
+                        data[column] = decodeFixedDecimalColumn(
+                            data[column], scale, fixed_decimal
+                        )
+        self.stats.setColumnMemory(data)
+        return data
+
+    # split a table into n contiguous ranges of rows of about the same size
+    # -- (start, stop) rowids for sqlite, or record offsets for yxdb (a stop
+    # of None is the end of the table). any of them can then be read on its
+    # own with getData(rows=...)
+    def partitionRanges(self, n, table=None):
+        checkPartitionCount(n)
+        self.__isConnectionOpen(error_if_closed=True)
+        if self.fileformat.filetype == "yxdb":
+            num_records = self.connection.get_num_records()
+            starts = [num_records * index // n for index in range(n)]
+            return list(zip(starts, starts[1:] + [None]))
+        elif self.fileformat.filetype == "sqlite":
+            if table is None:
+                table = self.getSingularTable()
+            self.__validateTableName(table)
+            num_records, min_rowid, max_rowid = self.connection.execute(
+                "select count(*), min(rowid), max(rowid) from {}".format(table)
+            ).fetchone()
+            # (the position of the first record of each partition)
+            positions = [num_records * index // n for index in range(n)]
+            if num_records == 0:
+                starts = [0] * n
+            elif max_rowid - min_rowid + 1 == num_records:
+                # consecutive rowids (eg, any table written by to_sql) -- the
+                # boundaries are just offsets from the first one
+                starts = [min_rowid + position for position in positions]
+            else:
+                # otherwise, the rowids at the boundaries are found in one
+                # pass over the rowids, in order
+                starts = []
+                cursor = self.connection.execute(
+                    "select rowid from {} order by rowid".format(table)
+                )
+                try:
+                    for position, (rowid,) in enumerate(cursor):
+                        while len(starts) < n and positions[len(starts)] == position:
+                            starts.append(rowid)
+                        if len(starts) == n:
+                            break
+                finally:
+                    cursor.close()
+            return list(zip(starts, starts[1:] + [None]))
+        else:
+            self.__formatNotSupportedYet()
+
+    # the kind of values each column is declared to hold ("bool", "int",
+    # "float" or "bytes"), where the column type says (None otherwise)
+    def columnKinds(self, table=None):
+        kinds = {}
+        if self.fileformat.filetype == "yxdb":
+            self.__isConnectionOpen(error_if_closed=True)
+            for field in self.__getRecordMeta():
+                # (the type may be the extension's enum -- eg, "FieldType.int64")
+                type_name = str(field["type"]).split(".")[-1].strip().lower()
+                kinds[field["name"]] = yxdb_column_kinds.get(type_name)
+                if isBlobType(field["type"]):
+                    kinds[field["name"]] = "bytes"
+        else:
+            # (sqlite's type affinity rules)
+            for field in self.getMetadata(table):
+                type_name = str(field["type"]).lower()
+                if isBlobType(field["type"]):
+                    kinds[field["name"]] = "bytes"
+                elif "int" in type_name:
+                    kinds[field["name"]] = "int"
+                elif any(real in type_name for real in ["real", "floa", "doub"]):
+                    kinds[field["name"]] = "float"
+                else:
+                    kinds[field["name"]] = None
+        for column in self.fixedDecimalScales(table):
+            kinds[column] = "float"
+        return kinds
+
+    # read a table as a series of dataframes of (at most) chunk_rows records
+    # each -- fixed decimals are returned as floats
+    def iterData(self, table=None, chunk_rows=100000, where=None):
+        checkBatchSize(chunk_rows)
+        if where is not None:
+            checkWhere(where)
+        self.__isConnectionOpen(error_if_closed=True)
+        if table is None:
+            table = self.getSingularTable()
+        self.__validateTableName(table)
+        if where is not None:
+            self.__validateColumnNames(list(where), table)
+        scales = self.fixedDecimalScales(table)
+        if self.fileformat.filetype == "sqlite":
+            sql = "select * from {}".format(table)
+            parameters = None
+            if where is not None:
+                where_sql, parameters = whereClause(where)
+                sql = "{} where {}".format(sql, where_sql)
+            chunks = pd.read_sql_query(
+                sql, self.connection, params=parameters, chunksize=chunk_rows
+            )
+        elif self.fileformat.filetype == "yxdb":
+            chunks = self.__iterYxdbRecords(chunk_rows)
+        else:
+            self.__formatNotSupportedYet()
+        for chunk in chunks:
+            if where is not None and self.fileformat.filetype != "sqlite":
+                chunk = whereFilter(chunk, where)
+            for column, scale in scales.items():
+                chunk[column] = decodeFixedDecimalColumn(chunk[column], scale)
+            yield chunk
+
+    def __iterYxdbRecords(self, chunk_rows):
+        colnames = [col["name"] for col in self.getMetadata()]
+        num_records = self.connection.get_num_records()
+        if num_records > 0:
+            self.connection.go_record(0)
+        else:
+            yield pd.DataFrame([], columns=colnames)
+        i = 0
+        while i < num_records:
+            size = min(chunk_rows, num_records - i)
+            yield pd.DataFrame(self.connection.read_records(size), columns=colnames)
+            i += size
+
+    # read sqlite query results a batch at a time, moving the values of the
+    # blob columns into one buffer each as they are read (so the bytes
+    # objects of only one batch exist at a time)
+    def __readSqliteBlobs(self, sql, parameters, blob_columns):
+        cursor = self.connection.execute(sql, parameters or [])
+        try:
+            names = [description[0] for description in cursor.description]
+            blob_indexes = [
+                index for index, name in enumerate(names) if name in blob_columns
+            ]
+            packed = {index: BlobColumn() for index in blob_indexes}
+            rows = []
+            while True:
+                batch = cursor.fetchmany(Settings.blob_fetch_size)
+                if len(batch) == 0:
+                    break
+                for row in batch:
+                    row = list(row)
+                    for index in blob_indexes:
+                        packed[index].append(row[index])
+                        row[index] = None
+                    rows.append(row)
+                del batch
+        finally:
+            cursor.close()
+        # (built the way pd.read_sql_query builds its dataframe)
+        query_result = pd.DataFrame.from_records(rows, columns=names, coerce_float=True)
+        for index in blob_indexes:
+            query_result[names[index]] = packed[index].toSeries(
+                index=query_result.index
+            )
+        return query_result
+
+    def __getData(
+        self, table=None, batch_size="auto", where=None, blobs="bytes", rows=None
+    ):
         if self.debug:
             print('Attempting to get data from table "{}"'.format(table))
 
         self.__isConnectionOpen(error_if_closed=True)
 
         # if no table specified, check to see if there is only table and use that
-        if table is None:
-            table = self.getSingularTable()
+        with self.stats.phase("metadata"):
+            if table is None:
+                table = self.getSingularTable()
 
         self.__validateTableName(table)
+        if where is not None:
+            self.__validateColumnNames(list(where), table)
 
         # now that the table name has been retrieved, get the data as pandas df
         try:
             if self.fileformat.filetype == "sqlite":
-                query_result = pd.read_sql_query(
-                    "select * from {}".format(table), self.connection
-                )
+                sql = "select * from {}".format(table)
+                parameters = None
+                if where is not None:
+                    # (filtered by sqlite -- using an index if there is one)
+                    where_sql, parameters = whereClause(where)
+                    sql = "{} where {}".format(sql, where_sql)
+                if rows is not None:
+                    # (a range of rowids, in order -- see partitionRanges)
+                    sql = "{} {} {} order by rowid".format(
+                        sql, "and" if where is not None else "where", rowidClause(rows)
+                    )
+                blob_columns = []
+                if blobs == "memoryview":
+                    with self.stats.phase("metadata"):
+                        blob_columns = self.blobColumnNames(table)
+                with self.stats.phase("decode"):
+                    if len(blob_columns) > 0:
+                        query_result = self.__readSqliteBlobs(
+                            sql, parameters, blob_columns
+                        )
+                    else:
+                        # (pandas decodes and builds the dataframe in one step)
+                        query_result = pd.read_sql_query(
+                            sql, self.connection, params=parameters
+                        )
             elif self.fileformat.filetype == "yxdb":
                 # (another temporary solution)
                 # get metadata (column names)
                 # colnames = list(self.getMetadata()["name"])
-                colnames = [col["name"] for col in self.getMetadata()]
-                # reset pointer back to first line
-                self.openConnection()
+                with self.stats.phase("metadata"):
+                    colnames = [col["name"] for col in self.getMetadata()]
+                    blob_indexes = []
+                    if blobs == "memoryview":
+                        blob_indexes = [
+                            index
+                            for index, field in enumerate(self.__getRecordMeta())
+                            if isBlobType(field["type"])
+                        ]
+                packed = {index: BlobColumn() for index in blob_indexes}
+                # (only the records in the range of record offsets, if any --
+                # see partitionRanges)
+                first_record = 0
                 num_records = self.connection.get_num_records()
+                if rows is not None:
+                    first_record = min(rows[0], num_records)
+                    if rows[1] is not None:
+                        num_records = min(rows[1], num_records)
+                    num_records -= first_record
 
                 if num_records > 0:
-                    self.connection.go_record(0)
+                    self.connection.go_record(first_record)
 
                 # get number of records in dataset
                 # read in records in batch
-                i = 0
-                data = [None] * num_records
-                while i < num_records:
-                    if batch_size == 1:
-                        data[i] = self.connection.read_record()
-                    else:
-                        if i + batch_size < num_records:
-                            data[i : i + batch_size] = self.connection.read_records(
-                                batch_size
+                with self.stats.phase("decode"):
+                    # with batch_size="auto", size batches from the record
+                    # width and adjust them based on the measured throughput
+                    batch_sizer = None
+                    if batch_size == "auto":
+                        batch_sizer = BatchSizer(
+                            recordWidth(
+                                [
+                                    (field["type"], field["size"])
+                                    for field in self.__getRecordMeta()
+                                ]
                             )
+                        )
+                    i = 0
+                    data = [None] * num_records
+                    while i < num_records:
+                        if batch_sizer is not None:
+                            size = min(batch_sizer.batch_size, num_records - i)
                         else:
-                            data[i:] = self.connection.read_records(num_records - i)
-                    i += batch_size
-
-                query_result = pd.DataFrame(data, columns=colnames)
+                            size = min(batch_size, num_records - i)
+                        start = perf_counter()
+                        if batch_size == 1:
+                            data[i] = self.connection.read_record()
+                        else:
+                            data[i : i + size] = self.connection.read_records(size)
+                        if batch_sizer is not None:
+                            batch_sizer.update(size, perf_counter() - start)
+                        # (blobs are moved into their column's buffer as each
+                        # batch is read, rather than kept as bytes objects)
+                        for record in data[i : i + size] if blob_indexes else []:
+                            for index in blob_indexes:
+                                packed[index].append(record[index])
+                                record[index] = None
+                        i += size
+                    if batch_sizer is not None:
+                        self.stats.set(auto_batch_size=batch_sizer.batch_size)
+
+                with self.stats.phase("dataframe"):
+                    query_result = pd.DataFrame(data, columns=colnames)
+                    for index in blob_indexes:
+                        query_result[colnames[index]] = packed[index].toSeries(
+                            index=query_result.index
+                        )
 
                 # # get the actual data
                 # try:
@@ -613,6 +1548,15 @@ class Datafile:
             else:
                 self.__formatNotSupportedYet()
 
+            if where is not None and self.fileformat.filetype != "sqlite":
+                with self.stats.phase("dataframe"):
+                    query_result = whereFilter(query_result, where)
+
+            self.stats.set(
+                rows=query_result.shape[0],
+                columns=query_result.shape[1],
+                bytes=os.path.getsize(self.filepath),
+            )
             if self.debug:
                 print(
                     fileErrorMsg(
@@ -629,7 +1573,98 @@ class Datafile:
             )
             raise
 
-    def writeData(self, pandas_df, table, metadata=None, batch_size=1):
+    def __validateColumnNames(self, columns, table=None):
+        # (a yxdb file is its one table)
+        if self.fileformat.filetype == "yxdb":
+            table = None
+        column_names = [column["name"] for column in self.getMetadata(table)]
+        missing = [column for column in columns if column not in column_names]
+        if len(missing) > 0:
+            raise ValueError(
+                fileErrorMsg(
+                    "Column(s) not found: {} (columns are: {})".format(
+                        missing, column_names
+                    ),
+                    self.filepath,
+                )
+            )
+
+    # name of an existing index usable for equality lookups on all of the
+    # columns (its leading columns are the same columns), or None
+    def findIndex(self, columns, table=None):
+        if self.fileformat.filetype != "sqlite":
+            return None
+        self.__isConnectionOpen(error_if_closed=True)
+        if table is None:
+            table = self.getSingularTable()
+        columns = set(columns)
+        indexes = self.connection.execute(
+            "pragma index_list({})".format(quoteIdentifier(table))
+        ).fetchall()
+        for index in indexes:
+            index_name = index[1]
+            index_columns = [
+                info[2]
+                for info in self.connection.execute(
+                    "pragma index_info({})".format(quoteIdentifier(index_name))
+                ).fetchall()
+            ]
+            if set(index_columns[: len(columns)]) == columns:
+                return index_name
+        return None
+
+    # create an index on columns of a sqlite table (if there isn't one already)
+    # and return its name
+    def createIndex(self, columns, table=None):
+        if self.debug:
+            print("Attempting to create an index on {}".format(columns))
+        if self.fileformat.filetype != "sqlite" or self.compression is not None:
+            raise ValueError(
+                fileErrorMsg(
+                    "Indexes can only be created on (uncompressed) sqlite files",
+                    self.filepath,
+                )
+            )
+        self.__isConnectionOpen(error_if_closed=True)
+        if isinstance(columns, str):
+            columns = [columns]
+        if not isinstance(columns, list) or not all(
+            isinstance(column, str) for column in columns
+        ):
+            raise TypeError("columns must be a column name or list of column names")
+        if len(columns) == 0:
+            raise ValueError("columns must include at least one column name")
+        if table is None:
+            table = self.getSingularTable()
+        self.__validateTableName(table)
+        self.__validateColumnNames(columns, table)
+
+        index_name = self.findIndex(columns, table)
+        if index_name is not None:
+            return index_name
+        index_name = "__".join(["ayx_index", table] + columns)
+        with self.stats.phase("index"):
+            self.connection.execute(
+                "create index if not exists {} on {} ({})".format(
+                    quoteIdentifier(index_name),
+                    quoteIdentifier(table),
+                    ", ".join(quoteIdentifier(column) for column in columns),
+                )
+            )
+            self.connection.commit()
+        return index_name
+
+    def writeData(self, pandas_df, table, metadata=None, batch_size="auto"):
+        checkBatchSize(batch_size)
+        # (memory is only measured if enabled -- see ayx.Stats)
+        with self.stats.memory("writeData"):
+            data = self.__writeData(
+                pandas_df, table, metadata=metadata, batch_size=batch_size
+            )
+        self.stats.setColumnMemory(pandas_df)
+        return data
+
+    def __writeData(self, pandas_df, table, metadata=None, batch_size="auto"):
         if self.debug:
             print(
                 '[CachedData.writeData] Attempting to write data to table "{}"'.format(
@@ -637,9 +1672,12 @@ class Datafile:
                 )
             )
             print("[Datafile.writeData] metadata: {}".format(metadata))
+        # (the tables and their metadata are about to change)
+        self.__clearMetadataCache()
         try:
             if self.fileformat.filetype == "sqlite":
-                self.__createConnection()
+                with self.stats.phase("open"):
+                    self.__createConnection()
 
                 # prepare dtype arg for pandas
                 dtypes = {}
@@ -657,112 +1695,146 @@ class Datafile:
                 if len(dtypes.keys()) == 0:
                     dtypes = None
 
+                # fixed decimals are written as exact decimal strings, in
+                # columns that sqlite stores them as text in (see
+                # sqliteDecimalType) -- they're parsed back exactly on read
+                decimal_columns = {}
+                for name, type_length in (dtypes or {}).items():
+                    match = sqlite_decimal_regex.match(str(type_length))
+                    if match is not None and name in pandas_df.columns:
+                        precision, scale = int(match.group(1)), int(match.group(2))
+                        dtypes[name] = sqliteDecimalType(precision, scale)
+                        decimal_columns[name] = encodeFixedDecimalColumn(
+                            pandas_df[name],
+                            precision,
+                            scale,
+                            scaled=any(
+                                col_metadata.get("scaled", False)
+                                and col_metadata.get("name", col) == name
+                                for col, col_metadata in metadata.items()
+                            ),
+                        )
+                # timezone-aware datetimes are written as naive UTC times, as
+                # they are to yxdb (see naiveDatetimeColumn)
+                converted_columns = {
+                    name: naiveDatetimeColumn(pandas_df[name])
+                    for name in pandas_df.columns
+                    if isTimezoneAware(pandas_df[name])
+                }
+                converted_columns.update(decimal_columns)
+                # (the dataframe that was passed in is still the one returned)
+                sqlite_df = pandas_df
+                if len(converted_columns) > 0:
+                    sqlite_df = pandas_df.assign(**converted_columns)
+
                 if self.debug:
                     print("[Datafile.writeData] dtypes: {}".format(dtypes))
 
                 # write to database
-                pandas_df.to_sql(
-                    table,
-                    self.connection,
-                    if_exists="replace",
-                    index=False,
-                    dtype=dtypes,
-                )
+                with self.stats.phase("write"):
+                    sqlite_df.to_sql(
+                        table,
+                        self.connection,
+                        if_exists="replace",
+                        index=False,
+                        dtype=dtypes,
+                    )
             elif self.fileformat.filetype == "yxdb":
-                # prepare metadata dict for AlteryxYXDB().create_from_dict (list)
-                metadata_list = []
-                column_conversions = {}
-                pythontool_source = "PythonTool:"
-                for index, col in enumerate(metadata.keys()):
-                    metadata_col = metadata[col]
-                    if self.debug:
-                        print(
-                            "\n[Datafile.writeData] input column: {}".format(
-                                metadata_col
-                            )
-                        )
-                    field_name = col
-                    alteryx_type = metadata_col["type"]
-                    field_type = pyxdbLookupFieldTypeEnum(alteryx_type)
-                    field_length = metadata_col["length"]
-                    field_size = field_length[0]
-                    if len(field_length) > 1:
-                        field_scale = int(field_length[1])
-                    else:
-                        field_scale = -1
-                    # prepare source metadata
-                    if "source" in metadata_col:
-                        source = metadata_col["source"]
-                    else:
-                        source = ""
-                    if len(source) > 0:
-                        if source[-1:] == ":":
-                            source = "{}{}".format(source, pythontool_source)
-                    else:
-                        source = pythontool_source
-                    if "description" in metadata_col:
-                        description = metadata_col["description"]
-                    else:
-                        description = ""
-
-                    yxdb_metadata = {
-                        "name": field_name,
-                        "type": field_type,
-                        "size": field_size,
-                        "scale": field_scale,
-                        "source": source,
-                        "description": description,
-                    }
-
-                    if alteryx_type == "Boolean":
-                        column_conversions[index] = "bool"
-                    elif alteryx_type in ("Byte", "Int16", "Int32", "Int64"):
-                        column_conversions[index] = "int"
-                    elif alteryx_type in ("Float", "Fixed Decimal", "Double"):
-                        column_conversions[index] = "float"
-
-                    if self.debug:
-                        print(
-                            "[Datafile.writeData] yxdb column: {}".format(yxdb_metadata)
-                        )
-
-                    metadata_list.append(yxdb_metadata)
+                metadata_list, column_conversions = yxdbWritePlan(
+                    metadata, debug=self.debug
+                )
                 if self.debug:
                     print("\nmetadata_list: {}".format(metadata_list))
                     print("\ncolumn_conversions: {}".format(column_conversions))
 
                 try:
-                    self.__createConnection(metadata_list)
-                    row_count = pandas_df.shape[0]
-                    if self.debug:
-                        print("[Datafile.writeData] row count: {}".format(row_count))
-                    rows_i = 0
-                    for i in range(row_count):
+                    with self.stats.phase("open"):
+                        self.__createConnection(metadata_list)
+                    with self.stats.phase("write"):
+                        row_count = pandas_df.shape[0]
                         if self.debug:
-                            print("[Datafile.writeData] i: {}".format(i))
-
-                        # get row (as list) from pandas dataframe
-                        row = list(pandas_df.iloc[i])
-                        # convert numeric types to base python (instead of numpy types, which are used by pandas)
-                        for col_i in column_conversions:
-                            if pd.isnull(row[col_i]):
-                                row[col_i] = None
+                            print(
+                                "[Datafile.writeData] row count: {}".format(row_count)
+                            )
+                        # with batch_size="auto", size batches from the
+                        # record width and adjust them based on the measured
+                        # throughput
+                        batch_sizer = None
+                        if batch_size == "auto":
+                            batch_sizer = BatchSizer(
+                                recordWidth(
+                                    [
+                                        (field["type"], field["size"])
+                                        for field in metadata_list
+                                    ]
+                                )
+                            )
+                        # the columns' nulls are found once, up front, but
+                        # their values are converted (and nulls replaced with
+                        # None) a block of at least write_encode_rows records
+                        # at a time -- so only one block is ever held as
+                        # python objects, and small batches are sliced from it
+                        columns = [
+                            pandas_df.iloc[:, col_i]
+                            for col_i in range(pandas_df.shape[1])
+                        ]
+                        column_nulls = [column.isna().values for column in columns]
+                        encoded_columns = []
+                        block_start = block_stop = 0
+                        i = 0
+                        while i < row_count:
+                            if batch_sizer is not None:
+                                size = min(batch_sizer.batch_size, row_count - i)
+                            else:
+                                size = min(batch_size, row_count - i)
+                            if self.debug:
+                                print(
+                                    "[Datafile.writeData] rows: {} to {}".format(
+                                        i, i + size - 1
+                                    )
+                                )
+                            if i + size > block_stop:
+                                # (the previous block is dropped first)
+                                encoded_columns = []
+                                block_start = i
+                                block_stop = i + max(size, Settings.write_encode_rows)
+                                encoded_columns = [
+                                    encodeColumn(
+                                        column.iloc[block_start:block_stop],
+                                        column_conversions.get(col_i),
+                                        nulls=column_nulls[col_i][
+                                            block_start:block_stop
+                                        ],
+                                    )
+                                    for col_i, column in enumerate(columns)
+                                ]
+                            batch_columns = [
+                                encoded[i - block_start : i - block_start + size]
+                                for encoded in encoded_columns
+                            ]
+                            for col_i in range(len(columns)):
+                                if column_conversions.get(col_i) == "blob":
+                                    batch_columns[col_i] = blobBatch(
+                                        batch_columns[col_i]
+                                    )
+                            if len(batch_columns) > 0:
+                                rows = [list(row) for row in zip(*batch_columns)]
+                            else:
+                                rows = [[] for _ in range(size)]
+                            del batch_columns
+
+                            # (only the extension call is timed -- that's the
+                            # part that the batch size makes a difference to)
+                            start = perf_counter()
+                            if batch_size == 1:
+                                self.connection.append_record(rows[0])
                             else:
-                                row[col_i] = getattr(
-                                    builtins, column_conversions[col_i]
-                                )(row[col_i])
-
-                        if batch_size == 1:
-                            self.connection.append_record(row)
-                        else:
-                            if rows_i == 0:
-                                rows = [None] * batch_size
-                            rows[rows_i] = row
-                            rows_i += 1
-                            if rows_i == batch_size:
                                 self.connection.append_records(rows)
-                            elif i == row_count - 1:
-                                self.connection.append_records(rows[:rows_i])
+                            if batch_sizer is not None:
+                                batch_sizer.update(size, perf_counter() - start)
+                            i += size
+                        if batch_sizer is not None:
+                            self.stats.set(auto_batch_size=batch_sizer.batch_size)
                 except:
                     raise
                 finally:
@@ -772,6 +1844,7 @@ class Datafile:
                         pass
             else:
                 self.__formatNotSupportedYet()
+            self.stats.set(rows=pandas_df.shape[0], columns=pandas_df.shape[1])
             if self.debug:
                 print(
                     fileErrorMsg(
@@ -787,3 +1860,37 @@ class Datafile:
                 )
             )
             raise
+
+
+class Partition:
+    """
+    One of the contiguous ranges of rows that an input is split into by
+    Alteryx.readPartitions -- just the file, the table, and the range of rows
+    (rowids for sqlite, record offsets for yxdb), so it can be pickled and
+    sent to a worker process. read() then opens the file and reads only those
+    rows.
+    """
+
+    def __init__(self, filepath, filetype, table, rows, index=0, count=1):
+        self.filepath = filepath
+        self.filetype = filetype
+        self.table = table
+        self.rows = checkRows(rows)
+        self.index = index
+        self.count = count
+
+    def __repr__(self):
+        return "<Partition {} of {}: rows {} of {}>".format(
+            self.index + 1, self.count, self.rows, self.filepath
+        )
+
+    def read(self, batch_size="auto", where=None, fixed_decimal="float", blobs="bytes"):
+        with Datafile(self.filepath, create_new=False, fileformat=self.filetype) as db:
+            return db.getData(
+                table=self.table,
+                batch_size=batch_size,
+                where=where,
+                fixed_decimal=fixed_decimal,
+                blobs=blobs,
+                rows=self.rows,
+            )
@@ -13,19 +13,19 @@
 # under the License.
 
 
-import sys, json
+import io, os, sys, json, pickle, base64, copyreg, weakref
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
 from os.path import abspath
 from re import findall
 from functools import reduce
 from ayx.helpers import convertObjToStr, fileExists, isDictMappingStrToStr
 from ayx.Datafiles import FileFormat
+from ayx.Compression import checkCompression
 from ayx.Compiled import pyxdb
 from ayx import Settings
-from IPython.display import set_matplotlib_close
-from IPython import get_ipython
 
 
 # temp replacement for sys.stdout (write method does nothing)
@@ -34,81 +34,245 @@ class NullWriter(object):
         pass
 
 
-# setup matplotlib for export to datastream
-set_matplotlib_close(False)
-try:
-    get_ipython().run_line_magic("matplotlib", "inline")
-except AttributeError:
-    pass  # running outside of jupyter (eg, cmd line tests)
+# plots are rendered once, straight to png bytes in memory with the agg
+# canvas (matplotlib is slow to import, so it's only imported when a plot is
+# written) -- and if Settings.plot_cache_size is set, the last few rendered
+# figures are cached by a hash of their state, so writing out an unchanged
+# figure again skips rendering it
+rendered_plots = OrderedDict()
 
+# the figures that have been rendered (only these can be in the cache -- a
+# figure's state changes when it's drawn, and the cache is keyed by the
+# state it's in after drawing)
+rendered_figures = weakref.WeakSet()
+
+
+# a file-like object that hashes what is written to it (so a pickle can be
+# hashed without holding all of it in memory)
+class HashWriter(object):
+    def __init__(self):
+        self.hash = blake2b()
+
+    def write(self, data):
+        self.hash.update(data)
+
+
+# hash of a figure's pickled state (the callback registries are left out --
+# they hold a counter that changes every time the figure is pickled)
+def figureHash(matplotlib_figure):
+    import matplotlib.cbook
+
+    writer = HashWriter()
+    pickler = pickle.Pickler(writer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[matplotlib.cbook.CallbackRegistry] = lambda obj: (
+        str,
+        ("CallbackRegistry",),
+    )
+    try:
+        pickler.dump(matplotlib_figure)
+    except Exception:
+        return None  # figures that can't be pickled are always re-rendered
+    return writer.hash.hexdigest()
 
-def savePlotToFile(matplotlib_figure, filepath):
-    abs_filepath = abspath(filepath)
 
-    # turn off printing (savefig is annoying)
-    # nullwrite = NullWriter()
-    # oldstdout = sys.stdout
-    # sys.stdout = nullwrite
-    # save plot as image
-    success = False
+def plotCacheEnabled():
+    return Settings.plot_cache_size is not None and Settings.plot_cache_size > 0
+
+
+def cachePlot(figure_hash, png_bytes):
+    if figure_hash is None or not plotCacheEnabled():
+        return
+    rendered_plots[figure_hash] = png_bytes
+    while len(rendered_plots) > Settings.plot_cache_size:
+        rendered_plots.popitem(last=False)
+
+
+def cachedPlot(figure_hash):
+    if figure_hash is None or figure_hash not in rendered_plots:
+        return None
+    rendered_plots.move_to_end(figure_hash)
+    return rendered_plots[figure_hash]
+
+
+# render a figure to png bytes (no caching)
+def renderPng(matplotlib_figure):
+    buffer = io.BytesIO()
+    savefig_args = {"format": "png", "bbox_inches": "tight", "pad_inches": 0}
     try:
-        # matplotlib.use('Agg')
-        # figure = matplotlib_pyplot.gcf()
-        # matplotlib_pyplot.show()
-        # matplotlib_pyplot.draw()
-        # matplotlib_pyplot.savefig(abs_filepath, format='png')
-        # matplotlib_pyplot.plot()
-
-        # figure = matplotlib_pyplot.gcf()
-        # figure = matplotlib.pyplot.gcf()
-        matplotlib_figure.savefig(
-            abs_filepath, format="png", bbox_inches="tight", pad_inches=0
+        matplotlib_figure.savefig(buffer, backend="agg", **savefig_args)
+    except TypeError:
+        # matplotlib < 3.1 has no backend argument (png is rendered by agg)
+        buffer = io.BytesIO()
+        matplotlib_figure.savefig(buffer, **savefig_args)
+    return buffer.getvalue()
+
+
+def renderPlot(matplotlib_figure):
+    if not plotCacheEnabled():
+        return renderPng(matplotlib_figure)
+    # (a figure that hasn't been rendered can't be in the cache, so it's only
+    # hashed once it has been)
+    if matplotlib_figure in rendered_figures:
+        png_bytes = cachedPlot(figureHash(matplotlib_figure))
+        if png_bytes is not None:
+            return png_bytes
+    png_bytes = renderPng(matplotlib_figure)
+    rendered_figures.add(matplotlib_figure)
+    # drawing a figure updates its state, so it's hashed after rendering
+    # (that's the state it will be in if it's written out again unchanged)
+    cachePlot(figureHash(matplotlib_figure), png_bytes)
+    return png_bytes
+
+
+# runs in a worker process: unpickle a figure and render it (with the agg
+# backend -- a worker has no display, and the notebook backend isn't needed)
+def renderPickledPlot(pickled_figure):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    matplotlib_figure = pickle.loads(pickled_figure)
+    png_bytes = renderPng(matplotlib_figure)
+    if "matplotlib.pyplot" in sys.modules:
+        sys.modules["matplotlib.pyplot"].close(matplotlib_figure)
+    return png_bytes
+
+
+# render a list of figures, in parallel worker processes when there are
+# enough of them to be worth starting the workers for (figures that can't be
+# pickled, or a single process, fall back to rendering them one at a time)
+def renderPlots(matplotlib_figures, processes=None):
+    if processes is None:
+        processes = Settings.plot_processes
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    png_bytes = [None] * len(matplotlib_figures)
+    to_render = []
+    for index, figure in enumerate(matplotlib_figures):
+        if plotCacheEnabled() and figure in rendered_figures:
+            png_bytes[index] = cachedPlot(figureHash(figure))
+        if png_bytes[index] is None:
+            to_render.append(index)
+
+    pickled_figures = None
+    if processes > 1 and len(to_render) >= Settings.plot_parallel_min:
+        try:
+            pickled_figures = [
+                pickle.dumps(matplotlib_figures[index]) for index in to_render
+            ]
+        except Exception:
+            pickled_figures = None
+
+    if pickled_figures is None:
+        for index in to_render:
+            png_bytes[index] = renderPlot(matplotlib_figures[index])
+        return png_bytes
+
+    processes = min(processes, len(to_render))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        rendered = executor.map(
+            renderPickledPlot,
+            pickled_figures,
+            chunksize=max(len(to_render) // (processes * 4), 1),
         )
+        # (the figures weren't drawn in this process, so they aren't cached)
+        for index, figure_png_bytes in zip(to_render, rendered):
+            png_bytes[index] = figure_png_bytes
+    return png_bytes
 
-        # display image
-        img = mpimg.imread(abs_filepath)
-        imgplot = plt.imshow(img)
-        plt.axis("off")
-        plt.title(None)
-        set_matplotlib_close(False)
-        plt.show()
-        # plt.draw()
-
-        # matplotlib_pyplot.show();
-        # matplotlib_pyplot.close()
-        success = True
-    except Exception as err:
-        error = err
-    # turn back on printing
-    finally:
-        # sys.stdout = oldstdout
-        pass
 
-    # # turn off printing (savefig is annoying)
-    # nullwrite = NullWriter()
-    # oldstdout = sys.stdout
-    # sys.stdout = nullwrite
-    # # save plot as image
-    # success = False
-    # try:
-    #     matplotlib.use('Agg')
-    #     matplotlib_pyplot.savefig(abs_filepath)
-    #     # matplotlib_pyplot.close()
-    #     success = True
-    # except Exception as err:
-    #     pass
-    # # turn back on printing
-    # finally:
-    #     sys.stdout = oldstdout
-
-    # if success, return filepath
-    if success:
-        return abs_filepath
-    # otherwise, throw error
-    # (this control flow is a little funky to ensure printing is turned back on
-    #  prior to throwing error)
-    else:
-        raise error
+# true when running in a jupyter kernel (eg, the interactive notebook) --
+# IPython is only imported here if something else already imported it
+def isInteractive():
+    if "IPython" not in sys.modules:
+        return False
+    from IPython import get_ipython
+
+    return get_ipython() is not None
+
+
+# show a preview of a rendered plot (only when running interactively)
+def displayPlot(png_bytes):
+    if not isInteractive():
+        return False
+    from IPython.display import display, Image
+
+    display(Image(data=png_bytes, format="png"))
+    return True
+
+
+def plotDataUri(png_bytes):
+    return "data:image/png;base64,{}".format(
+        base64.b64encode(png_bytes).decode("ascii")
+    )
+
+
+def savePngToFile(png_bytes, filepath):
+    abs_filepath = abspath(filepath)
+    with open(abs_filepath, "wb") as fp:
+        fp.write(png_bytes)
+    return abs_filepath
+
+
+def savePlotToFile(matplotlib_figure, filepath):
+    png_bytes = renderPlot(matplotlib_figure)
+    abs_filepath = savePngToFile(png_bytes, filepath)
+    displayPlot(png_bytes)
+    return abs_filepath
+
+
+def isMemoryviewColumn(series):
+    values = series.notna().values
+    return values.any() and isinstance(series.iat[values.argmax()], memoryview)
+
+
+# fingerprint of a dataframe's content (values, index, column names and
+# dtypes) and of anything else it is written with (eg, its metadata) -- None
+# if its values can't be hashed
+def dataFingerprint(pandas_df, *written_with):
+    # (pandas can't hash memoryviews -- eg, blobs read with
+    # blobs="memoryview" -- so those columns are hashed value by value,
+    # without copying them)
+    memoryview_columns = [
+        index
+        for index, dtype in enumerate(pandas_df.dtypes)
+        if dtype == object and isMemoryviewColumn(pandas_df.iloc[:, index])
+    ]
+    other_columns = [
+        index for index in range(pandas_df.shape[1]) if index not in memoryview_columns
+    ]
+    try:
+        if len(other_columns) > 0:
+            row_hashes = pd.util.hash_pandas_object(
+                pandas_df.iloc[:, other_columns], index=True
+            )
+        else:
+            row_hashes = pd.util.hash_pandas_object(pandas_df.index)
+    except (TypeError, ValueError):
+        # (eg, unhashable values, or writable memoryviews)
+        return None
+    fingerprint = blake2b(digest_size=20)
+    fingerprint.update(row_hashes.values.tobytes())
+    for index in memoryview_columns:
+        for value in pandas_df.iloc[:, index].tolist():
+            if isinstance(value, memoryview):
+                fingerprint.update(str(value.nbytes).encode("utf-8"))
+                fingerprint.update(value)
+            else:
+                fingerprint.update(repr(value).encode("utf-8"))
+    fingerprint.update(
+        json.dumps(
+            [
+                [str(column) for column in pandas_df.columns],
+                [str(dtype) for dtype in pandas_df.dtypes],
+                written_with,
+            ],
+            sort_keys=True,
+            default=str,
+        ).encode("utf-8")
+    )
+    return fingerprint.hexdigest()
 
 
 class MetadataTools:
@@ -176,7 +340,9 @@ class MetadataTools:
                 "expected_length_dim": 0,
                 "default_length": (None,),
             },
-            "datetime64[ns]": {
+            # (any datetime64 dtype -- eg, datetime64[ns] or datetime64[ns, UTC]
+            # -- the resolution and timezone in brackets aren't a length)
+            "datetime64": {
                 "conversion_types": {"yxdb": ["DateTime"]},
                 "expected_length_dim": 0,
                 "default_length": (None,),
@@ -990,20 +1156,23 @@ class Config:
         self.input_file_map = jupyter_pipes_dict["input_map"]
         self.constant_map = jupyter_pipes_dict["constant_map"]
         self.temp_file_format = jupyter_pipes_dict["temp_file_format"]
+        self.temp_file_compression = jupyter_pipes_dict["temp_file_compression"]
 
         if len(self.constant_map) == 0:
             raise LookupError(
                 "You must run the workflow first to make cached data and workflow constants available to the Python tool"
             )
 
-    def setTempFormatAs(self, temp_format):
+    def setTempFormatAs(self, temp_format, compression=None):
         if self.debug:
             print("Attempting to write config file ({})".format(self.absolute_path))
 
         try:
             self.__verifyTempFileFormat(temp_format)
+            checkCompression(compression)
             config = self.__getConfigJSON()
             config["temp_file_format"] = temp_format
+            config["temp_file_compression"] = compression
             with open(self.absolute_path, "w") as fp:
                 json.dump(config, fp)
             if self.debug:
@@ -1087,10 +1256,17 @@ class Config:
                 self.setTempFormatAs(temp_file_format)
             self.__verifyTempFileFormat(temp_file_format)
 
+            if "temp_file_compression" in config:
+                temp_file_compression = config["temp_file_compression"]
+            else:
+                temp_file_compression = Settings.default_temp_file_compression
+            checkCompression(temp_file_compression)
+
             return {
                 "input_map": input_map,
                 "constant_map": constant_map,
                 "temp_file_format": temp_file_format,
+                "temp_file_compression": temp_file_compression,
             }
         except:
             print("Config file error -- {}".format(self.absolute_path))
@@ -0,0 +1,264 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os, shutil, tempfile, weakref
+import numpy
+import pandas as pd
+from ayx import Settings
+
+### out-of-core reads: the input is decoded a chunk at a time, and each
+### column is appended to files in a scratch directory -- numbers as raw
+### arrays that are then memory mapped (so they are paged in from disk as
+### they are used), and strings and blobs as their utf-8 (or raw) bytes
+### back to back with arrays of their offsets and lengths
+
+# numpy dtypes of the columns stored as raw arrays
+column_dtypes = {"bool": numpy.bool_, "int": numpy.int64, "float": numpy.float64}
+
+
+# the kind of values in a column of the first chunk (where the column type
+# doesn't say -- see Datafile.columnKinds)
+def inferColumnKind(series):
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(series.dtype):
+        return "float"
+    values = series.dropna()
+    if len(values) > 0 and all(
+        isinstance(value, (bytes, bytearray, memoryview)) for value in values
+    ):
+        return "bytes"
+    return "text"
+
+
+def columnFilename(directory, index, suffix):
+    return os.path.join(directory, "column_{}.{}".format(index, suffix))
+
+
+# append a chunk of a column to its files
+def appendColumn(directory, index, kind, series):
+    nulls = series.isna().values
+    if kind in column_dtypes:
+        try:
+            # (floats keep their nulls as NaN -- others have a nulls file)
+            values = series.to_numpy(
+                dtype=column_dtypes[kind],
+                na_value=numpy.nan if kind == "float" else 0,
+            )
+        except (TypeError, ValueError) as error:
+            raise ValueError(
+                "column {} can't be read out of core as {} values: {}".format(
+                    series.name, kind, error
+                )
+            )
+        with open(columnFilename(directory, index, "values"), "ab") as values_file:
+            values.tofile(values_file)
+        if kind != "float":
+            with open(columnFilename(directory, index, "nulls"), "ab") as nulls_file:
+                nulls.tofile(nulls_file)
+        return
+    if kind == "text":
+        encoded = [
+            None if null else str(value).encode("utf-8")
+            for value, null in zip(series.tolist(), nulls)
+        ]
+    else:
+        encoded = [
+            None if null else value for value, null in zip(series.tolist(), nulls)
+        ]
+    lengths = numpy.array(
+        [-1 if value is None else memoryview(value).nbytes for value in encoded],
+        dtype=numpy.int64,
+    )
+    with open(columnFilename(directory, index, "data"), "ab") as data_file:
+        # (the offset of each value in the data file is stored as well, so a
+        # slice of rows can be read without summing the lengths before it)
+        sizes = numpy.maximum(lengths, 0)
+        offsets = data_file.tell() + numpy.cumsum(sizes) - sizes
+        for value in encoded:
+            if value is not None:
+                data_file.write(value)
+    with open(columnFilename(directory, index, "lengths"), "ab") as lengths_file:
+        lengths.tofile(lengths_file)
+    with open(columnFilename(directory, index, "offsets"), "ab") as offsets_file:
+        offsets.astype(numpy.int64).tofile(offsets_file)
+
+
+# memory map a column file (read only -- empty files can't be mapped)
+def mapColumnFile(filename, dtype):
+    if os.path.getsize(filename) == 0:
+        return numpy.empty(0, dtype=dtype)
+    return numpy.memmap(filename, dtype=dtype, mode="r")
+
+
+def removeDirectory(directory):
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class MemmapFrame:
+    """
+    A table read out of core (see Alteryx.read): each column is kept in files
+    in a scratch directory, and frame["column"] returns it as a pandas Series.
+    Numeric columns are memory mapped rather than loaded, so column-wise
+    operations -- eg, frame["amount"].sum() -- work on inputs larger than
+    memory. Text columns are decoded when they are accessed, and Blob and
+    SpatialObj columns are memoryviews into the mapped file. Use chunks() to
+    process all of the columns a slice of rows at a time. The scratch
+    directory is removed by close(), or when the frame is garbage collected.
+    """
+
+    def __init__(self, directory, columns, kinds, rows):
+        self.directory = directory
+        self.columns = list(columns)
+        self.kinds = dict(kinds)
+        self.rows = rows
+        self.__finalizer = weakref.finalize(self, removeDirectory, directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    @property
+    def shape(self):
+        return (self.rows, len(self.columns))
+
+    def __repr__(self):
+        return "<MemmapFrame: {} rows x {} columns in {}>".format(
+            self.rows, len(self.columns), self.directory
+        )
+
+    def __getitem__(self, column):
+        return self.column(column)
+
+    # a column (or the rows from start up to stop of it) as a pandas series
+    def column(self, column, start=None, stop=None):
+        if column not in self.columns:
+            raise KeyError(column)
+        index = self.columns.index(column)
+        kind = self.kinds[column]
+        rows = slice(start, stop)
+        if kind in column_dtypes:
+            values = mapColumnFile(
+                columnFilename(self.directory, index, "values"), column_dtypes[kind]
+            )[rows]
+            if kind != "float":
+                nulls = mapColumnFile(
+                    columnFilename(self.directory, index, "nulls"), numpy.bool_
+                )[rows]
+                # (only nullable if there are nulls -- otherwise the series
+                # is the memory mapped array itself)
+                if nulls.any():
+                    if kind == "bool":
+                        masked_array = pd.arrays.BooleanArray
+                    else:
+                        masked_array = pd.arrays.IntegerArray
+                    values = masked_array(numpy.asarray(values), numpy.asarray(nulls))
+            return pd.Series(values, name=column, copy=False)
+        # (only the requested rows of the offsets and lengths are read)
+        offsets = mapColumnFile(
+            columnFilename(self.directory, index, "offsets"), numpy.int64
+        )[rows]
+        lengths = mapColumnFile(
+            columnFilename(self.directory, index, "lengths"), numpy.int64
+        )[rows]
+        data = memoryview(
+            mapColumnFile(columnFilename(self.directory, index, "data"), numpy.uint8)
+        )
+        values = numpy.empty(len(lengths), dtype=object)
+        if kind == "text":
+            values[:] = [
+                None if length < 0 else str(data[offset : offset + length], "utf-8")
+                for offset, length in zip(offsets.tolist(), lengths.tolist())
+            ]
+        else:
+            values[:] = [
+                None if length < 0 else data[offset : offset + length]
+                for offset, length in zip(offsets.tolist(), lengths.tolist())
+            ]
+        return pd.Series(values, name=column)
+
+    # a dataframe of the given columns (or all of them), and of the rows from
+    # start up to stop (or all of them) -- which is loaded into memory
+    def toDataFrame(self, columns=None, start=None, stop=None):
+        if columns is None:
+            columns = self.columns
+        data = pd.DataFrame(
+            {column: self.column(column, start, stop) for column in columns}
+        )
+        return data[columns]
+
+    def head(self, n=5):
+        return self.toDataFrame(stop=n)
+
+    # the rows as a series of dataframes of (at most) chunk_rows records each
+    def chunks(self, chunk_rows=None, columns=None):
+        if chunk_rows is None:
+            chunk_rows = Settings.out_of_core_chunk_rows
+        for start in range(0, self.rows, chunk_rows):
+            yield self.toDataFrame(columns, start, start + chunk_rows)
+
+    def close(self):
+        self.__finalizer()
+
+
+# decode a table out of core, from a series of dataframe chunks (see
+# Datafile.iterData) and the column kinds the column types declare (see
+# Datafile.columnKinds)
+def readOutOfCore(chunks, declared_kinds=None):
+    directory = tempfile.mkdtemp(
+        prefix="ayx_out_of_core_", dir=Settings.out_of_core_dir
+    )
+    declared_kinds = declared_kinds or {}
+    columns = None
+    kinds = {}
+    rows = 0
+    try:
+        for chunk in chunks:
+            if columns is None:
+                columns = list(chunk.columns)
+                for column in columns:
+                    kinds[column] = declared_kinds.get(column) or inferColumnKind(
+                        chunk[column]
+                    )
+            for index, column in enumerate(columns):
+                appendColumn(directory, index, kinds[column], chunk.iloc[:, index])
+            rows += len(chunk)
+        if columns is None:
+            columns = []
+        # make sure that every file exists (eg, if there were no records)
+        for index, column in enumerate(columns):
+            if kinds[column] in column_dtypes:
+                suffixes = (
+                    ["values"] if kinds[column] == "float" else ["values", "nulls"]
+                )
+            else:
+                suffixes = ["data", "lengths", "offsets"]
+            for suffix in suffixes:
+                open(columnFilename(directory, index, suffix), "ab").close()
+    except:
+        removeDirectory(directory)
+        raise
+    return MemmapFrame(directory, columns, kinds, rows)
@@ -16,11 +16,122 @@
 ### (eg, pandas, etc -- otherwise, it will be impossible to update packages
 ###  loaded here!)
 from sys import executable as python_exe
-import io, subprocess
-from ayx.Utils import runSubprocess
+import io, os, re, sys, json, pkgutil, subprocess
+import importlib, importlib.util
+from hashlib import blake2b
+from ayx.Utils import runSubprocess, getCacheDirectory
+from ayx import Settings
 # from ayx.packages import required as required_packages
 
 
+# index of the installed environment: the top-level modules and the
+# distributions (with their versions) in the site-packages directories.
+# building it means scanning those directories and reading the metadata of
+# every distribution, so it's cached on disk, keyed by the mtimes of the
+# site-packages directories (installing or uninstalling a package changes the
+# mtime of the site-packages directory it's installed in)
+environment_index = None
+
+
+def sitePackagesDirectories():
+    return [
+        os.path.abspath(path) for path in sys.path
+        if os.path.basename(path) in ('site-packages', 'dist-packages')
+        and os.path.isdir(path)
+        ]
+
+
+def environmentKey():
+    key = {'executable': python_exe, 'version': sys.version, 'paths': []}
+    for path in sitePackagesDirectories():
+        try:
+            key['paths'].append([path, os.stat(path).st_mtime])
+        except OSError:
+            key['paths'].append([path, None])
+    return key
+
+
+# normalized distribution name (PEP 503), eg "Scikit_Learn" -> "scikit-learn"
+def normalizeName(name):
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def listDistributions():
+    distributions = {}
+    try:
+        from importlib.metadata import distributions as metadata_distributions
+        for dist in metadata_distributions():
+            name = dist.metadata['Name']
+            if name and normalizeName(name) not in distributions:
+                distributions[normalizeName(name)] = dist.version
+    except ImportError:
+        # python < 3.8
+        import pkg_resources
+        for dist in pkg_resources.working_set:
+            distributions[normalizeName(dist.project_name)] = dist.version
+    return distributions
+
+
+def buildEnvironmentIndex(key):
+    modules = set(sys.builtin_module_names)
+    modules.update(
+        module.name for module in pkgutil.iter_modules(sitePackagesDirectories())
+        )
+    return {
+        'key': key,
+        'modules': sorted(modules),
+        'distributions': listDistributions()
+        }
+
+
+def environmentIndexFilepath():
+    cache_dir = getCacheDirectory('environment')
+    if cache_dir is None:
+        return None
+    executable_hash = blake2b(python_exe.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(cache_dir, 'index_{}.json'.format(executable_hash))
+
+
+def getEnvironmentIndex(refresh=False, debug=None):
+    global environment_index
+    key = environmentKey()
+    if not refresh and environment_index is not None and environment_index['key'] == key:
+        return environment_index
+
+    filepath = environmentIndexFilepath()
+    index = None
+    if not refresh and filepath is not None and os.path.isfile(filepath):
+        try:
+            with open(filepath) as fp:
+                index = json.load(fp)
+            if index.get('key') != key:
+                index = None
+        except (OSError, ValueError):
+            index = None
+
+    if index is None:
+        if debug:
+            print('Building index of installed packages...')
+        # (so that find_spec sees newly installed packages)
+        importlib.invalidate_caches()
+        index = buildEnvironmentIndex(key)
+        if filepath is not None:
+            try:
+                # write to a temp file first, so that concurrent tools never
+                # read a partly written index
+                temp_filepath = '{}.{}.tmp'.format(filepath, os.getpid())
+                with open(temp_filepath, 'w') as fp:
+                    json.dump(index, fp)
+                os.replace(temp_filepath, filepath)
+            except OSError as err:
+                if debug:
+                    print('Unable to cache index of installed packages: {}'.format(err))
+
+    index['module_set'] = set(index['modules'])
+    environment_index = index
+    return index
+
+
 def isPackageInstalled(pkg, debug=None):
     # check arg types
     if not isinstance(pkg, str):
@@ -29,31 +140,120 @@ def isPackageInstalled(pkg, debug=None):
         debug = False
     elif not isinstance(debug, bool):
         raise TypeError('debug must be True or False')
-    # TODO: in progress -- check if package is installed (ideally without loading it)
-    # "python -c 'import pkgutil; print(1 if pkgutil.find_loader(\"${pkg}\") else 0)'"
-    # result = runSubprocess([python_exe, '-c', 'import {}'.format(pkg)])
-    # run an external subprocess to check if we can import the package
-    result = runSubprocess([python_exe, '-c', 'import {}'.format(pkg)])
-    # if ModuleNotFoundError, then check what the module name is
-    if (result['err_type'] == 'ModuleNotFoundError'):
-        # get the missing package name that triggered the exception
-        error_package = result['msg'].split(' ')[-1][1:-1]
-        # is the missing module that triggered the error the one being checked?
-        # example: when executing __import__('keras') ==> "No module named 'tensorflow'"
-        # because tensorflow is an optional dependency that doesn't get installed with
-        # keras (user is required to install tensorflow or change setting to not use tensorflow)
-        return error_package != pkg
-    # if not moduleNotFoundError, then return whether subprocess was success or not
-    return result['success']
-
-
-
-
-def installPackages(package, install_type=None, debug=None):
+    # check if the module can be found (without importing it, or starting a
+    # python subprocess to import it) -- a package is still installed if
+    # importing it would fail because of a missing optional dependency, eg:
+    # keras without tensorflow
+    index = getEnvironmentIndex(debug=debug)
+    top_level = pkg.split('.')[0]
+    if top_level not in index['module_set']:
+        # fall back to the import system (eg, for the standard library, or
+        # scripts in the working directory)
+        try:
+            if importlib.util.find_spec(top_level) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    if top_level == pkg:
+        return True
+    # (finding a submodule imports its parent package)
+    try:
+        return importlib.util.find_spec(pkg) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def parseRequirement(requirement):
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        from pip._vendor.packaging.requirements import Requirement
+    return Requirement(requirement)
+
+
+# check a list of requirements (eg, ["pandas>=0.23", "keras", "numpy==1.14.*"])
+# against the installed environment in one pass -- returns a dict mapping
+# each requirement to whether it is satisfied
+def checkRequirements(requirements, debug=None):
     if debug is None:
         debug = False
     elif not isinstance(debug, bool):
         raise TypeError('debug must be True or False')
+    requirements_argtype_error_msg = 'Requirements must be a string or list of strings.'
+    if isinstance(requirements, str):
+        requirements = [requirements]
+    elif not isinstance(requirements, list):
+        raise TypeError(requirements_argtype_error_msg)
+    for requirement in requirements:
+        if not isinstance(requirement, str):
+            raise TypeError(requirements_argtype_error_msg)
+
+    index = getEnvironmentIndex(debug=debug)
+    results = {}
+    for requirement in requirements:
+        parsed = parseRequirement(requirement)
+        if parsed.marker is not None and not parsed.marker.evaluate():
+            # requirement doesn't apply to this environment
+            results[requirement] = True
+            continue
+        version = index['distributions'].get(normalizeName(parsed.name))
+        if version is None:
+            # not a distribution name -- maybe an import name (eg, "sklearn")
+            results[requirement] = (
+                len(parsed.specifier) == 0 and isPackageInstalled(parsed.name)
+                )
+        else:
+            results[requirement] = parsed.specifier.contains(version, prereleases=True)
+        if debug:
+            print('{}: {} (installed: {})'.format(
+                requirement,
+                'satisfied' if results[requirement] else 'not satisfied',
+                version
+                ))
+    return results
+
+
+
+
+# pip install args that mean packages should be installed even if the
+# requirement is already satisfied
+reinstall_args = ['-U', '--upgrade', '--force-reinstall', '-I', '--ignore-installed']
+
+
+# the requirements in a list of pip install args that aren't satisfied yet
+# (args that aren't requirements -- options, paths, urls -- are kept)
+def unsatisfiedInstallArgs(pkg_list, debug=None):
+    requirements = []
+    for pkg in pkg_list:
+        if pkg.startswith('-') or os.path.sep in pkg or '/' in pkg or '://' in pkg:
+            continue
+        try:
+            parseRequirement(pkg)
+            requirements.append(pkg)
+        except Exception:
+            pass
+    if len(requirements) == 0:
+        return pkg_list
+    satisfied = checkRequirements(requirements, debug=debug)
+    return [pkg for pkg in pkg_list if not satisfied.get(pkg, False)]
+
+
+def installPackages(package, install_type=None, debug=None, wheelhouse=None, force=None):
+    if debug is None:
+        debug = False
+    elif not isinstance(debug, bool):
+        raise TypeError('debug must be True or False')
+    if force is None:
+        force = False
+    elif not isinstance(force, bool):
+        raise TypeError('force must be True or False')
+    if wheelhouse is None:
+        wheelhouse = Settings.wheelhouse
+    if wheelhouse is not None:
+        if not isinstance(wheelhouse, str):
+            raise TypeError('wheelhouse must be a directory path (string)')
+        elif not os.path.isdir(wheelhouse):
+            raise ValueError('wheelhouse directory does not exist ({})'.format(wheelhouse))
 
     # default install_type is install
     if install_type is None:
@@ -87,6 +287,24 @@ def installPackages(package, install_type=None, debug=None):
         raise TypeError(package_argtype_error_msg)
 
 
+    # skip packages that are already installed (and satisfy any version
+    # specifiers), unless asked to upgrade or reinstall them
+    is_install = len(install_type_list) > 0 and install_type_list[0] == 'install'
+    if is_install and not force and not any(arg in reinstall_args for arg in install_type_list + pkg_list):
+        pkg_list_to_install = unsatisfiedInstallArgs(pkg_list, debug=debug)
+        skipped = [pkg for pkg in pkg_list if pkg not in pkg_list_to_install]
+        if len(skipped) > 0:
+            print('Requirement already satisfied: {}'.format(', '.join(skipped)))
+        if not any(not pkg.startswith('-') for pkg in pkg_list_to_install):
+            return
+        pkg_list = pkg_list_to_install
+
+    # install from a local directory of wheels (without going to PyPI)
+    if is_install and wheelhouse is not None:
+        install_type_list = install_type_list + [
+            '--no-index', '--find-links', os.path.abspath(wheelhouse)
+            ]
+
     # put all pip args into a list
     pip_args_list = install_type_list + pkg_list
     pip_args_str = ' '.join(pip_args_list)
@@ -104,11 +322,15 @@ def installPackages(package, install_type=None, debug=None):
         print('Executing subprocess: {}'.format(pip_args_str))
 
 
+    # (pip's output is printed as it runs)
     pip_install_result = runSubprocess(
             [python_exe, "-m", "pip"] + pip_args_list,
-            debug=debug
+            debug=debug,
+            stream=True
             )
 
-    print(pip_install_result['msg'])
+    # the installed packages have changed
+    global environment_index
+    environment_index = None
     if not pip_install_result['success']:
         raise pip_install_result['err']
@@ -0,0 +1,98 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+### connection pool used by Alteryx.session(): the cached input Datafiles
+### opened by read/readMetadata are kept open (along with their cached
+### metadata) until the session ends, instead of being opened and closed
+### again by every call
+import os
+from ayx.Datafiles import Datafile
+from ayx.Stats import null_call_stats
+
+# the innermost active session (None when not in a session)
+current_session = None
+
+
+# mtime and size of a file, to tell if it was replaced while it was pooled
+# (eg, the workflow was run again and re-cached the input)
+def fileSignature(filepath):
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class Session:
+    def __init__(self, debug=None):
+        if debug is None:
+            self.debug = False
+        elif isinstance(debug, bool):
+            self.debug = debug
+        else:
+            raise TypeError("debug parameter must True or False")
+        self.datafiles = {}
+        self.closed = False
+        self.__previous_session = None
+
+    def __enter__(self):
+        global current_session
+        if self.closed:
+            raise ValueError("session has already been closed")
+        self.__previous_session = current_session
+        current_session = self
+        return self
+
+    def __exit__(self, type, value, traceback):
+        global current_session
+        self.close()
+        current_session = self.__previous_session
+
+    # an open Datafile for an input file -- reused from the pool, unless the
+    # file has changed since it was opened
+    def getDatafile(self, filepath, fileformat=None, stats=None):
+        if self.closed:
+            raise ValueError("session has already been closed")
+        key = (os.path.abspath(filepath), fileformat)
+        signature = fileSignature(filepath)
+        if key in self.datafiles:
+            datafile, pooled_signature = self.datafiles[key]
+            if pooled_signature == signature:
+                if self.debug:
+                    print("Reusing pooled connection to {}".format(key[0]))
+                datafile.stats = null_call_stats if stats is None else stats
+                return datafile
+            datafile.closeConnection()
+            del self.datafiles[key]
+
+        datafile = Datafile(
+            filepath,
+            create_new=False,
+            fileformat=fileformat,
+            debug=self.debug,
+            stats=stats,
+        )
+        datafile.openConnection()
+        self.datafiles[key] = (datafile, signature)
+        return datafile
+
+    # close every pooled connection
+    def close(self):
+        for datafile, signature in self.datafiles.values():
+            try:
+                datafile.closeConnection()
+            except Exception as err:
+                print("Unable to close {}: {}".format(datafile.filepath, err))
+        self.datafiles = {}
+        self.closed = True
@@ -1,3 +1,79 @@
 
 
 default_temp_file_format = 'sqlite'
+
+# record per-call timings for Alteryx.read/write/readMetadata (see
+# Alteryx.getStats) -- and optionally append them to a run log file
+collect_stats = False
+stats_log_filepath = None
+
+# also measure peak/retained memory of each read/write (slower -- it uses
+# tracemalloc) and how often to sample the process memory while doing so
+track_memory = False
+memory_sample_interval = 0.01
+
+# batch_size="auto" (yxdb read_records/append_records): aim for batches of
+# about this many bytes, never more than batch_max_size records, and assume
+# variable length fields (strings, blobs, spatial objects) are this wide
+batch_target_bytes = 8 * 1024 * 1024
+batch_max_size = 100000
+batch_variable_field_bytes = 100
+
+# Alteryx.writePlot: how the plot is passed out -- "path" (an img tag pointing
+# to a png file), "data_uri" (an img tag with the png embedded) or "blob" (the
+# png bytes) -- and how many rendered figures to keep for unchanged re-writes
+# (0 to not cache them -- caching a figure means hashing its pickled state,
+# which only pays off if the same figure is written out again)
+plot_output_type = "path"
+plot_cache_size = 0
+
+# Alteryx.writePlots: number of worker processes used to render figures
+# (None for one per cpu), and the fewest figures worth starting them for
+plot_processes = None
+plot_parallel_min = 8
+
+# per-user cache directory (eg, for the index of installed packages) -- None
+# to use the os default (%LOCALAPPDATA%\Alteryx\ayx\Cache or ~/.cache/ayx)
+cache_directory = None
+
+# Alteryx.installPackages: directory of wheel files to install packages from
+# instead of PyPI (None to install from PyPI)
+wheelhouse = None
+
+# Alteryx.read(where=...): index the cached sqlite input on the filtered
+# columns once they have been filtered on this many times (None to only
+# create indexes with Alteryx.createIndex)
+auto_index_threshold = 3
+
+# compression of the temp files (None, "lz4", "zstd" or "gzip" -- see
+# Alteryx.setTempFormatAs), the level used by each codec, and the size of the
+# chunks streamed through the codec
+default_temp_file_compression = None
+temp_compression_levels = {"lz4": 0, "zstd": 1, "gzip": 1}
+temp_compression_chunk = 1024 * 1024
+
+# Alteryx.write: skip re-writing an output whose data and metadata are the
+# same as when it was last written (tracked with a fingerprint file in the
+# cache directory) -- None to only skip them when running interactively (eg,
+# re-running a notebook cell), True to always, or False to never
+skip_unchanged_outputs = None
+
+# yxdb writes: records whose values are converted for the extension at a
+# time -- batches smaller than this are sliced from one converted block, so
+# small batch sizes don't pay the conversion's overhead for every batch
+write_encode_rows = 1024
+
+# Alteryx.write: number of compiled write plans (the output metadata resolved
+# for a schema) to keep for writes of the same shape
+write_plan_cache_size = 64
+
+# Alteryx.read(blobs="memoryview"): records fetched from sqlite at a time (the
+# blob values of one fetch are held as bytes before they are moved into the
+# column's buffer)
+blob_fetch_size = 10000
+
+# Alteryx.read(out_of_core=True): the directory that the scratch directories
+# of out-of-core reads are created in (None for the system temp directory),
+# and the records decoded at a time
+out_of_core_dir = None
+out_of_core_chunk_rows = 100000
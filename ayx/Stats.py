@@ -0,0 +1,271 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+### NOTE! This submodule is imported by Datafiles and CachedData on every
+### read/write -- keep it lightweight (standard library only), and keep the
+### disabled code path as close to free as possible.
+import os, sys, copy, json, time, threading, tracemalloc
+from contextlib import contextmanager
+from ayx import Settings
+
+
+# resident set size (working set on windows) of the current process in bytes
+# -- uses psutil if it's installed, otherwise asks the os directly (returns
+# None if neither is possible)
+def currentRss():
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(
+                ctypes.windll.kernel32.GetCurrentProcess(),
+                ctypes.byref(counters),
+                counters.cb,
+            )
+            return counters.WorkingSetSize
+        else:
+            with open("/proc/self/statm") as fp:
+                return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+# samples the rss in a background thread to find the peak during a call
+# (the os only keeps track of the peak over the lifetime of the process)
+class RssSampler(threading.Thread):
+    def __init__(self, interval=None):
+        super().__init__(daemon=True)
+        if interval is None:
+            interval = Settings.memory_sample_interval
+        self.interval = interval
+        self.start_rss = currentRss()
+        self.peak_rss = self.start_rss
+        self.__stop_event = threading.Event()
+
+    def run(self):
+        while not self.__stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        rss = currentRss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+        return rss
+
+    def stop(self):
+        self.__stop_event.set()
+        self.join()
+        return self.sample()
+
+
+# timing, row and byte counts for a single read/write/readMetadata call
+class CallStats:
+    def __init__(self, collector, call, **attributes):
+        self.collector = collector
+        self.record = {
+            "call": call,
+            "timestamp": time.time(),
+            "phases": {},
+            "rows": None,
+            "columns": None,
+            "bytes": None,
+        }
+        self.record.update(attributes)
+        self.__start = time.perf_counter()
+
+    # time a block of code and add it to the named phase, eg:
+    #
+    #        with call_stats.phase("decode"):
+    #            do_stuff()
+    #
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.addPhase(name, time.perf_counter() - start)
+
+    def addPhase(self, name, seconds):
+        phases = self.record["phases"]
+        phases[name] = phases.get(name, 0.0) + seconds
+
+    # measure the peak and retained memory of a block of code (python
+    # allocations with tracemalloc, and the process rss by sampling) -- only
+    # if memory tracking is turned on, since tracemalloc slows python down
+    @contextmanager
+    def memory(self, name):
+        if not self.collector.track_memory:
+            yield
+            return
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0]
+        sampler = RssSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            traced_end, traced_peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            rss_end = sampler.stop()
+            memory = {
+                "traced_peak_bytes": max(traced_peak - traced_start, 0),
+                "traced_retained_bytes": traced_end - traced_start,
+                "rss_start_bytes": sampler.start_rss,
+                "rss_peak_bytes": sampler.peak_rss,
+                "rss_end_bytes": rss_end,
+                "rss_retained_bytes": None,
+            }
+            if sampler.start_rss is not None and rss_end is not None:
+                memory["rss_retained_bytes"] = rss_end - sampler.start_rss
+            self.record.setdefault("memory", {})[name] = memory
+
+    # estimated memory used by each column of a dataframe (deep=True counts
+    # the python objects in object columns, which is slow for big string
+    # columns, so this is also only done when tracking memory)
+    def setColumnMemory(self, pandas_df):
+        if not self.collector.track_memory:
+            return
+        usage = pandas_df.memory_usage(deep=True, index=False)
+        self.record["column_memory_bytes"] = {
+            str(column): int(usage[column]) for column in usage.index
+        }
+        self.record["dataframe_memory_bytes"] = int(usage.sum())
+
+    def set(self, **attributes):
+        self.record.update(attributes)
+
+    def finish(self):
+        seconds = time.perf_counter() - self.__start
+        self.record["seconds"] = seconds
+        for count, rate in [("rows", "rows_per_second"), ("bytes", "bytes_per_second")]:
+            if self.record[count] is not None and seconds > 0:
+                self.record[rate] = self.record[count] / seconds
+            else:
+                self.record[rate] = None
+        self.collector.add(self.record)
+        return self.record
+
+
+# context manager that does nothing (contextlib.nullcontext is 3.7+)
+class NullContext:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+
+# stand-in used when stats are disabled (every method is a no-op)
+class NullCallStats:
+    __null_context = NullContext()
+
+    def phase(self, name):
+        return self.__null_context
+
+    def memory(self, name):
+        return self.__null_context
+
+    def addPhase(self, name, seconds):
+        pass
+
+    def setColumnMemory(self, pandas_df):
+        pass
+
+    def set(self, **attributes):
+        pass
+
+    def finish(self):
+        return None
+
+
+null_call_stats = NullCallStats()
+
+
+# module-level collector shared by every CachedData/Datafile object (each
+# Alteryx.read/write call creates new ones, so the stats can't live on them)
+class StatsCollector:
+    def __init__(self):
+        self.enabled = Settings.collect_stats
+        self.log_filepath = Settings.stats_log_filepath
+        self.track_memory = Settings.track_memory
+        self.records = []
+
+    def configure(self, enabled=True, log_filepath=None, track_memory=False):
+        if not isinstance(enabled, bool):
+            raise TypeError("enabled must be True or False")
+        if log_filepath is not None and not isinstance(log_filepath, str):
+            raise TypeError("log_filepath must be a string")
+        if not isinstance(track_memory, bool):
+            raise TypeError("track_memory must be True or False")
+        self.enabled = enabled
+        self.log_filepath = log_filepath
+        self.track_memory = track_memory
+
+    def startCall(self, call, **attributes):
+        if not self.enabled:
+            return null_call_stats
+        return CallStats(self, call, **attributes)
+
+    def add(self, record):
+        self.records.append(record)
+        # append to the run log as one json object per line
+        if self.log_filepath is not None:
+            try:
+                with open(self.log_filepath, "a") as fp:
+                    fp.write(json.dumps(record, default=str))
+                    fp.write("\n")
+            except OSError as err:
+                print(
+                    "Unable to append stats to run log ({}): {}".format(
+                        self.log_filepath, err
+                    )
+                )
+
+    def getStats(self, reset=False):
+        records = copy.deepcopy(self.records)
+        if reset:
+            self.records = []
+        return records
+
+
+collector = StatsCollector()
@@ -16,17 +16,54 @@
 ### Keep this lightweight -- NO THIRD-PARTY PACKAGE REFERENCES!!!
 ### (eg, pandas, matplotlib, etc -- otherwise, it will be impossible
 ###  to update packages loaded here!)
-import sys, json, subprocess
+import os, re, sys, json, marshal, subprocess
 from os.path import abspath
 from re import findall
 from functools import reduce
-
-
-def runSubprocess(args_list, debug=None):
+from ayx import Settings
+
+
+# if a line of subprocess output starts with any of the following, exclude it
+exclude_msg_prefixes = [
+    "You are using pip version",
+    "You should consider upgrading via the 'python -m pip install --upgrade pip' command."
+    ]
+
+
+def isExcludedLine(line):
+    return any(line[:len(prefix)] == prefix for prefix in exclude_msg_prefixes)
+
+
+# run a subprocess, printing each line of its output as soon as it is written
+# (instead of all at once when it finishes) -- returns the output and exit code
+def streamSubprocess(args_list):
+    output_lines = []
+    process = subprocess.Popen(
+        args_list,
+        stdout = subprocess.PIPE,
+        stderr = subprocess.STDOUT,
+        universal_newlines = True,
+        encoding = 'utf-8',
+        errors = 'replace'
+        )
+    for line in process.stdout:
+        line = line.rstrip('\r\n')
+        output_lines.append(line)
+        if not isExcludedLine(line):
+            print(line, flush=True)
+    process.stdout.close()
+    return '\n'.join(output_lines), process.wait()
+
+
+def runSubprocess(args_list, debug=None, stream=None):
     if debug is None:
         debug = False
     elif not isinstance(debug, bool):
         raise TypeError('debug must be True or False')
+    if stream is None:
+        stream = False
+    elif not isinstance(stream, bool):
+        raise TypeError('stream must be True or False')
     if isinstance(args_list, str):
         args_list = [args_list]
     elif not isinstance(args_list, list):
@@ -36,39 +73,40 @@ def runSubprocess(args_list, debug=None):
         print(' '.join(['[Executing subprocess:'] + args_list + [']']))
 
     try:
-        result = subprocess.check_output(
-            args_list,
-            stderr = subprocess.STDOUT
-            )
+        if stream:
+            output, returncode = streamSubprocess(args_list)
+            if returncode != 0:
+                raise subprocess.CalledProcessError(
+                    returncode, args_list, output=output.encode('utf-8')
+                    )
+            result = output.encode('utf-8')
+        else:
+            result = subprocess.check_output(
+                args_list,
+                stderr = subprocess.STDOUT
+                )
         if debug:
             print('[Subprocess success!]')
         result_decoded_lines = result.decode("utf-8").strip().split("\n")
-        # if a line starts with any of the following, exclude it
-        exclude_msg_prefixes = [
-            "You are using pip version",
-            "You should consider upgrading via the 'python -m pip install --upgrade pip' command."
-            ]
-        # now actually exclude all lines starting with above strings
-        for prefix in exclude_msg_prefixes:
-            result_decoded_lines = list(filter(
-                lambda line: (
-                    line[:len(prefix)] != prefix
-                    ),
-                result_decoded_lines
-                ))
+        # now actually exclude all lines starting with the excluded prefixes
+        result_decoded_lines = list(filter(
+            lambda line: not isExcludedLine(line),
+            result_decoded_lines
+            ))
         # print the output
         output_msg = '\n'.join(result_decoded_lines)
         success = True
         error = None
         error_type = None
-        if debug:
+        if debug and not stream:
             print(output_msg)
     # if any errors, print them to output
     except subprocess.CalledProcessError as e:
         output_msg = e.output.decode("utf-8").strip()
         if debug:
             print('[Subprocess failed.]')
-            print(output_msg)
+            if not stream:
+                print(output_msg)
         success = False
         error = e
         error_type = output_msg.split('\n')[-1].split(':')[0]
@@ -82,11 +120,112 @@ def runSubprocess(args_list, debug=None):
 
 
 
+# per-user directory for files cached between runs (eg, the package index)
+# -- returns None if it can't be created (callers should then skip caching)
+def getCacheDirectory(*subdirectories):
+    if Settings.cache_directory is not None:
+        base_dir = Settings.cache_directory
+    elif sys.platform == 'win32':
+        base_dir = os.path.join(
+            os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'),
+            'Alteryx', 'ayx', 'Cache'
+            )
+    else:
+        base_dir = os.path.join(
+            os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+            'ayx'
+            )
+    cache_dir = os.path.join(base_dir, *subdirectories)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return None
+    return cache_dir
+
+
+# compiled code objects cached on disk in the per-user cache directory (with
+# the python bytecode magic number as a header, so a different version of
+# python won't try to load them) -- cache_key must change whenever the
+# source does, and compile_function is called to compile it if it isn't
+# cached yet (when it is, any cached files starting with prune_prefix are
+# removed)
+def loadCachedCode(cache_subdirectory, cache_key, compile_function, debug=None, prune_prefix=None):
+    cache_dir = getCacheDirectory(cache_subdirectory)
+    cache_filepath = None
+    if cache_dir is not None:
+        cache_filepath = os.path.join(cache_dir, '{}.pyc'.format(cache_key))
+        try:
+            with open(cache_filepath, 'rb') as f:
+                data = f.read()
+            if data[:len(MAGIC_NUMBER)] == MAGIC_NUMBER:
+                if debug:
+                    print('loading cached bytecode ({})'.format(cache_filepath))
+                return marshal.loads(data[len(MAGIC_NUMBER):])
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    code = compile_function()
+    if cache_filepath is not None:
+        try:
+            # write to a temp file first, so that concurrent tools never
+            # read partly written bytecode
+            temp_filepath = '{}.{}.tmp'.format(cache_filepath, os.getpid())
+            with open(temp_filepath, 'wb') as f:
+                f.write(MAGIC_NUMBER + marshal.dumps(code))
+            os.replace(temp_filepath, cache_filepath)
+            # remove bytecode cached for older versions of the same source
+            if prune_prefix is not None:
+                for filename in os.listdir(cache_dir):
+                    if filename.startswith(prune_prefix) and filename != os.path.basename(cache_filepath):
+                        os.remove(os.path.join(cache_dir, filename))
+        except OSError as err:
+            if debug:
+                print('unable to cache bytecode: {}'.format(err))
+    return code
+
+
+# ipython magics (%time, !pip install ...) aren't python, so they're replaced
+# with pass (keeping the indentation, so blocks containing them still parse)
+magic_line_regex = re.compile(r'^(\s*)[%!]')
+
+
+def notebookCellSource(cell):
+    source = cell.get('source', cell.get('input', ''))
+    if isinstance(source, list):
+        source = ''.join(source)
+    return source
+
+
+# the python source of the code cells of a (parsed json) notebook
+def notebookSource(notebook):
+    if 'cells' in notebook:
+        cells = notebook['cells']
+    else:
+        # nbformat 3
+        cells = [
+            cell
+            for worksheet in notebook.get('worksheets', [])
+            for cell in worksheet.get('cells', [])
+            ]
+    cell_sources = []
+    for cell in cells:
+        if cell.get('cell_type') != 'code':
+            continue
+        lines = notebookCellSource(cell).splitlines()
+        # skip cells run by a cell magic (eg, %%bash or %%html)
+        if len(lines) > 0 and lines[0].lstrip().startswith('%%'):
+            continue
+        lines = [magic_line_regex.sub(r'\1pass  # ', line) for line in lines]
+        cell_sources.append('\n'.join(lines))
+    return '\n\n'.join(cell_sources) + '\n'
+
+
 from pathlib import Path
-from importlib import import_module
-from importlib.util import spec_from_file_location, module_from_spec
+from types import ModuleType
+from importlib import import_module, invalidate_caches
+from importlib.util import spec_from_file_location, module_from_spec, MAGIC_NUMBER
 from contextlib import contextmanager
-from pkgutil import walk_packages
+from pkgutil import iter_modules
 from hashlib import blake2b
 import os.path
 import sys
@@ -109,6 +248,124 @@ def add_to_path(p):
     finally:
         sys.path = old_path
 
+# signatures (mtimes and sizes) of the source files of the modules imported by
+# ExternalModuleLoader, by module name -- an imported module is reused from
+# sys.modules until its source changes (or it is explicitly reloaded)
+loaded_module_signatures = {}
+
+
+def fileSignature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+# is a module (or package) one that was imported from a directory?
+def isModuleFrom(module, directory):
+    filepath = getattr(module, '__file__', None)
+    if filepath is None:
+        return False
+    directory = os.path.abspath(directory)
+    try:
+        return os.path.commonpath([os.path.abspath(filepath), directory]) == directory
+    except ValueError:
+        # (eg, paths on different drives)
+        return False
+
+
+# the submodules ([name, is_package] pairs) of each directory of a package,
+# cached on disk by the directory's mtime (which changes whenever a file is
+# added, removed or renamed in it) -- so importing a package doesn't have to
+# list and stat every file in it on every run
+class PackageScans(object):
+    def __init__(self, root_directory, debug=None):
+        self.root_directory = root_directory
+        self.debug = debug
+        self.scans = {}
+        self.changed = False
+        self.filepath = None
+        cache_dir = getCacheDirectory('packages')
+        if cache_dir is not None:
+            root_hash = blake2b(root_directory.encode('UTF-8'), digest_size=16).hexdigest()
+            self.filepath = os.path.join(cache_dir, '{}.json'.format(root_hash))
+            try:
+                with open(self.filepath) as f:
+                    self.scans = json.load(f)
+            except (OSError, ValueError):
+                self.scans = {}
+
+    def submodules(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+        scan = self.scans.get(directory)
+        if scan is not None and scan[0] == mtime:
+            return scan[1]
+        if self.debug:
+            print('scanning package directory {}'.format(directory))
+        submodules = [[name, is_pkg] for _, name, is_pkg in iter_modules([directory])]
+        self.scans[directory] = [mtime, submodules]
+        self.changed = True
+        return submodules
+
+    # signature of the package tree: the mtime of each of its package
+    # directories (the same mtimes the scans are cached by, so no directory
+    # is listed again) and of each one's __init__.py -- a directory's mtime
+    # changes whenever a module is added, removed or saved over (as most
+    # editors save), but a module edited in place other than an __init__.py
+    # needs reload=True
+    def treeSignature(self):
+        signature = []
+        directories = [self.root_directory]
+        while len(directories) > 0:
+            directory = directories.pop()
+            submodules = self.submodules(directory)
+            scan = self.scans.get(directory)
+            try:
+                init_mtime = os.stat(os.path.join(directory, '__init__.py')).st_mtime_ns
+            except OSError:
+                init_mtime = None
+            signature.append([
+                os.path.relpath(directory, self.root_directory),
+                None if scan is None else scan[0],
+                init_mtime
+                ])
+            directories.extend(
+                os.path.join(directory, name) for name, is_pkg in submodules if is_pkg
+                )
+        return signature
+
+    def save(self):
+        if not self.changed or self.filepath is None:
+            return
+        try:
+            temp_filepath = '{}.{}.tmp'.format(self.filepath, os.getpid())
+            with open(temp_filepath, 'w') as f:
+                json.dump(self.scans, f)
+            os.replace(temp_filepath, self.filepath)
+            self.changed = False
+        except OSError as err:
+            if self.debug:
+                print('unable to cache package scan: {}'.format(err))
+
+
+# module type for packages whose submodules are imported lazily: a submodule
+# is imported the first time it's accessed as an attribute of the package
+class LazySubmodulesModule(ModuleType):
+    def __getattr__(self, name):
+        lazy_submodules = self.__dict__.get('__ayx_lazy_submodules__', {})
+        if name in lazy_submodules:
+            is_pkg, loader = lazy_submodules.pop(name)
+            submodule = import_module('{}.{}'.format(self.__name__, name))
+            if is_pkg:
+                loader.import_submodules(submodule, lazy=True)
+                loader.package_scans.save()
+            return submodule
+        raise AttributeError(
+            "module '{}' has no attribute '{}'".format(self.__name__, name)
+            )
+
+
 # this is the class used for the Alteryx.importPythonModule() function
 # (which allows users to import a local package dir or script file)
 class ExternalModuleLoader(object):
@@ -144,6 +401,7 @@ class ExternalModuleLoader(object):
             raise ImportError(msg)
         # get containing directory and module name
         self.containing_dir = os.path.dirname(self.path)
+        self.package_scans = None
         self.module = None
         self.ipython_notebook = None
         # if file, then get extension
@@ -213,7 +471,34 @@ class ExternalModuleLoader(object):
         return components
 
 
-    def importPythonFile(self, path):
+    # a previously imported module, if its source hasn't changed since
+    def cachedModule(self, module_name, signature):
+        if (
+            module_name in sys.modules and
+            loaded_module_signatures.get(module_name) == signature
+        ):
+            if self.debug:
+                print('reusing cached module {}'.format(module_name))
+            return sys.modules[module_name]
+        return None
+
+    # remove a module (and its submodules) from sys.modules, so that the
+    # next import runs its (changed) source again -- with a directory, only
+    # if it was imported from there (or by this loader), so that, eg, an
+    # installed package of the same name is left alone
+    def forgetModule(self, module_name, directory=None):
+        module = sys.modules.get(module_name)
+        if directory is not None and module is not None and not (
+            isModuleFrom(module, directory) or
+            any(sys.modules.get(name) is module for name in loaded_module_signatures)
+        ):
+            return
+        for name in list(sys.modules.keys()):
+            if name == module_name or name.startswith(module_name + '.'):
+                del sys.modules[name]
+        loaded_module_signatures.pop(module_name, None)
+
+    def importPythonFile(self, path, reload=False):
         if self.debug:
             print('importPythonFile(): attempting to import file as python script...')
 
@@ -244,41 +529,164 @@ class ExternalModuleLoader(object):
         # is run through exec_module :( Here's a great thread about it:
         # https://stackoverflow.com/questions/41861427/python-3-5-how-to-dynamically-import-a-module-given-the-full-file-path-in-the
         #
+        signature = fileSignature(fullpath)
+        if not reload:
+            output_module = self.cachedModule(module_name_w_path_hash, signature)
+            if output_module is not None:
+                return output_module
+
+        # the script's bytecode is cached in the per-user cache directory
+        # (python usually can't write it next to these scripts -- their
+        # module names are hashed, and they're often on read-only shares),
+        # keyed by the path hash and the source's mtime and size
+        def compileScript():
+            with open(fullpath, 'rb') as f:
+                source = f.read()
+            return compile(source, fullpath, 'exec', dont_inherit=True)
+
+        code = loadCachedCode(
+            'scripts',
+            '{}_{}_{}'.format(path_hash, signature[0], signature[1]),
+            compileScript,
+            debug=self.debug,
+            prune_prefix='{}_'.format(path_hash)
+            )
+
         with add_to_path(directory):
             spec = spec_from_file_location(module_name_w_path_hash, fullpath)
             output_module = module_from_spec(spec)
-            spec.loader.exec_module(output_module)
+            # register the module under its path-hashed name (before running
+            # it, as the import system does) so it can be reused
+            sys.modules[module_name_w_path_hash] = output_module
+            try:
+                exec(code, output_module.__dict__)
+            except:
+                self.forgetModule(module_name_w_path_hash)
+                raise
+            loaded_module_signatures[module_name_w_path_hash] = signature
             return output_module
 
 
 
+    # import the code cells of a jupyter notebook as a module
+    def importNotebook(self, path, reload=False):
+        if self.debug:
+            print('importNotebook(): attempting to import jupyter notebook as python module...')
+
+        module_name_components = self.moduleNameComponents(path)
+        fullpath = module_name_components['fullpath']
+        directory = module_name_components['directory']
+        module_name = module_name_components['module_name']
+        extension = module_name_components['extension']
+        path_hash = module_name_components['path_hash']
+
+        if not os.path.isfile(fullpath):
+            msg = 'Unable to import module -- file does not exist ({})'.format(fullpath)
+            print(msg)
+            raise ImportError(msg)
+
+        if extension != '.ipynb':
+            msg = 'Unable to import module ({}) -- file must have .ipynb extension'.format(fullpath)
+            print(msg)
+            raise ImportError(msg)
+
+        module_name_w_path_hash = '{}_{}'.format(module_name, path_hash)
+
+        signature = fileSignature(fullpath)
+        if not reload:
+            output_module = self.cachedModule(module_name_w_path_hash, signature)
+            if output_module is not None:
+                return output_module
+
+        with open(fullpath, 'rb') as f:
+            notebook_bytes = f.read()
+
+        def compileNotebook():
+            if self.debug:
+                print('compiling notebook code cells...')
+            try:
+                notebook = json.loads(notebook_bytes.decode('utf-8'))
+            except ValueError as err:
+                msg = 'Unable to import module ({}) -- not a valid notebook: {}'.format(fullpath, err)
+                print(msg)
+                raise ImportError(msg)
+            return compile(notebookSource(notebook), fullpath, 'exec', dont_inherit=True)
+
+        # the compiled cells are cached by the notebook's content, so copies of
+        # the same notebook share the cached bytecode
+        content_hash = blake2b(notebook_bytes, digest_size=16).hexdigest()
+        code = loadCachedCode('notebooks', content_hash, compileNotebook, debug=self.debug)
+
+        output_module = ModuleType(module_name_w_path_hash)
+        output_module.__file__ = fullpath
+        sys.modules[module_name_w_path_hash] = output_module
+        try:
+            with add_to_path(directory):
+                exec(code, output_module.__dict__)
+        except:
+            self.forgetModule(module_name_w_path_hash)
+            raise
+        loaded_module_signatures[module_name_w_path_hash] = signature
+        return output_module
+
+
     # import all submodules
-    # (borrowed from https://stackoverflow.com/a/25562415)
-    def import_submodules(self, package, recursive=True, include_submodules=None):
+    # (originally borrowed from https://stackoverflow.com/a/25562415)
+    def import_submodules(self, package, recursive=True, include_submodules=None, lazy=False):
         """ Import all submodules of a module, recursively, including subpackages
 
         :param package: package (name or actual module)
         :type package: str | module
+        :param lazy: instead of importing them, import submodules the first
+            time they are accessed as attributes of the package
         :rtype: dict[str, types.ModuleType]
         """
         if isinstance(package, str):
             package = import_module(package)
         results = {}
-        for loader, name, is_pkg in walk_packages(package.__path__):
-            full_name = package.__name__ + '.' + name
-            # submodule_name is full name, without top level name
-            submodule_name = '.'.join(full_name.split('.')[1:])
-            if (
-                not isinstance(include_submodules, list) or
-                submodule_name in include_submodules
-            ):
+        if not hasattr(package, '__path__'):
+            return results
+        if self.package_scans is None:
+            self.package_scans = PackageScans(package.__path__[0], debug=self.debug)
+        if lazy and type(package) not in (ModuleType, LazySubmodulesModule):
+            # (packages that use their own module type are imported eagerly)
+            lazy = False
+        lazy_submodules = {}
+        for directory in package.__path__:
+            for name, is_pkg in self.package_scans.submodules(directory):
+                full_name = package.__name__ + '.' + name
+                # submodule_name is full name, without top level name
+                submodule_name = '.'.join(full_name.split('.')[1:])
+                if isinstance(include_submodules, list) and submodule_name not in include_submodules:
+                    # a submodule of this subpackage might still be included
+                    if is_pkg and any(
+                        included.startswith(submodule_name + '.')
+                        for included in include_submodules
+                    ):
+                        import_module(full_name)
+                        results.update(self.import_submodules(
+                            full_name,
+                            include_submodules=include_submodules
+                            ))
+                    continue
+                if lazy:
+                    if full_name in sys.modules:
+                        continue
+                    lazy_submodules[name] = (is_pkg, self)
+                    continue
                 results[full_name] = import_module(full_name)
                 if recursive and is_pkg:
                     results.update(self.import_submodules(full_name))
+        if lazy:
+            package.__class__ = LazySubmodulesModule
+            package.__ayx_lazy_submodules__ = lazy_submodules
+        elif isinstance(package, LazySubmodulesModule):
+            # (an eager import of a package that was imported lazily before)
+            package.__ayx_lazy_submodules__ = {}
         return results
 
 
-    def importPythonPackageDirectory(self, path, load_submodules=True):
+    def importPythonPackageDirectory(self, path, load_submodules=True, reload=False):
 
         module_name_components = self.moduleNameComponents(path)
         fullpath = module_name_components['fullpath']
@@ -293,32 +701,61 @@ class ExternalModuleLoader(object):
 
         module_name_w_hash = '{}_{}'.format(module_name, path_hash)
 
-        if self.debug:
-            print('attempting to import directory as python module...')
+        # reuse the package if nothing in the package tree has changed
+        self.package_scans = PackageScans(fullpath, debug=self.debug)
+        signature = self.package_scans.treeSignature()
+        output_module = None
+        if not reload:
+            output_module = self.cachedModule(module_name_w_hash, signature)
+        if output_module is None:
+            # otherwise, forget the old version of the package (or another
+            # package with the same name imported by this loader), so that
+            # it is imported again
+            self.forgetModule(module_name_w_hash)
+            self.forgetModule(module_name, fullpath)
+            if module_name in sys.modules:
+                msg = 'Unable to import module -- a different module named "{}" is already imported ({})'.format(
+                    module_name, getattr(sys.modules[module_name], '__file__', None)
+                    )
+                print(msg)
+                raise ImportError(msg)
+            invalidate_caches()
+
         # insert directory to path (at start, so any naming collisions will
         # not obscure our target dir)
         sys.path.insert(0, directory)
-        exec_str = 'import {0} as {1}; output_module = {1};'.format(module_name, module_name_w_hash)
-        if self.debug:
-            print('exec\'ing: {}'.format(exec_str))
-        # save local variables created during exec to a variable
-        exec_locals = dict()
-        # run import statement
-        exec(exec_str, None, exec_locals)
-
-        # get the output_module object from the local vars returned by
-        # the exec statement
-        output_module = exec_locals['output_module']
+        if output_module is None:
+            if self.debug:
+                print('attempting to import directory as python module...')
+            exec_str = 'import {0} as {1}; output_module = {1};'.format(module_name, module_name_w_hash)
+            if self.debug:
+                print('exec\'ing: {}'.format(exec_str))
+            # save local variables created during exec to a variable
+            exec_locals = dict()
+            # run import statement
+            exec(exec_str, None, exec_locals)
+
+            # get the output_module object from the local vars returned by
+            # the exec statement
+            output_module = exec_locals['output_module']
+            # register the package under its path-hashed name too
+            sys.modules[module_name_w_hash] = output_module
+            loaded_module_signatures[module_name_w_hash] = signature
         if isinstance(load_submodules, bool):
             if load_submodules:
                 submodules_imported = self.import_submodules(output_module)
+            elif isinstance(output_module, LazySubmodulesModule):
+                output_module.__ayx_lazy_submodules__ = {}
         elif isinstance(load_submodules, list):
             submodules_imported = self.import_submodules(
                 output_module,
                 include_submodules=load_submodules
                 )
+        elif load_submodules == 'lazy':
+            submodules_imported = self.import_submodules(output_module, lazy=True)
         else:
-            raise TypeError('load_submodules must be boolean (True loads all modules) or a list of submodules')
+            raise TypeError('load_submodules must be boolean (True loads all modules), "lazy" or a list of submodules')
+        self.package_scans.save()
 
 
         # remove containing dir from paths
@@ -336,7 +773,7 @@ class ExternalModuleLoader(object):
 
         return output_module
 
-    def importPythonModule(self, if_pkg_load_submodules=True):
+    def importPythonModule(self, if_pkg_load_submodules=True, reload=False):
 
         if self.debug:
             print('-- ExternalModuleLoader().importPythonModule() --')
@@ -345,15 +782,18 @@ class ExternalModuleLoader(object):
 
         # if path is to a file, we can load file directly
         # (without having to touch sys.path)
-        if self.is_file:
-            output_module = self.importPythonFile(self.path)
+        if self.is_file and self.ipython_notebook is not None:
+            output_module = self.importNotebook(self.path, reload=reload)
+        elif self.is_file:
+            output_module = self.importPythonFile(self.path, reload=reload)
         # if path is to a directory, SourceFileLoader has issues, so we'll
         # temporarily add the containing directory to sys.path, import the
         # package, then remove the dir from sys.path
         elif self.is_dir:
             output_module = self.importPythonPackageDirectory(
                 self.path,
-                load_submodules=if_pkg_load_submodules
+                load_submodules=if_pkg_load_submodules,
+                reload=reload
                 )
 
 
@@ -14,9 +14,12 @@
 from ayx.CachedData import CachedData as __CachedData__
 from ayx.Help import Help as __Help__
 from ayx.Package import installPackages as __installPackages__
+from ayx.Package import checkRequirements as __checkRequirements__
 from ayx.version import version as __version__
 from ayx.Utils import ExternalModuleLoader as __ExternalModuleLoader__
 from ayx.DatastreamUtils import Config as __Config__
+from ayx.Stats import collector as __StatsCollector__
+from ayx.Session import Session as __Session__
 
 
 def help(debug=None, **kwargs):
@@ -26,15 +29,88 @@ def help(debug=None, **kwargs):
     __Help__(debug=debug).display()
 
 
-def read(incoming_connection_name, batch_size=1, debug=None, **kwargs):
+def read(
+    incoming_connection_name,
+    batch_size="auto",
+    where=None,
+    fixed_decimal="float",
+    blobs="bytes",
+    out_of_core=False,
+    debug=None,
+    **kwargs
+):
     """
-    When running the workflow in Alteryx, this function will convert incoming data streams to pandas dataframes when executing the code written in the Python tool. When called from the Jupyter notebook interactively, it will read in a copy of the incoming data that was cached on the previous run of the Alteryx workflow.
+    When running the workflow in Alteryx, this function will convert incoming data streams to pandas dataframes when executing the code written in the Python tool. When called from the Jupyter notebook interactively, it will read in a copy of the incoming data that was cached on the previous run of the Alteryx workflow. The optional batch_size argument is the number of records read per call when the cached data is a yxdb file -- by default ("auto") it is chosen from the width of the records and adjusted while reading based on the measured throughput.
+
+    The optional where argument only reads the records matching a dict of column names and values (or lists of values) -- eg, Alteryx.read("#1", where={"customer_id": [5, 8]}). When the data is cached as sqlite, the columns that are repeatedly filtered on are indexed automatically (see also Alteryx.createIndex).
+
+    Fixed Decimal columns are returned as floats by default. Set fixed_decimal="scaled" to instead get them exactly, as integers scaled by 10 to the power of the column's scale (eg, 12.34 in a Fixed Decimal 19.2 column is 1234), or fixed_decimal="decimal" to get decimal.Decimal values. To write scaled integers back to a Fixed Decimal column, include "scaled": True in the column's metadata -- eg, Alteryx.write(df, 1, columns={"price": {"type": "Fixed Decimal", "length": (19, 2), "scaled": True}}).
+
+    Blob and SpatialObj columns are returned as bytes by default. Set blobs="memoryview" to instead get each column's values stored back to back in one buffer, as memoryviews into it -- ayx.Blobs.BlobColumn.fromSeries(df["geometry"]) then gives the buffer, and the offsets and lengths of the values in it, without copying anything. Columns of memoryviews (or bytearrays) can be written as they are.
+
+    For inputs too large to fit in memory, set out_of_core=True. The input is then decoded a chunk at a time into files in a scratch directory (see Settings.out_of_core_dir), and a MemmapFrame is returned instead of a dataframe: frame["amount"] is a pandas Series over a memory mapped file (so eg, frame["amount"].sum() pages the column in from disk rather than loading it), and frame.chunks() gives the records as dataframes of Settings.out_of_core_chunk_rows records each. The scratch files are removed by frame.close(), or when the frame is garbage collected.
     """
     return __CachedData__(debug=debug).read(
-        incoming_connection_name, batch_size=batch_size, **kwargs
+        incoming_connection_name,
+        batch_size=batch_size,
+        where=where,
+        fixed_decimal=fixed_decimal,
+        blobs=blobs,
+        out_of_core=out_of_core,
+        **kwargs
     )
 
 
+def createIndex(incoming_connection_name, columns, debug=None, **kwargs):
+    """
+    This function creates an index on one or more columns of the cached data for an incoming connection (eg, Alteryx.createIndex("#1", ["customer_id"])), so that Alteryx.read(where=...) and Alteryx.query() lookups on those columns don't have to scan every record. The index is kept until the workflow is re-run and the input is cached again. The input data must have been cached as sqlite (see Alteryx.setTempFormatAs).
+    """
+    return __CachedData__(debug=debug).createIndex(
+        incoming_connection_name, columns, **kwargs
+    )
+
+
+def readPartitions(incoming_connection_name, n, debug=None, **kwargs):
+    """
+    This function splits the cached data for an incoming connection into n contiguous ranges of records of about the same size, without reading the records themselves, and returns a list of n partitions. Each partition can be pickled and sent to another process, where partition.read() reads just its records as a pandas dataframe -- so the records can be processed on every core without first reading all of them in one process. For example:
+
+        from multiprocessing import Pool
+        def process(partition):
+            df = partition.read()
+            ...
+        with Pool(4) as pool:
+            results = pool.map(process, Alteryx.readPartitions("#1", 4))
+
+    The partitions are in order, so concatenating what they read gives the same records as Alteryx.read.
+    """
+    return __CachedData__(debug=debug).readPartitions(
+        incoming_connection_name, n, **kwargs
+    )
+
+
+def query(sql, chunksize=None, debug=None, **kwargs):
+    """
+    This function runs a SQL query against the cached input data and returns the result as a pandas dataframe. Refer to each incoming connection by its name in curly braces, and the query runs inside sqlite, so only the result is loaded into pandas (the inputs are not read in full). For example:
+
+        df = Alteryx.query("select region, sum(sales) as sales from {#1} group by region")
+        df = Alteryx.query("select * from {#1} a join {#2} b on a.id = b.id")
+
+    Set chunksize to a number of rows to instead get an iterator of dataframes of (at most) that many rows each, for results too large to load at once. The input data must have been cached as sqlite (see Alteryx.setTempFormatAs).
+    """
+    return __CachedData__(debug=debug).query(sql, chunksize=chunksize, **kwargs)
+
+
+def session(debug=None, **kwargs):
+    """
+    Use this function in a with statement to keep the cached input files open between calls -- within the block, Alteryx.read and Alteryx.readMetadata reuse the same connection (and its already-read metadata) for each incoming connection instead of opening and closing the file every time, and all of the connections are closed when the block ends. For example:
+
+        with Alteryx.session():
+            metadata = Alteryx.readMetadata("#1")
+            df = Alteryx.read("#1")
+    """
+    return __Session__(debug=debug)
+
+
 def readMetadata(incoming_connection_name, debug=None, **kwargs):
     """
     This function will return a dict having field names as keys being mapped to attributes that describe the input data stream (currently just 'type' and 'length'). For example,
@@ -84,12 +160,12 @@ def write(
     pandas_df,
     outgoing_connection_number,
     columns=None,
-    batch_size=1,
+    batch_size="auto",
     debug=None,
     **kwargs
 ):
     """
-    When running the workflow in Alteryx, this function will convert a pandas data frame to an Alteryx data stream and pass it out through one of the tool's five output anchors. When called from the Jupyter notebook interactively, it will display a preview of the pandas dataframe. An optional 'columns' argument allows column metadata to specify the field type, length, and name of columns in the output data stream.
+    When running the workflow in Alteryx, this function will convert a pandas data frame to an Alteryx data stream and pass it out through one of the tool's five output anchors. When called from the Jupyter notebook interactively, it will display a preview of the pandas dataframe. An optional 'columns' argument allows column metadata to specify the field type, length, and name of columns in the output data stream. As with Alteryx.read(), batch_size="auto" (the default) chooses how many records are written per call to a yxdb file. When running interactively, if the same data is written to the same output anchor again (eg, when re-running a cell), the existing output is kept instead of being written again.
     """
     return __CachedData__(debug=debug).write(
         pandas_df,
@@ -100,12 +176,40 @@ def write(
     )
 
 
-def writePlot(matplotlib_pyplot, outgoing_connection_number, debug=None, **kwargs):
+def writePlot(
+    matplotlib_pyplot,
+    outgoing_connection_number,
+    output_type=None,
+    debug=None,
+    **kwargs
+):
     """
-    When running the workflow in Alteryx, this function will convert a plot created with matplotlib to an Alteryx data stream and pass it out through one of the tool's five output anchors. When called from the Jupyter notebook interactively, it will display a preview of the plot.
+    When running the workflow in Alteryx, this function will convert a plot created with matplotlib to an Alteryx data stream and pass it out through one of the tool's five output anchors. When called from the Jupyter notebook interactively, it will display a preview of the plot. The optional output_type argument sets how the plot is passed out: "path" (the default) is an img tag pointing to a saved png file, "data_uri" is an img tag with the png embedded in it, and "blob" is the png itself in a Blob field.
     """
     return __CachedData__(debug=debug).writePlot(
-        matplotlib_pyplot, outgoing_connection_number, **kwargs
+        matplotlib_pyplot, outgoing_connection_number, output_type=output_type, **kwargs
+    )
+
+
+def writePlots(
+    matplotlib_figures,
+    outgoing_connection_number,
+    labels=None,
+    output_type=None,
+    processes=None,
+    debug=None,
+    **kwargs
+):
+    """
+    Like Alteryx.writePlot(), but for a list of matplotlib figures: the figures are rendered in parallel worker processes and passed out through one of the tool's five output anchors as a single data stream, with one row per figure (a Label field -- from the optional list of labels -- and a Plot field). The optional output_type argument works as it does for Alteryx.writePlot(), and processes sets the number of worker processes (by default, one per cpu).
+    """
+    return __CachedData__(debug=debug).writePlots(
+        matplotlib_figures,
+        outgoing_connection_number,
+        labels=labels,
+        output_type=output_type,
+        processes=processes,
+        **kwargs
     )
 
 
@@ -137,28 +241,64 @@ def getWorkflowConstants(debug=None, **kwargs):
     return __CachedData__(debug=debug).getWorkflowConstants(**kwargs)
 
 
-def importPythonModule(path, submodules=True, debug=None, **kwargs):
+def importPythonModule(path, submodules=True, reload=False, debug=None, **kwargs):
     """
-    This function will import a python script or directory module and returns it as a module.
+    This function will import a python script, jupyter notebook (the code cells of an .ipynb file, with any ipython magics left out) or directory module and returns it as a module. The module is cached, so importing it again returns the same module (without running it again) until its source files change -- use reload=True to run it again anyway. (For a directory module, a change is a module being added, removed or saved over, or an __init__.py being edited -- use reload=True after editing another module in place.) For directory modules, submodules can be True (import all submodules), False, a list of submodule names, or "lazy" (import each submodule the first time it is used).
     """
     return __ExternalModuleLoader__(path=path, debug=debug).importPythonModule(
-        if_pkg_load_submodules=submodules, **kwargs
+        if_pkg_load_submodules=submodules, reload=reload, **kwargs
     )
 
 
-def installPackage(package, install_type=None, debug=None, **kwargs):
+def installPackage(
+    package, install_type=None, wheelhouse=None, force=None, debug=None, **kwargs
+):
     """
-    This function will install a package or list of packages into the virtual environment used by the Python tool. If using an admin installation of Alteryx, you must run Alteryx as administrator in order to use this function and install packages.
+    This function will install a package or list of packages into the virtual environment used by the Python tool. If using an admin installation of Alteryx, you must run Alteryx as administrator in order to use this function and install packages. Packages that are already installed (and match any version specifiers, eg "pandas>=0.23") are skipped unless force=True. The optional wheelhouse argument is a directory of wheel files to install from instead of PyPI (no internet connection needed).
     """
-    __installPackages__(package, install_type=install_type, debug=debug, **kwargs)
+    __installPackages__(
+        package,
+        install_type=install_type,
+        wheelhouse=wheelhouse,
+        force=force,
+        debug=debug,
+        **kwargs
+    )
 
 
 # these are the same function.
 installPackages = installPackage
 
 
-def setTempFormatAs(temp_format, debug=None, **kwargs):
+def checkRequirements(requirements, debug=None, **kwargs):
+    """
+    This function will check whether a requirement or list of requirements (package names, with optional version specifiers -- eg, ["pandas>=0.23", "keras"]) is satisfied by the packages installed in the virtual environment used by the Python tool, and returns a dict mapping each requirement to True or False. Packages are checked without importing them, using an index of the installed packages that is cached between runs.
+    """
+    return __checkRequirements__(requirements, debug=debug, **kwargs)
+
+
+def setTempFormatAs(temp_format, compression=None, debug=None, **kwargs):
+    """
+    Set the temp file format as either yxdb or sqlite, and optionally compress the temp files with compression="lz4" or "zstd" (which require the lz4 or zstandard packages) or "gzip". Compressed files are streamed through the codec in chunks, which costs some CPU time but can save much more when the temp files are on a slow (eg, network) drive.
+    """
+    __Config__(debug=debug, **kwargs).setTempFormatAs(
+        temp_format, compression=compression
+    )
+
+
+def enableStats(
+    enabled=True, log_filepath=None, track_memory=False, debug=None, **kwargs
+):
+    """
+    Turn on (or off, with enabled=False) the collection of timing stats for Alteryx.read, Alteryx.write and Alteryx.readMetadata calls. If a log_filepath is provided, the stats for each call will also be appended to that file (one json object per line). Stats are off by default, and cost next to nothing when off. Set track_memory=True to also record the peak and retained memory of each read/write, and the estimated memory used by each column of the dataframe (this slows reads and writes down, so only turn it on when investigating memory usage).
+    """
+    __StatsCollector__.configure(
+        enabled=enabled, log_filepath=log_filepath, track_memory=track_memory, **kwargs
+    )
+
+
+def getStats(reset=False, debug=None, **kwargs):
     """
-    Set the temp file format as either yxdb or sqlite
+    This function will return a list of dicts describing each Alteryx.read, Alteryx.write and Alteryx.readMetadata call made since stats were turned on with Alteryx.enableStats() -- the seconds spent in each phase (config parsing, opening the file, metadata conversion, decoding, dataframe construction, writing), the row, column and byte counts, and the resulting throughput. Set reset=True to clear the stats collected so far.
     """
-    __Config__(debug=debug, **kwargs).setTempFormatAs(temp_format)
+    return __StatsCollector__.getStats(reset=reset, **kwargs)
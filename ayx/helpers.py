@@ -13,7 +13,6 @@
 # under the License.
 import os
 import string
-from IPython.display import display, Markdown
 
 def convertObjToStr(obj):
     try:
@@ -127,6 +126,9 @@ def prepareMultilineMarkdownForDisplay(markdown):
 
 
 def displayMarkdown(markdown):
+    # (IPython is slow to import, so only import it when something is displayed)
+    from IPython.display import display, Markdown
+
     # display the prepared markdown as formatted text
     display(Markdown(markdown))
 
@@ -0,0 +1,113 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import shutil, sqlite3
+from unittest import TestCase
+from unittest.mock import patch
+import pandas as pd
+from ayx.Alteryx import read, createIndex
+from ayx import CachedData, Settings
+from ayx.Datafiles import Datafile, whereClause, whereFilter
+from ayx.helpers import deleteFile
+
+# cached file of input connection "#2" (restored after each test, since
+# indexes are added to the cached file itself)
+input_filename = "input_ayx137028f06553292c2fbe34041601684b.sqlite"
+backup_filename = "{}.bak".format(input_filename)
+
+
+def inputIndex(columns):
+    with Datafile(input_filename) as db:
+        return db.findIndex(columns)
+
+
+class TestWhere(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({"id": [1, 2, 3, None], "name": list("abcd")})
+
+    def testClause(self):
+        self.assertEqual(whereClause({"id": 1}), ('("id" = ?)', [1]))
+        self.assertEqual(
+            whereClause({"id": [1, None], "name": ["a", "b"]}),
+            ('("id" is null or "id" = ?) and ("name" in (?, ?))', [1, "a", "b"]),
+        )
+
+    def testFilter(self):
+        self.assertEqual(
+            whereFilter(self.data, {"id": [1, 3]})["name"].tolist(), ["a", "c"]
+        )
+        self.assertEqual(whereFilter(self.data, {"id": None})["name"].tolist(), ["d"])
+        self.assertEqual(whereFilter(self.data, {"id": []}).shape[0], 0)
+
+
+class TestAlteryxCreateIndex(TestCase):
+    def setUp(self):
+        shutil.copy2(input_filename, backup_filename)
+        CachedData.where_observations.clear()
+        self.auto_index_threshold = Settings.auto_index_threshold
+        self.data = read("#2")
+
+    def testReadWhere(self):
+        expected = self.data[self.data["RowCount"].isin([3, 7])].reset_index(drop=True)
+        self.assertTrue(read("#2", where={"RowCount": [3, 7]}).equals(expected))
+
+    def testInvalidWhere(self):
+        with self.assertRaises(TypeError):
+            read("#2", where="RowCount = 3")
+        with self.assertRaises(ValueError):
+            read("#2", where={"missing": 3})
+
+    def testCreateIndex(self):
+        self.assertIsNone(inputIndex(["RowCount"]))
+        index_name = createIndex("#2", ["RowCount"])
+        self.assertEqual(inputIndex(["RowCount"]), index_name)
+        # (an existing index is reused)
+        self.assertEqual(createIndex("#2", "RowCount"), index_name)
+        self.assertTrue(read("#2").equals(self.data))
+
+    def testInvalidColumns(self):
+        with self.assertRaises(ValueError):
+            createIndex("#2", ["missing"])
+        with self.assertRaises(TypeError):
+            createIndex("#2", [1])
+
+    def testAutomaticIndex(self):
+        Settings.auto_index_threshold = 2
+        read("#2", where={"hash": "x"})
+        self.assertIsNone(inputIndex(["hash"]))
+        read("#2", where={"hash": "y"})
+        self.assertIsNotNone(inputIndex(["hash"]))
+
+    def testAutomaticIndexDisabled(self):
+        Settings.auto_index_threshold = None
+        for _ in range(5):
+            read("#2", where={"hash": "x"})
+        self.assertIsNone(inputIndex(["hash"]))
+
+    def testAutomaticIndexFailureDoesNotFailTheRead(self):
+        Settings.auto_index_threshold = 1
+        expected = self.data[self.data["RowCount"] == 3].reset_index(drop=True)
+        with patch.object(
+            Datafile,
+            "createIndex",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            data = read("#2", where={"RowCount": 3})
+        self.assertTrue(data.equals(expected))
+        self.assertIsNone(inputIndex(["RowCount"]))
+
+    def tearDown(self):
+        Settings.auto_index_threshold = self.auto_index_threshold
+        CachedData.where_observations.clear()
+        shutil.copy2(backup_filename, input_filename)
+        deleteFile(backup_filename)
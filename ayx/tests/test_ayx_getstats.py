@@ -0,0 +1,105 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+from unittest import TestCase
+from ayx.Alteryx import read, readMetadata, write, enableStats, getStats
+from ayx.helpers import deleteFile
+
+
+class TestAlteryxGetStatsDisabled(TestCase):
+    def setUp(self):
+        enableStats(False)
+        getStats(reset=True)
+
+    def testNoStatsWhenDisabled(self):
+        read("#1")
+        self.assertEqual(getStats(), [])
+
+
+class TestAlteryxGetStats(TestCase):
+    def setUp(self):
+        self.log_filepath = "stats_test_log.jsonl"
+        deleteFile(self.log_filepath)
+        enableStats(True, log_filepath=self.log_filepath)
+        getStats(reset=True)
+
+    def testReadStats(self):
+        data = read("#1")
+        stats = getStats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["call"], "read")
+        self.assertEqual(stats[0]["connection"], "#1")
+        self.assertEqual(stats[0]["rows"], data.shape[0])
+        self.assertTrue(stats[0]["bytes"] > 0)
+        for phase in ["config", "open", "metadata", "decode"]:
+            self.assertIn(phase, stats[0]["phases"])
+
+    def testReadMetadataStats(self):
+        readMetadata("#1")
+        stats = getStats()
+        self.assertEqual(stats[-1]["call"], "readMetadata")
+        self.assertIn("metadata", stats[-1]["phases"])
+
+    def testWriteStats(self):
+        data = read("#1")
+        write(data, 5)
+        stats = getStats()
+        self.assertEqual(stats[-1]["call"], "write")
+        self.assertEqual(stats[-1]["rows"], data.shape[0])
+        self.assertIn("write", stats[-1]["phases"])
+        deleteFile("output_5.yxdb")
+
+    def testReset(self):
+        read("#1")
+        getStats(reset=True)
+        self.assertEqual(getStats(), [])
+
+    def testRunLog(self):
+        read("#1")
+        read("#1")
+        with open(self.log_filepath) as fp:
+            lines = fp.readlines()
+        self.assertEqual(len(lines), 2)
+
+    def tearDown(self):
+        enableStats(False)
+        getStats(reset=True)
+        deleteFile(self.log_filepath)
+
+
+class TestAlteryxGetStatsMemory(TestCase):
+    def setUp(self):
+        enableStats(True, track_memory=True)
+        getStats(reset=True)
+
+    def testReadMemory(self):
+        data = read("#1")
+        stats = getStats()[-1]
+        memory = stats["memory"]["getData"]
+        self.assertTrue(memory["traced_peak_bytes"] > 0)
+        self.assertIn("rss_peak_bytes", memory)
+        self.assertCountEqual(
+            [str(column) for column in data.columns], stats["column_memory_bytes"]
+        )
+
+    def testWriteMemory(self):
+        write(read("#1"), 5)
+        stats = getStats()[-1]
+        self.assertIn("writeData", stats["memory"])
+        self.assertTrue(stats["dataframe_memory_bytes"] > 0)
+        deleteFile("output_5.yxdb")
+
+    def tearDown(self):
+        enableStats(False)
+        getStats(reset=True)
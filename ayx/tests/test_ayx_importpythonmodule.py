@@ -11,10 +11,12 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
-import os
+import os, sys, json, shutil, tempfile
 from unittest import TestCase
+from unittest.mock import patch
 from ayx.tests.testdata.datafiles import getTestFileName, getTestFileTables
 from ayx.Alteryx import importPythonModule
+from ayx import Settings
 
 class TestAlteryxImportPythonFile(TestCase):
 
@@ -74,3 +76,191 @@ class TestAlteryxImportPythonPackageDir(TestCase):
         # all submodules
         pkgtest3 = importPythonModule(self.script_absolute_filepath)
         self.assertEqual(pkgtest3.xxx.test3.myfunction(), 'xxx.test3.myfunction')
+
+
+class TestAlteryxImportPythonModuleCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.script_filepath = os.path.join(self.directory, 'cached_script.py')
+        self.package_directory = os.path.join(self.directory, 'cached_package')
+        os.mkdir(self.package_directory)
+        self.writeSource(self.script_filepath, 'value = 1\ncalls = []\n')
+        self.writeSource(os.path.join(self.package_directory, '__init__.py'), 'value = 1\n')
+
+    def writeSource(self, filepath, source):
+        # (bump the mtime, so a change is seen even within the same second)
+        mtime = os.stat(filepath).st_mtime_ns + 10**9 if os.path.isfile(filepath) else None
+        with open(filepath, 'w') as f:
+            f.write(source)
+        if mtime is not None:
+            os.utime(filepath, ns=(mtime, mtime))
+
+    def testScriptReused(self):
+        first = importPythonModule(self.script_filepath)
+        first.calls.append(1)
+        second = importPythonModule(self.script_filepath)
+        self.assertIs(first, second)
+        self.assertEqual(second.calls, [1])
+        self.assertIn(first.__name__, sys.modules)
+
+    def testScriptChanged(self):
+        importPythonModule(self.script_filepath)
+        self.writeSource(self.script_filepath, 'value = 2\ncalls = []\n')
+        self.assertEqual(importPythonModule(self.script_filepath).value, 2)
+
+    def testScriptReload(self):
+        first = importPythonModule(self.script_filepath)
+        first.calls.append(1)
+        second = importPythonModule(self.script_filepath, reload=True)
+        self.assertEqual(second.calls, [])
+
+    def testPackageReused(self):
+        first = importPythonModule(self.package_directory)
+        self.assertIs(first, importPythonModule(self.package_directory))
+
+    def testPackageChanged(self):
+        importPythonModule(self.package_directory)
+        self.writeSource(os.path.join(self.package_directory, '__init__.py'), 'value = 2\n')
+        self.assertEqual(importPythonModule(self.package_directory).value, 2)
+
+    def testPackageModuleAdded(self):
+        importPythonModule(self.package_directory)
+        self.writeSource(os.path.join(self.package_directory, 'added.py'), 'value = 3\n')
+        # (bump the directory's mtime too, in case it's coarse)
+        mtime = os.stat(self.package_directory).st_mtime_ns + 10**9
+        os.utime(self.package_directory, ns=(mtime, mtime))
+        self.assertEqual(importPythonModule(self.package_directory).added.value, 3)
+
+    def testPackageReusedWithoutStatingModules(self):
+        self.writeSource(os.path.join(self.package_directory, 'module.py'), 'value = 1\n')
+        first = importPythonModule(self.package_directory)
+        with patch('os.stat', wraps=os.stat) as stat:
+            self.assertIs(first, importPythonModule(self.package_directory))
+        stated = [os.path.basename(str(call[0][0])) for call in stat.call_args_list]
+        self.assertNotIn('module.py', stated)
+
+    def testInstalledPackageOfTheSameNameKept(self):
+        json_directory = os.path.join(self.directory, 'json')
+        os.mkdir(json_directory)
+        self.writeSource(os.path.join(json_directory, '__init__.py'), 'value = 1\n')
+        with self.assertRaises(ImportError):
+            importPythonModule(json_directory)
+        self.assertIs(sys.modules['json'], json)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TestAlteryxImportNotebook(TestCase):
+
+    def setUp(self):
+        self.cache_directory = Settings.cache_directory
+        self.directory = tempfile.mkdtemp()
+        Settings.cache_directory = os.path.join(self.directory, 'cache')
+        self.notebook_filepath = os.path.join(self.directory, 'helpers.ipynb')
+        cells = [
+            {'cell_type': 'markdown', 'source': ['# helpers']},
+            {'cell_type': 'code', 'source': ['%matplotlib inline\n', 'import os\n']},
+            {'cell_type': 'code', 'source': ['%%bash\n', 'echo hi\n']},
+            {'cell_type': 'code', 'source': [
+                'def myfunction():\n',
+                '    if True:\n',
+                '        !echo indented magic\n',
+                '    return 1\n'
+                ]},
+            ]
+        with open(self.notebook_filepath, 'w') as f:
+            json.dump({'cells': cells, 'metadata': {}, 'nbformat': 4, 'nbformat_minor': 2}, f)
+
+    def testImportNotebook(self):
+        notebook = importPythonModule(self.notebook_filepath)
+        self.assertEqual(notebook.myfunction(), 1)
+        self.assertIn(notebook.__name__, sys.modules)
+
+    def testBytecodeCached(self):
+        importPythonModule(self.notebook_filepath)
+        cached = os.listdir(os.path.join(Settings.cache_directory, 'notebooks'))
+        self.assertEqual(len(cached), 1)
+        notebook = importPythonModule(self.notebook_filepath, reload=True)
+        self.assertEqual(notebook.myfunction(), 1)
+
+    def tearDown(self):
+        Settings.cache_directory = self.cache_directory
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TestAlteryxImportPythonPackageLazy(TestCase):
+
+    def setUp(self):
+        self.cache_directory = Settings.cache_directory
+        self.directory = tempfile.mkdtemp()
+        Settings.cache_directory = os.path.join(self.directory, 'cache')
+        self.package_directory = os.path.join(self.directory, 'lazy_package')
+        os.makedirs(os.path.join(self.package_directory, 'subpackage'))
+        sources = {
+            '__init__.py': 'x = 1\n',
+            'sub1.py': 'value = "sub1"\n',
+            os.path.join('subpackage', '__init__.py'): '',
+            os.path.join('subpackage', 'deep.py'): 'value = "deep"\n',
+            }
+        for filename, source in sources.items():
+            with open(os.path.join(self.package_directory, filename), 'w') as f:
+                f.write(source)
+
+    def testSubmodulesNotImportedUntilUsed(self):
+        package = importPythonModule(self.package_directory, submodules='lazy')
+        self.assertNotIn('lazy_package.sub1', sys.modules)
+        self.assertEqual(package.sub1.value, 'sub1')
+        self.assertIn('lazy_package.sub1', sys.modules)
+        self.assertNotIn('lazy_package.subpackage.deep', sys.modules)
+        self.assertEqual(package.subpackage.deep.value, 'deep')
+
+    def testMissingAttribute(self):
+        package = importPythonModule(self.package_directory, submodules='lazy')
+        with self.assertRaises(AttributeError):
+            package.not_a_submodule
+
+    def testPackageScanCached(self):
+        importPythonModule(self.package_directory, submodules='lazy')
+        cached = os.listdir(os.path.join(Settings.cache_directory, 'packages'))
+        self.assertEqual(len(cached), 1)
+
+    def tearDown(self):
+        Settings.cache_directory = self.cache_directory
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class TestAlteryxImportPythonFileBytecodeCache(TestCase):
+
+    def setUp(self):
+        self.cache_directory = Settings.cache_directory
+        self.directory = tempfile.mkdtemp()
+        Settings.cache_directory = os.path.join(self.directory, 'cache')
+        self.script_filepath = os.path.join(self.directory, 'bytecode_script.py')
+        with open(self.script_filepath, 'w') as f:
+            f.write('def myfunction():\n    return 1\n')
+
+    def cachedFiles(self):
+        return os.listdir(os.path.join(Settings.cache_directory, 'scripts'))
+
+    def testBytecodeCached(self):
+        importPythonModule(self.script_filepath)
+        self.assertEqual(len(self.cachedFiles()), 1)
+        script = importPythonModule(self.script_filepath, reload=True)
+        self.assertEqual(script.myfunction(), 1)
+        self.assertEqual(script.__file__, self.script_filepath)
+
+    def testStaleBytecodeReplaced(self):
+        importPythonModule(self.script_filepath)
+        first = self.cachedFiles()
+        with open(self.script_filepath, 'w') as f:
+            f.write('def myfunction():\n    return 22\n')
+        script = importPythonModule(self.script_filepath, reload=True)
+        self.assertEqual(script.myfunction(), 22)
+        self.assertEqual(len(self.cachedFiles()), 1)
+        self.assertNotEqual(self.cachedFiles(), first)
+
+    def tearDown(self):
+        Settings.cache_directory = self.cache_directory
+        shutil.rmtree(self.directory, ignore_errors=True)
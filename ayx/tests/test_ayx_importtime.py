@@ -0,0 +1,54 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os, sys, json, subprocess
+from unittest import TestCase
+
+# cold start budget for `from ayx import Alteryx` (seconds) -- this is paid
+# by every python tool in a workflow, so keep it well below what importing
+# matplotlib and IPython would add
+import_time_budget = 3.0
+
+# modules that should only be imported when a plot or help is displayed
+lazy_modules = ["matplotlib", "IPython"]
+
+import_script = """
+import sys, json, time
+start = time.perf_counter()
+from ayx import Alteryx
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+
+# import ayx in a fresh interpreter (the test process has already imported it)
+def coldImport():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    output = subprocess.check_output(
+        [sys.executable, "-c", import_script], env=env, universal_newlines=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestAlteryxImportTime(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = coldImport()
+
+    def testHeavyModulesNotImported(self):
+        for module in lazy_modules:
+            self.assertNotIn(module, self.result["modules"])
+
+    def testImportTimeBudget(self):
+        self.assertLess(self.result["seconds"], import_time_budget)
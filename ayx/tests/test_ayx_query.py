@@ -0,0 +1,66 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import sqlite3
+from unittest import TestCase
+import pandas as pd
+from ayx.Alteryx import read, query
+
+
+class TestAlteryxQuery(TestCase):
+    def setUp(self):
+        self.input_1 = read("#1")
+        self.input_2 = read("#2")
+
+    def testSelectAll(self):
+        self.assertTrue(query("select * from {#1}").equals(self.input_1))
+
+    def testAggregate(self):
+        result = query("select count(*) as n from {#2}")
+        self.assertEqual(result["n"][0], len(self.input_2))
+
+    def testJoin(self):
+        result = query("select count(*) as n from {#1} a, {#2} b")
+        self.assertEqual(result["n"][0], len(self.input_1) * len(self.input_2))
+
+    def testChunks(self):
+        chunks = list(query("select * from {#2}", chunksize=3))
+        self.assertTrue(all(len(chunk) <= 3 for chunk in chunks))
+        self.assertTrue(pd.concat(chunks, ignore_index=True).equals(self.input_2))
+
+    def testInputsAreReadOnly(self):
+        with self.assertRaises(pd.io.sql.DatabaseError):
+            query("insert into {#1} select * from {#1}")
+        self.assertTrue(read("#1").equals(self.input_1))
+
+    def testNoPlaceholders(self):
+        with self.assertRaises(ValueError):
+            query("select 1")
+
+    def testNotAString(self):
+        with self.assertRaises(TypeError):
+            query(1)
+
+    def testInvalidChunksize(self):
+        with self.assertRaises(TypeError):
+            query("select * from {#1}", chunksize="10")
+        with self.assertRaises(ValueError):
+            query("select * from {#1}", chunksize=0)
+
+    def testUnknownConnection(self):
+        with self.assertRaises(ReferenceError):
+            query("select * from {#9}")
+
+    def testYxdbInput(self):
+        with self.assertRaises(ValueError):
+            query("select * from {#4y}")
@@ -0,0 +1,133 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+from unittest import TestCase
+from unittest.mock import patch
+import numpy
+import pandas as pd
+from ayx.Alteryx import read
+from ayx import Settings
+from ayx.Datafiles import Datafile
+from ayx.OutOfCore import readOutOfCore
+from ayx.helpers import deleteFile
+
+
+class TestAlteryxReadOutOfCore(TestCase):
+    def setUp(self):
+        self.chunk_rows = Settings.out_of_core_chunk_rows
+        # (several chunks, and a partial one)
+        Settings.out_of_core_chunk_rows = 30
+        self.frame = read("#2", out_of_core=True)
+
+    def testSameAsRead(self):
+        data = read("#2")
+        self.assertEqual(self.frame.shape, data.shape)
+        self.assertEqual(self.frame.columns, list(data.columns))
+        self.assertTrue(self.frame.toDataFrame().equals(data))
+        self.assertTrue(self.frame.head(3).equals(data.head(3)))
+
+    def testNumericColumnsAreMemoryMapped(self):
+        self.assertIsInstance(self.frame["RowCount"].values, numpy.memmap)
+        self.assertEqual(self.frame["RowCount"].sum(), 5050)
+
+    def testChunks(self):
+        self.assertEqual(
+            [len(chunk) for chunk in self.frame.chunks()], [30, 30, 30, 10]
+        )
+
+    def testTextSlicesAcrossChunks(self):
+        data = read("#2")
+        for start, stop in [(0, 5), (28, 33), (59, 61), (95, None)]:
+            self.assertEqual(
+                self.frame.column("hash", start, stop).tolist(),
+                data["hash"][start:stop].tolist(),
+            )
+
+    def testTextSliceOnlyReadsItsRows(self):
+        # (the offsets are stored, rather than summed from the lengths of
+        # every row before the slice)
+        with patch.object(numpy, "cumsum", side_effect=AssertionError):
+            self.assertEqual(len(self.frame.column("hash", 90, 95)), 5)
+
+    def testWhere(self):
+        frame = read("#2", where={"RowCount": [5, 8]}, out_of_core=True)
+        self.assertEqual(frame["RowCount"].tolist(), [5, 8])
+
+    def testScratchDirectoryRemoved(self):
+        directory = self.frame.directory
+        self.assertTrue(os.path.isdir(directory))
+        self.frame.close()
+        self.assertFalse(os.path.isdir(directory))
+
+    def testFixedDecimalModeNotSupported(self):
+        with self.assertRaises(ValueError):
+            read("#2", out_of_core=True, fixed_decimal="decimal")
+
+    def tearDown(self):
+        self.frame.close()
+        Settings.out_of_core_chunk_rows = self.chunk_rows
+
+
+class TestReadOutOfCore(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "flag": [True, None, False],
+                "amount": [1.5, None, 3.0],
+                "name": ["a", None, "ü"],
+                "shape": [b"\x00", None, b"\x01\x02"],
+            }
+        )
+        self.metadata = {
+            "id": {"type": "Int64", "length": (8,)},
+            "flag": {"type": "Boolean", "length": (1,)},
+            "amount": {"type": "Double", "length": (8,)},
+            "name": {"type": "V_WString", "length": (100,)},
+            "shape": {"type": "Blob", "length": (2147483647,)},
+        }
+        with Datafile("outofcore.yxdb", create_new=True) as db:
+            db.writeData(self.data, "data", metadata=self.metadata)
+
+    def testColumnKindsAndNulls(self):
+        with Datafile("outofcore.yxdb") as db:
+            frame = readOutOfCore(db.iterData(chunk_rows=2), db.columnKinds())
+        with frame:
+            self.assertEqual(
+                frame.kinds,
+                {
+                    "id": "int",
+                    "flag": "bool",
+                    "amount": "float",
+                    "name": "text",
+                    "shape": "bytes",
+                },
+            )
+            self.assertEqual(frame["id"].tolist(), [1, 2, 3])
+            self.assertEqual(frame["flag"].tolist(), [True, pd.NA, False])
+            self.assertTrue(numpy.isnan(frame["amount"][1]))
+            self.assertEqual(frame["name"].tolist(), ["a", None, "ü"])
+            self.assertEqual(frame["shape"].tolist(), [b"\x00", None, b"\x01\x02"])
+
+    def testNoRecords(self):
+        with Datafile("outofcore.yxdb") as db:
+            frame = readOutOfCore(db.iterData(), db.columnKinds())
+            empty = readOutOfCore(iter([self.data.head(0)]), db.columnKinds())
+        with frame, empty:
+            self.assertEqual(empty.shape, (0, 5))
+            self.assertEqual(empty["id"].tolist(), [])
+            self.assertEqual(empty["name"].tolist(), [])
+
+    def tearDown(self):
+        deleteFile("outofcore.yxdb")
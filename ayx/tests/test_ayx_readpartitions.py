@@ -0,0 +1,162 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import pickle
+from multiprocessing import Pool
+from unittest import TestCase
+import pandas as pd
+from ayx.Alteryx import read, readPartitions
+from ayx.Datafiles import Datafile, Partition, checkRows
+from ayx.helpers import deleteFile
+
+
+def rowCountSum(partition):
+    return int(partition.read()["RowCount"].sum())
+
+
+class TestAlteryxReadPartitions(TestCase):
+    def setUp(self):
+        self.data = read("#2")
+
+    def testPartitionsReadEverythingInOrder(self):
+        partitions = readPartitions("#2", 3)
+        self.assertEqual(len(partitions), 3)
+        parts = [partition.read() for partition in partitions]
+        self.assertEqual([len(part) for part in parts], [33, 33, 34])
+        self.assertTrue(pd.concat(parts, ignore_index=True).equals(self.data))
+
+    def testPicklable(self):
+        partition = pickle.loads(pickle.dumps(readPartitions("#2", 2)[1]))
+        self.assertTrue(partition.read().equals(self.data[50:].reset_index(drop=True)))
+
+    def testWorkerProcesses(self):
+        with Pool(2) as pool:
+            sums = pool.map(rowCountSum, readPartitions("#2", 4))
+        self.assertEqual(sum(sums), 5050)
+
+    def testMorePartitionsThanRecords(self):
+        partitions = readPartitions("#2", 150)
+        self.assertEqual(sum(len(partition.read()) for partition in partitions), 100)
+
+    def testWhere(self):
+        partition = readPartitions("#2", 2)[0]
+        self.assertEqual(
+            partition.read(where={"RowCount": [5, 80]})["RowCount"].tolist(), [5]
+        )
+
+    def testInvalidN(self):
+        for n in [0, -1]:
+            with self.assertRaises(ValueError):
+                readPartitions("#2", n)
+        for n in ["auto", True, 2.0, None]:
+            with self.assertRaises(TypeError):
+                readPartitions("#2", n)
+
+    def testInvalidNMessage(self):
+        with self.assertRaises(TypeError) as context:
+            readPartitions("#2", "auto")
+        self.assertIn("number of partitions", str(context.exception))
+        self.assertNotIn("batch_size", str(context.exception))
+
+
+class TestSqlitePartitions(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({"id": list(range(10))})
+        with Datafile("partitions.sqlite", create_new=True) as db:
+            db.writeData(self.data, "data")
+
+    def partitions(self, n):
+        with Datafile("partitions.sqlite") as db:
+            statements = []
+            db.connection.set_trace_callback(statements.append)
+            ranges = db.partitionRanges(n)
+            db.connection.set_trace_callback(None)
+        parts = [
+            Partition("partitions.sqlite", "sqlite", "data", rows).read()
+            for rows in ranges
+        ]
+        return ranges, parts, statements
+
+    def testConsecutiveRowids(self):
+        ranges, parts, statements = self.partitions(3)
+        self.assertEqual(ranges, [(1, 4), (4, 7), (7, None)])
+        self.assertEqual([len(part) for part in parts], [3, 3, 4])
+        # (the boundaries come from the count and rowid range alone)
+        self.assertFalse(any("order by" in statement for statement in statements))
+
+    def testGapsInRowids(self):
+        with Datafile("partitions.sqlite") as db:
+            db.connection.execute("delete from data where id in (2, 3, 7)")
+            db.connection.commit()
+        ranges, parts, statements = self.partitions(3)
+        self.assertEqual([len(part) for part in parts], [2, 2, 3])
+        self.assertEqual(
+            pd.concat(parts, ignore_index=True)["id"].tolist(), [0, 1, 4, 5, 6, 8, 9]
+        )
+        self.assertFalse(any("offset" in statement for statement in statements))
+
+    def testReadInRowidOrder(self):
+        with Datafile("partitions.sqlite") as db:
+            statements = []
+            db.connection.set_trace_callback(statements.append)
+            data = db.getData(rows=(6, None))
+            db.connection.set_trace_callback(None)
+        self.assertEqual(data["id"].tolist(), [5, 6, 7, 8, 9])
+        self.assertTrue(any("order by rowid" in statement for statement in statements))
+
+    def tearDown(self):
+        deleteFile("partitions.sqlite")
+
+
+class TestYxdbPartitions(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({"id": list(range(10))})
+        with Datafile("partitions.yxdb", create_new=True) as db:
+            db.writeData(
+                self.data, "data", metadata={"id": {"type": "Int64", "length": (8,)}}
+            )
+
+    def testRecordOffsets(self):
+        with Datafile("partitions.yxdb") as db:
+            ranges = db.partitionRanges(3)
+        self.assertEqual(ranges, [(0, 3), (3, 6), (6, None)])
+        parts = [
+            Partition("partitions.yxdb", "yxdb", None, rows).read() for rows in ranges
+        ]
+        self.assertEqual([len(part) for part in parts], [3, 3, 4])
+        self.assertTrue(pd.concat(parts, ignore_index=True).equals(self.data))
+
+    def testMorePartitionsThanRecords(self):
+        with Datafile("partitions.yxdb") as db:
+            ranges = db.partitionRanges(15)
+            with self.assertRaises(TypeError):
+                db.partitionRanges("auto")
+        parts = [
+            Partition("partitions.yxdb", "yxdb", None, rows).read() for rows in ranges
+        ]
+        self.assertEqual(len(parts), 15)
+        # (some of the partitions are empty)
+        self.assertEqual(sum(len(part) == 0 for part in parts), 5)
+        self.assertEqual(
+            pd.concat(parts, ignore_index=True)["id"].tolist(), list(range(10))
+        )
+
+    def testInvalidRows(self):
+        for rows in [None, (1,), ("0", 1), (None, 1)]:
+            with self.assertRaises(TypeError):
+                checkRows(rows)
+        with self.assertRaises(ValueError):
+            checkRows((5, 1))
+
+    def tearDown(self):
+        deleteFile("partitions.yxdb")
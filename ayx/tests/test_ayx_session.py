@@ -0,0 +1,70 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+from unittest import TestCase
+from ayx.Alteryx import read, readMetadata, session
+from ayx import Session
+
+
+class TestAlteryxSession(TestCase):
+    def setUp(self):
+        self.expected_data = read("#1")
+        self.expected_metadata = readMetadata("#1")
+
+    def testConnectionReused(self):
+        with session() as pool:
+            readMetadata("#1")
+            read("#1")
+            self.assertEqual(len(pool.datafiles), 1)
+            datafile, signature = list(pool.datafiles.values())[0]
+            connection = datafile.connection
+            read("#1")
+            self.assertEqual(len(pool.datafiles), 1)
+            self.assertIs(datafile.connection, connection)
+
+    def testSameResults(self):
+        with session():
+            self.assertEqual(readMetadata("#1"), self.expected_metadata)
+            self.assertTrue(read("#1").equals(self.expected_data))
+            self.assertTrue(read("#1").equals(self.expected_data))
+            self.assertEqual(readMetadata("#1"), self.expected_metadata)
+
+    def testClosedAtExit(self):
+        with session() as pool:
+            read("#1")
+            datafiles = [datafile for datafile, _ in pool.datafiles.values()]
+        self.assertIsNone(Session.current_session)
+        self.assertEqual(pool.datafiles, {})
+        for datafile in datafiles:
+            self.assertIsNone(datafile.connection)
+        with self.assertRaises(ValueError):
+            with pool:
+                pass
+
+    def testChangedFileReopened(self):
+        with session() as pool:
+            read("#1")
+            datafile, signature = list(pool.datafiles.values())[0]
+            stat = os.stat(datafile.filepath)
+            try:
+                os.utime(
+                    datafile.filepath,
+                    ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000),
+                )
+                self.assertTrue(read("#1").equals(self.expected_data))
+            finally:
+                os.utime(datafile.filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            reopened, _ = list(pool.datafiles.values())[0]
+            self.assertIsNot(reopened, datafile)
+            self.assertIsNone(datafile.connection)
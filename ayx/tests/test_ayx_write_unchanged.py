@@ -0,0 +1,141 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os, shutil, tempfile
+from unittest import TestCase
+from unittest.mock import patch
+import pandas as pd
+from ayx.Alteryx import read, write
+from ayx import CachedData, Settings
+from ayx.Datafiles import Datafile
+from ayx.DatastreamUtils import dataFingerprint
+from ayx.helpers import deleteFile
+
+output_filename = "output_4.yxdb"
+
+
+class TestDataFingerprint(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+    def testSameContent(self):
+        self.assertEqual(dataFingerprint(self.data), dataFingerprint(self.data.copy()))
+
+    def testChangedContent(self):
+        changed = self.data.copy()
+        changed.loc[1, "b"] = "changed"
+        self.assertNotEqual(dataFingerprint(self.data), dataFingerprint(changed))
+        renamed = self.data.rename(columns={"a": "c"})
+        self.assertNotEqual(dataFingerprint(self.data), dataFingerprint(renamed))
+        retyped = self.data.astype({"a": "float64"})
+        self.assertNotEqual(dataFingerprint(self.data), dataFingerprint(retyped))
+
+    def testWrittenWith(self):
+        self.assertNotEqual(
+            dataFingerprint(self.data, {"a": "Int64"}),
+            dataFingerprint(self.data, {"a": "Int32"}),
+        )
+
+    def testUnhashable(self):
+        self.assertIsNone(dataFingerprint(pd.DataFrame({"a": [[1], [2]]})))
+
+    def testHashingError(self):
+        with patch.object(
+            pd.util, "hash_pandas_object", side_effect=ValueError("unhashable")
+        ):
+            self.assertIsNone(dataFingerprint(self.data))
+
+    def testMemoryviews(self):
+        buffer = bytearray(b"abcd")
+        data = pd.DataFrame({"a": [memoryview(buffer)[:2], None]})
+        fingerprint = dataFingerprint(data)
+        self.assertIsNotNone(fingerprint)
+        buffer[0] = ord("x")
+        self.assertNotEqual(dataFingerprint(data), fingerprint)
+
+
+class TestAlteryxWriteUnchanged(TestCase):
+    def setUp(self):
+        self.data = read("#2")
+        self.skip_unchanged_outputs = Settings.skip_unchanged_outputs
+        self.cache_directory = Settings.cache_directory
+        Settings.skip_unchanged_outputs = True
+        Settings.cache_directory = tempfile.mkdtemp()
+        # (count the writes that actually encode the data)
+        writeData = Datafile.writeData
+        self.patcher = patch.object(
+            Datafile, "writeData", autospec=True, side_effect=writeData
+        )
+        self.writeData = self.patcher.start()
+
+    def testUnchangedSkipped(self):
+        write(self.data, 4)
+        write(self.data.copy(), 4)
+        self.assertEqual(self.writeData.call_count, 1)
+        self.assertTrue(os.path.isfile(output_filename))
+
+    def testFingerprintNotAlongsideOutput(self):
+        write(self.data, 4)
+        self.assertEqual(
+            [name for name in os.listdir(".") if name.startswith(output_filename)],
+            [output_filename],
+        )
+        fingerprints = os.path.join(Settings.cache_directory, "fingerprints")
+        self.assertEqual(len(os.listdir(fingerprints)), 1)
+
+    def testSameReturnValue(self):
+        written = write(self.data, 4)
+        skipped = write(self.data, 4)
+        self.assertEqual(self.writeData.call_count, 1)
+        self.assertIs(type(skipped), type(written))
+        self.assertTrue(skipped.equals(written))
+
+    def testChangedRewritten(self):
+        write(self.data, 4)
+        write(self.data.head(10), 4)
+        self.assertEqual(self.writeData.call_count, 2)
+
+    def testChangedMetadataRewritten(self):
+        write(self.data, 4)
+        write(self.data, 4, columns={"RowCount": {"type": "Int32"}})
+        self.assertEqual(self.writeData.call_count, 2)
+
+    def testReplacedOutputRewritten(self):
+        write(self.data, 4)
+        deleteFile(output_filename)
+        write(self.data, 4)
+        self.assertEqual(self.writeData.call_count, 2)
+        self.assertTrue(os.path.isfile(output_filename))
+
+    def testDisabled(self):
+        Settings.skip_unchanged_outputs = False
+        write(self.data, 4)
+        write(self.data, 4)
+        self.assertEqual(self.writeData.call_count, 2)
+
+    def testOnlyInteractiveByDefault(self):
+        Settings.skip_unchanged_outputs = None
+        write(self.data, 4)
+        write(self.data, 4)
+        self.assertEqual(self.writeData.call_count, 2)
+        with patch.object(CachedData, "isInteractive", return_value=True):
+            write(self.data, 4)
+            write(self.data, 4)
+        self.assertEqual(self.writeData.call_count, 3)
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(Settings.cache_directory, ignore_errors=True)
+        Settings.skip_unchanged_outputs = self.skip_unchanged_outputs
+        Settings.cache_directory = self.cache_directory
+        deleteFile(output_filename)
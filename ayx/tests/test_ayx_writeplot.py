@@ -0,0 +1,180 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+from unittest import TestCase
+from unittest.mock import patch
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from ayx.Alteryx import writePlot, writePlots
+from ayx import DatastreamUtils, Settings
+from ayx.DatastreamUtils import (
+    renderPlot,
+    renderPlots,
+    renderPng,
+    plotDataUri,
+    isInteractive,
+)
+from ayx.helpers import deleteFile
+
+
+class TestAlteryxWritePlot(TestCase):
+    def setUp(self):
+        self.figure, axes = plt.subplots()
+        axes.plot(range(10))
+
+    def testPath(self):
+        writePlot(self.figure, 4)
+        self.assertTrue(os.path.isfile("plot_4.png"))
+        self.assertTrue(os.path.isfile("output_4.yxdb"))
+
+    def testDataUri(self):
+        writePlot(self.figure, 4, output_type="data_uri")
+        self.assertFalse(os.path.isfile("plot_4.png"))
+        self.assertTrue(os.path.isfile("output_4.yxdb"))
+
+    def testBlob(self):
+        writePlot(self.figure, 4, output_type="blob")
+        self.assertFalse(os.path.isfile("plot_4.png"))
+        self.assertTrue(os.path.isfile("output_4.yxdb"))
+
+    def testInvalidOutputType(self):
+        with self.assertRaises(ValueError):
+            writePlot(self.figure, 4, output_type="svg")
+
+    def testNotAFigure(self):
+        with self.assertRaises(TypeError):
+            writePlot("plot", 4)
+
+    def tearDown(self):
+        plt.close(self.figure)
+        deleteFile("plot_4.png")
+        deleteFile("output_4.yxdb")
+
+
+class TestAlteryxWritePlots(TestCase):
+    def setUp(self):
+        self.figures = []
+        for index in range(3):
+            figure, axes = plt.subplots()
+            axes.plot(range(index + 2))
+            self.figures.append(figure)
+
+    def testPath(self):
+        writePlots(self.figures, 4)
+        for index in range(3):
+            self.assertTrue(os.path.isfile("plot_4_{}.png".format(index + 1)))
+        self.assertTrue(os.path.isfile("output_4.yxdb"))
+
+    def testBlobWithLabels(self):
+        writePlots(self.figures, 4, labels=["a", "b", "c"], output_type="blob")
+        self.assertTrue(os.path.isfile("output_4.yxdb"))
+
+    def testLabelsMismatch(self):
+        with self.assertRaises(ValueError):
+            writePlots(self.figures, 4, labels=["a", "b"])
+
+    def testNotAList(self):
+        with self.assertRaises(TypeError):
+            writePlots(self.figures[0], 4)
+
+    def testInvalidProcesses(self):
+        with self.assertRaises(ValueError):
+            writePlots(self.figures, 4, processes=0)
+
+    def tearDown(self):
+        for index, figure in enumerate(self.figures):
+            plt.close(figure)
+            deleteFile("plot_4_{}.png".format(index + 1))
+        deleteFile("output_4.yxdb")
+
+
+class TestRenderPlots(TestCase):
+    def setUp(self):
+        self.figures = []
+        for index in range(4):
+            figure, axes = plt.subplots()
+            axes.plot(range(index + 2))
+            self.figures.append(figure)
+        self.plot_parallel_min = Settings.plot_parallel_min
+        self.plot_cache_size = Settings.plot_cache_size
+        Settings.plot_parallel_min = 2
+        Settings.plot_cache_size = 0
+
+    def testParallelMatchesSerial(self):
+        expected = [renderPng(figure) for figure in self.figures]
+        self.assertEqual(renderPlots(self.figures, processes=2), expected)
+
+    def tearDown(self):
+        Settings.plot_parallel_min = self.plot_parallel_min
+        Settings.plot_cache_size = self.plot_cache_size
+        for figure in self.figures:
+            plt.close(figure)
+
+
+class TestRenderPlot(TestCase):
+    def setUp(self):
+        self.figure, self.axes = plt.subplots()
+        self.axes.plot(range(10))
+        # count renders (patched on the class -- the figure has to stay
+        # picklable for its hash)
+        savefig = Figure.savefig
+        self.patcher = patch.object(
+            Figure, "savefig", autospec=True, side_effect=savefig
+        )
+        self.savefig = self.patcher.start()
+        self.plot_cache_size = Settings.plot_cache_size
+        Settings.plot_cache_size = 16
+
+    def testPng(self):
+        png_bytes = renderPlot(self.figure)
+        self.assertTrue(png_bytes.startswith(b"\x89PNG"))
+        self.assertTrue(plotDataUri(png_bytes).startswith("data:image/png;base64,"))
+
+    def testUnchangedFigureNotRerendered(self):
+        first = renderPlot(self.figure)
+        second = renderPlot(self.figure)
+        self.assertEqual(self.savefig.call_count, 1)
+        self.assertEqual(first, second)
+
+    def testChangedFigureRerendered(self):
+        renderPlot(self.figure)
+        self.axes.set_title("changed")
+        renderPlot(self.figure)
+        self.assertEqual(self.savefig.call_count, 2)
+
+    def testFreshFigureHashedOnce(self):
+        with patch.object(
+            DatastreamUtils, "figureHash", wraps=DatastreamUtils.figureHash
+        ) as figure_hash:
+            renderPlot(self.figure)
+        self.assertEqual(figure_hash.call_count, 1)
+
+    def testNotHashedWithoutCache(self):
+        Settings.plot_cache_size = 0
+        with patch.object(DatastreamUtils, "figureHash") as figure_hash:
+            renderPlot(self.figure)
+            renderPlot(self.figure)
+        figure_hash.assert_not_called()
+        self.assertEqual(self.savefig.call_count, 2)
+
+    def testNotInteractive(self):
+        self.assertFalse(isInteractive())
+
+    def tearDown(self):
+        Settings.plot_cache_size = self.plot_cache_size
+        self.patcher.stop()
+        plt.close(self.figure)
@@ -0,0 +1,102 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from unittest import TestCase
+from unittest.mock import patch
+import pandas as pd
+from ayx.Alteryx import read, write
+from ayx import CachedData, Datafiles, Settings
+from ayx.DatastreamUtils import MetadataTools
+from ayx.Datafiles import Datafile
+from ayx.helpers import deleteFile
+
+output_filename = "output_4.yxdb"
+
+
+class TestWritePlanKey(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    def testSameSchema(self):
+        self.assertEqual(
+            CachedData.writePlanKey(self.data, None, "yxdb"),
+            CachedData.writePlanKey(self.data.head(1), None, "yxdb"),
+        )
+
+    def testDifferentSchema(self):
+        key = CachedData.writePlanKey(self.data, None, "yxdb")
+        self.assertNotEqual(key, CachedData.writePlanKey(self.data, None, "sqlite"))
+        self.assertNotEqual(
+            key,
+            CachedData.writePlanKey(self.data.astype({"a": "float64"}), None, "yxdb"),
+        )
+        self.assertNotEqual(
+            key, CachedData.writePlanKey(self.data, {"a": {"type": "Int16"}}, "yxdb")
+        )
+
+    def testUnserializableOverrides(self):
+        self.assertIsNone(
+            CachedData.writePlanKey(self.data, {"a": {"type": object()}}, "yxdb")
+        )
+
+
+class TestAlteryxWritePlanCache(TestCase):
+    def setUp(self):
+        self.data = read("#2")
+        self.skip_unchanged_outputs = Settings.skip_unchanged_outputs
+        Settings.skip_unchanged_outputs = False
+        CachedData.write_plans.clear()
+        Datafiles.yxdb_write_plans.clear()
+        convertTypeString = MetadataTools.convertTypeString
+        self.patcher = patch.object(
+            MetadataTools,
+            "convertTypeString",
+            autospec=True,
+            side_effect=convertTypeString,
+        )
+        self.convertTypeString = self.patcher.start()
+
+    def written(self):
+        with Datafile(output_filename, create_new=False) as db:
+            return db.getMetadata(), db.getData()
+
+    def testPlanReused(self):
+        write(self.data, 4)
+        calls = self.convertTypeString.call_count
+        self.assertTrue(calls > 0)
+        write(self.data.head(10), 4)
+        self.assertEqual(self.convertTypeString.call_count, calls)
+        self.assertEqual(len(CachedData.write_plans), 1)
+        self.assertEqual(len(Datafiles.yxdb_write_plans), 1)
+
+    def testOverridesCompiledSeparately(self):
+        write(self.data, 4)
+        calls = self.convertTypeString.call_count
+        default_metadata, _ = self.written()
+        write(self.data, 4, columns={"RowCount": {"type": "Int32"}})
+        self.assertTrue(self.convertTypeString.call_count > calls)
+        metadata, _ = self.written()
+        self.assertNotEqual(metadata[0]["type"], default_metadata[0]["type"])
+
+    def testSameOutputAsUncompiled(self):
+        write(self.data, 4)
+        expected = self.written()
+        write(self.data, 4)
+        cached = self.written()
+        self.assertEqual(cached[0], expected[0])
+        self.assertTrue(cached[1].equals(expected[1]))
+
+    def tearDown(self):
+        self.patcher.stop()
+        Settings.skip_unchanged_outputs = self.skip_unchanged_outputs
+        deleteFile(output_filename)
@@ -0,0 +1,118 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from unittest import TestCase
+from unittest.mock import patch
+import numpy
+import pandas as pd
+from ayx import Datafiles, Settings
+from ayx.Alteryx import read, write
+from ayx.Datafiles import Datafile, checkBatchSize, recordWidth, BatchSizer
+from ayx.helpers import deleteFile
+
+
+class TestCheckBatchSize(TestCase):
+    def testValid(self):
+        self.assertEqual(checkBatchSize("auto"), "auto")
+        self.assertEqual(checkBatchSize(1), 1)
+        self.assertEqual(checkBatchSize(10000), 10000)
+
+    def testInvalidType(self):
+        for batch_size in ["10", 1.5, True, None]:
+            with self.assertRaises(TypeError):
+                checkBatchSize(batch_size)
+
+    def testInvalidValue(self):
+        for batch_size in [0, -1]:
+            with self.assertRaises(ValueError):
+                checkBatchSize(batch_size)
+
+
+class TestRecordWidth(TestCase):
+    def testWiderRecords(self):
+        narrow = recordWidth([("Int64", 8)])
+        wide = recordWidth([("Int64", 8)] * 64)
+        self.assertTrue(wide > narrow)
+
+    def testVariableLengthStringsAreCapped(self):
+        # a default V_WString is 2GB max, but typical values are much shorter
+        width = recordWidth([("V_WString", 1073741823)])
+        self.assertTrue(width < 1000)
+
+
+class TestBatchSizer(TestCase):
+    def testInitialSizeFromRecordWidth(self):
+        sizer = BatchSizer(100, target_bytes=10000, max_size=1000)
+        self.assertEqual(sizer.batch_size, 100)
+        self.assertEqual(sizer.max_size, 400)
+
+    def testGrowsWhileThroughputImproves(self):
+        sizer = BatchSizer(100, target_bytes=10000, max_size=1000)
+        sizer.update(100, 1.0)
+        self.assertEqual(sizer.batch_size, 200)
+        sizer.update(200, 1.0)
+        self.assertEqual(sizer.batch_size, 400)
+        self.assertFalse(sizer.settled)
+
+    def testSettlesOnBestSize(self):
+        sizer = BatchSizer(100, target_bytes=10000, max_size=1000)
+        sizer.update(100, 1.0)
+        sizer.update(200, 1.0)
+        # twice the records in twice the time is no improvement
+        sizer.update(400, 2.0)
+        self.assertTrue(sizer.settled)
+        self.assertEqual(sizer.batch_size, 200)
+        sizer.update(200, 0.001)
+        self.assertEqual(sizer.batch_size, 200)
+
+    def testIgnoresPartialBatches(self):
+        sizer = BatchSizer(100, target_bytes=10000, max_size=1000)
+        sizer.update(10, 1.0)
+        self.assertEqual(sizer.batch_size, 100)
+
+
+class TestAutoBatchSizeRoundTrip(TestCase):
+    def setUp(self):
+        self.data = read("#1")
+
+    def testAutoMatchesFixedBatchSizes(self):
+        for batch_size in ["auto", 1, 3]:
+            write(self.data, 5, batch_size=batch_size)
+            deleteFile("output_5.yxdb")
+        self.assertEqual(read("#1", batch_size="auto").shape, self.data.shape)
+        self.assertTrue(read("#1", batch_size=2).equals(read("#1", batch_size="auto")))
+
+
+class TestSmallBatchesShareAnEncoding(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {"number": numpy.arange(2500) / 4, "count": numpy.arange(2500)}
+        )
+        self.metadata = {
+            "number": {"type": "Double", "length": (8,)},
+            "count": {"type": "Int64", "length": (8,)},
+        }
+
+    def testColumnsAreEncodedABlockAtATime(self):
+        with patch.object(
+            Datafiles, "encodeColumn", wraps=Datafiles.encodeColumn
+        ) as encode:
+            with Datafile("batches.yxdb", create_new=True) as db:
+                db.writeData(self.data, "data", self.metadata, batch_size=1)
+        blocks = -(-len(self.data) // Settings.write_encode_rows)
+        self.assertEqual(encode.call_count, blocks * self.data.shape[1])
+        with Datafile("batches.yxdb") as db:
+            self.assertTrue(db.getData().equals(self.data))
+
+    def tearDown(self):
+        deleteFile("batches.yxdb")
@@ -0,0 +1,147 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os, shutil, tempfile
+from unittest import TestCase
+import pandas as pd
+from ayx import Settings
+from ayx.Blobs import BlobColumn, bufferAddress, checkBlobs, isBlobType, blobBatch
+from ayx.CachedData import CachedData
+from ayx.Datafiles import Datafile
+from ayx.helpers import deleteFile
+
+
+class TestBlobColumn(TestCase):
+    def setUp(self):
+        self.column = BlobColumn()
+        self.column.extend([b"ab", None, b"", b"cdef"])
+
+    def testOffsetsAndLengths(self):
+        self.assertEqual(bytes(self.column.buffer), b"abcdef")
+        self.assertEqual(self.column.offsets.tolist(), [0, 2, 2, 2])
+        self.assertEqual(self.column.lengths.tolist(), [2, -1, 0, 4])
+        self.assertEqual(self.column.tolist(), [b"ab", None, b"", b"cdef"])
+
+    def testMemoryviewsShareTheBuffer(self):
+        values = self.column.toSeries()
+        self.assertIsNone(values[1])
+        self.assertEqual(values[3].tobytes(), b"cdef")
+        self.assertIs(values[3].obj, self.column.buffer)
+
+    def testMemoryviewsAreNotCopies(self):
+        buffer = self.column.buffer
+        values = self.column.toSeries()
+        self.assertIs(self.column.buffer, buffer)
+        self.assertEqual(bufferAddress(values[3]), bufferAddress(buffer) + 2)
+
+    def testMemoryviewsAreReadOnly(self):
+        values = self.column.toSeries()
+        self.assertTrue(values[3].readonly)
+        with self.assertRaises(TypeError):
+            values[3][0] = 0
+
+    def testFromSeriesWithoutCopying(self):
+        column = BlobColumn.fromSeries(self.column.toSeries())
+        self.assertIs(column.buffer, self.column.buffer)
+        self.assertEqual(column.lengths.tolist(), [2, -1, 0, 4])
+        self.assertEqual(column.offsets.tolist()[3], 2)
+
+    def testFromSeriesOfBytes(self):
+        column = BlobColumn.fromSeries(pd.Series([b"ab", None, bytearray(b"c")]))
+        self.assertEqual(bytes(column.buffer), b"abc")
+        self.assertEqual(column.lengths.tolist(), [2, -1, 1])
+
+    def testBlobBatch(self):
+        self.assertEqual(
+            blobBatch([memoryview(b"ab"), None, b"c"]), [b"ab", None, b"c"]
+        )
+
+    def testBlobTypes(self):
+        for type_name in ["Blob", "SpatialObj", "AlteryxSpatialObjectBlob", "blob"]:
+            self.assertTrue(isBlobType(type_name))
+        self.assertFalse(isBlobType("V_WString"))
+        with self.assertRaises(ValueError):
+            checkBlobs("buffer")
+
+
+class TestBlobsRoundTrip(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {"id": [1, 2, 3], "shape": [b"\x00\x01", None, b"\x02" * 1000]}
+        )
+
+    def write(self, filename, metadata):
+        with Datafile(filename, create_new=True) as db:
+            db.writeData(self.data, "data", metadata=metadata)
+
+    def assertRoundTrip(self, filename):
+        with Datafile(filename) as db:
+            data = db.getData(blobs="memoryview")
+            self.assertEqual(data["id"].tolist(), [1, 2, 3])
+            column = BlobColumn.fromSeries(data["shape"])
+            self.assertEqual(len(column.buffer), 1002)
+            self.assertEqual(column.tolist(), self.data["shape"].tolist())
+            self.assertEqual(
+                db.getData()["shape"].tolist(), self.data["shape"].tolist()
+            )
+            # (the memoryviews can be written back out as they are)
+            self.data = data
+
+    def testYxdb(self):
+        metadata = {
+            "id": {"type": "Int64", "length": (8,)},
+            "shape": {"type": "SpatialObj", "length": (2147483647,)},
+        }
+        self.write("blobs.yxdb", metadata)
+        self.assertRoundTrip("blobs.yxdb")
+        self.write("blobs.yxdb", metadata)
+        self.assertRoundTrip("blobs.yxdb")
+
+    def testSqlite(self):
+        metadata = {"shape": {"type_length": "AlteryxSpatialObjectBlob"}}
+        self.write("blobs.sqlite", metadata)
+        self.assertRoundTrip("blobs.sqlite")
+        self.write("blobs.sqlite", metadata)
+        self.assertRoundTrip("blobs.sqlite")
+
+    def testMemoryviewsThroughWrite(self):
+        self.write(
+            "blobs.sqlite", {"shape": {"type_length": "AlteryxSpatialObjectBlob"}}
+        )
+        with Datafile("blobs.sqlite") as db:
+            data = db.getData(blobs="memoryview")
+        columns = {"shape": {"type": "SpatialObj"}}
+        # (written, and then skipped as unchanged -- so it is fingerprinted)
+        skip_unchanged_outputs = Settings.skip_unchanged_outputs
+        cache_directory = Settings.cache_directory
+        Settings.skip_unchanged_outputs = True
+        Settings.cache_directory = tempfile.mkdtemp()
+        try:
+            for _ in range(2):
+                written = CachedData().write(data, 3, columns=columns)
+                self.assertIs(written, data)
+            fingerprints = os.path.join(Settings.cache_directory, "fingerprints")
+            self.assertEqual(len(os.listdir(fingerprints)), 1)
+        finally:
+            shutil.rmtree(Settings.cache_directory, ignore_errors=True)
+            Settings.skip_unchanged_outputs = skip_unchanged_outputs
+            Settings.cache_directory = cache_directory
+        with Datafile("output_3.yxdb") as db:
+            self.assertEqual(
+                db.getData()["shape"].tolist(), self.data["shape"].tolist()
+            )
+
+    def tearDown(self):
+        deleteFile("blobs.yxdb")
+        deleteFile("blobs.sqlite")
+        deleteFile("output_3.yxdb")
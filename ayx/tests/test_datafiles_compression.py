@@ -0,0 +1,125 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os
+import shutil
+from unittest import TestCase, skipUnless
+import pandas as pd
+from ayx.CachedData import CachedData
+from ayx.Compression import (
+    checkCompression,
+    compressFile,
+    decompressFile,
+    isCodecAvailable,
+)
+from ayx.Datafiles import Datafile, FileFormat
+from ayx.DatastreamUtils import Config
+from ayx.helpers import deleteFile
+
+config_filename = "config_compressed.json"
+
+
+class TestCheckCompression(TestCase):
+    def testValid(self):
+        self.assertIsNone(checkCompression(None))
+        self.assertEqual(checkCompression("lz4"), "lz4")
+
+    def testInvalid(self):
+        with self.assertRaises(TypeError):
+            checkCompression(1)
+        with self.assertRaises(ValueError):
+            checkCompression("zip")
+
+
+class TestFileFormatCompression(TestCase):
+    def testCompressedExtension(self):
+        fileformat = FileFormat("output_1.sqlite.lz4")
+        self.assertEqual(fileformat.filetype, "sqlite")
+        self.assertEqual(fileformat.compression, "lz4")
+        self.assertEqual(FileFormat("output_1.yxdb.zst").compression, "zstd")
+
+    def testUncompressed(self):
+        self.assertIsNone(FileFormat("output_1.sqlite").compression)
+
+
+class TestCodecRoundTrip(TestCase):
+    def setUp(self):
+        self.content = b"".join(str(i).encode() for i in range(100000))
+        with open("codec_source.bin", "wb") as fp:
+            fp.write(self.content)
+
+    def roundTrip(self, codec):
+        compressFile("codec_source.bin", "codec_compressed.bin", codec)
+        decompressFile("codec_compressed.bin", "codec_result.bin", codec)
+        self.assertTrue(os.path.getsize("codec_compressed.bin") < len(self.content))
+        with open("codec_result.bin", "rb") as fp:
+            self.assertEqual(fp.read(), self.content)
+
+    def testGzip(self):
+        self.roundTrip("gzip")
+
+    @skipUnless(isCodecAvailable("lz4"), "lz4 is not installed")
+    def testLz4(self):
+        self.roundTrip("lz4")
+
+    @skipUnless(isCodecAvailable("zstd"), "zstandard is not installed")
+    def testZstd(self):
+        self.roundTrip("zstd")
+
+    def tearDown(self):
+        for filename in [
+            "codec_source.bin",
+            "codec_compressed.bin",
+            "codec_result.bin",
+        ]:
+            deleteFile(filename)
+
+
+class TestCompressedOutput(TestCase):
+    def setUp(self):
+        shutil.copy2("jupyterPipes.json", config_filename)
+        self.data = pd.DataFrame({"id": range(1000), "name": ["x"] * 1000})
+
+    def write(self, temp_format):
+        Config(config_filename).setTempFormatAs(temp_format, compression="gzip")
+        CachedData(config_filename).write(self.data, 3)
+
+    def testSqlite(self):
+        self.write("sqlite")
+        self.assertTrue(os.path.isfile("output_3.sqlite.gz"))
+        self.assertFalse(os.path.isfile("output_3.sqlite"))
+        with Datafile("output_3.sqlite.gz") as db:
+            self.assertTrue(db.getData().equals(self.data))
+            local_filepath = db.local_filepath
+        # (the decompressed copy is removed when the file is closed)
+        self.assertFalse(os.path.isfile(local_filepath))
+
+    def testYxdb(self):
+        self.write("yxdb")
+        self.assertTrue(os.path.isfile("output_3.yxdb.gz"))
+        with Datafile("output_3.yxdb.gz") as db:
+            self.assertEqual(db.getTableNames(), ["output_3"])
+            self.assertEqual(db.getData().shape, self.data.shape)
+
+    def testInvalidCompression(self):
+        with self.assertRaises(ValueError):
+            Config(config_filename).setTempFormatAs("sqlite", compression="zip")
+
+    def tearDown(self):
+        for filename in [
+            config_filename,
+            "output_3.sqlite.gz",
+            "output_3.yxdb.gz",
+            "output_3.sqlite",
+        ]:
+            deleteFile(filename)
@@ -0,0 +1,145 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import datetime
+from unittest import TestCase
+from unittest.mock import patch
+import pandas as pd
+from ayx.Alteryx import write, enableStats, getStats
+from ayx.Compiled import pyxdb
+from ayx.Datafiles import Datafile, encodeDatetimeColumn
+from ayx.helpers import deleteFile
+
+output_filename = "output_4.yxdb"
+
+
+class TestEncodeDatetimeColumn(TestCase):
+    def setUp(self):
+        self.datetimes = pd.Series(
+            pd.to_datetime(["2020-01-02 03:04:05.9", None, "1969-12-31 23:59:59"])
+        )
+
+    def testDateTime(self):
+        self.assertEqual(
+            encodeDatetimeColumn(self.datetimes, "DateTime"),
+            ["2020-01-02 03:04:05", None, "1969-12-31 23:59:59"],
+        )
+
+    def testDate(self):
+        self.assertEqual(
+            encodeDatetimeColumn(self.datetimes, "Date"),
+            ["2020-01-02", None, "1969-12-31"],
+        )
+
+    def testTime(self):
+        self.assertEqual(
+            encodeDatetimeColumn(self.datetimes, "Time"),
+            ["03:04:05", None, "23:59:59"],
+        )
+
+    def testTimezoneAware(self):
+        aware = self.datetimes.dt.tz_localize("US/Eastern")
+        self.assertEqual(
+            encodeDatetimeColumn(aware, "DateTime"),
+            ["2020-01-02 08:04:05", None, "1970-01-01 04:59:59"],
+        )
+
+    def testTimedelta(self):
+        timedeltas = pd.Series(pd.to_timedelta(["01:02:03", None]))
+        self.assertEqual(encodeDatetimeColumn(timedeltas, "Time"), ["01:02:03", None])
+
+    def testObjects(self):
+        values = pd.Series([datetime.date(2020, 1, 2), None, "2020-01-03"])
+        self.assertEqual(
+            encodeDatetimeColumn(values, "Date"), ["2020-01-02", None, "2020-01-03"]
+        )
+
+
+class TestTimezoneAwareFormats(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {
+                "time": pd.to_datetime(
+                    ["2020-01-02 03:04:05", "2020-07-01 23:30:00"]
+                ).tz_localize("US/Eastern")
+            }
+        )
+
+    def write(self, filename, metadata):
+        with Datafile(filename, create_new=True) as db:
+            self.assertIs(db.writeData(self.data, "data", metadata=metadata), self.data)
+        with Datafile(filename) as db:
+            return pd.to_datetime(db.getData()["time"]).tolist()
+
+    def testSameUtcTimesInEveryFormat(self):
+        expected = pd.to_datetime(["2020-01-02 08:04:05", "2020-07-02 03:30:00"])
+        yxdb = self.write("aware.yxdb", {"time": {"type": "DateTime", "length": (19,)}})
+        sqlite = self.write("aware.sqlite", {"time": {"type_length": "datetime"}})
+        self.assertEqual(yxdb, expected.tolist())
+        self.assertEqual(sqlite, expected.tolist())
+
+    def tearDown(self):
+        deleteFile("aware.yxdb")
+        deleteFile("aware.sqlite")
+
+
+class TestAlteryxWriteDatetime(TestCase):
+    def setUp(self):
+        times = pd.to_datetime(["2020-01-02 03:04:05", None])
+        self.data = pd.DataFrame(
+            {
+                "naive": times,
+                "aware": times.tz_localize("UTC"),
+                "day": [datetime.date(2020, 1, 2), None],
+            }
+        )
+
+    def testWrite(self):
+        write(self.data, 4, columns={"day": {"type": "Date"}})
+        with Datafile(output_filename) as db:
+            data = db.getData()
+        self.assertEqual(data["naive"].tolist(), ["2020-01-02 03:04:05", None])
+        self.assertEqual(data["aware"].tolist(), ["2020-01-02 03:04:05", None])
+        self.assertEqual(data["day"].tolist(), ["2020-01-02", None])
+
+    def testEncodedPerBatch(self):
+        # (each batch's slice is encoded on its own -- the result is the same)
+        write(self.data, 4, columns={"day": {"type": "Date"}}, batch_size=1)
+        with Datafile(output_filename) as db:
+            data = db.getData()
+        self.assertEqual(data["aware"].tolist(), ["2020-01-02 03:04:05", None])
+        self.assertEqual(data["day"].tolist(), ["2020-01-02", None])
+
+    def testBatchesBoundPeakMemory(self):
+        times = pd.DataFrame(
+            {"time": pd.date_range("2020-01-01", periods=200000, freq="s")}
+        )
+        enableStats(True, track_memory=True)
+        getStats(reset=True)
+        try:
+            # (the records are dropped, so only their encoding is measured)
+            with patch.object(
+                pyxdb.AlteryxYXDB, "append_records", lambda self, rows: None
+            ):
+                write(times, 4, batch_size=1000)
+            memory = getStats()[-1]["memory"]["writeData"]
+        finally:
+            enableStats(False)
+            getStats(reset=True)
+        # (the whole column as strings would be many times its size)
+        self.assertLess(
+            memory["traced_peak_bytes"], times.memory_usage(index=False).sum()
+        )
+
+    def tearDown(self):
+        deleteFile(output_filename)
@@ -0,0 +1,170 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from decimal import Decimal
+from unittest import TestCase
+import numpy
+import pandas as pd
+from ayx.Alteryx import write
+from ayx.Datafiles import (
+    Datafile,
+    checkFixedDecimal,
+    encodeFixedDecimalColumn,
+    decodeFixedDecimalColumn,
+)
+from ayx.helpers import deleteFile
+
+
+class TestEncodeFixedDecimalColumn(TestCase):
+    def testFloatsAreRoundedToTheScale(self):
+        values = pd.Series([12.345678, -0.29, numpy.nan, 3.0])
+        self.assertEqual(
+            encodeFixedDecimalColumn(values, 19, 2).tolist(),
+            ["12.35", "-0.29", None, "3.00"],
+        )
+
+    def testIntsAreScaled(self):
+        values = pd.Series([1, -2, None], dtype="Int64")
+        self.assertEqual(
+            encodeFixedDecimalColumn(values, 19, 2).tolist(), ["1.00", "-2.00", None]
+        )
+
+    def testScaledInts(self):
+        values = pd.Series([1234, -5, 0])
+        self.assertEqual(
+            encodeFixedDecimalColumn(values, 19, 2, scaled=True).tolist(),
+            ["12.34", "-0.05", "0.00"],
+        )
+
+    def testDecimalsAreExact(self):
+        values = pd.Series(
+            [Decimal("12345678901234567.895"), Decimal("0.125"), "-1.5", None]
+        )
+        self.assertEqual(
+            encodeFixedDecimalColumn(values, 25, 2).tolist(),
+            ["12345678901234567.90", "0.12", "-1.50", None],
+        )
+
+    def testZeroScale(self):
+        values = pd.Series([1.5, 2.5, -7.0])
+        self.assertEqual(
+            encodeFixedDecimalColumn(values, 19, 0).tolist(), ["2", "2", "-7"]
+        )
+
+    def testTooWide(self):
+        with self.assertRaises(ValueError):
+            encodeFixedDecimalColumn(pd.Series([123456.0]), 6, 2)
+
+
+class TestDecodeFixedDecimalColumn(TestCase):
+    def setUp(self):
+        self.values = pd.Series(["12345678901234567.89", None, "-0.01", "3.5"])
+
+    def testFloat(self):
+        decoded = decodeFixedDecimalColumn(self.values, 2, "float")
+        self.assertEqual(decoded.dtype, numpy.float64)
+        self.assertTrue(decoded.isna().tolist()[1])
+
+    def testScaled(self):
+        decoded = decodeFixedDecimalColumn(self.values, 2, "scaled")
+        self.assertEqual(str(decoded.dtype), "Int64")
+        self.assertEqual(
+            decoded.tolist(),
+            [1234567890123456789, pd.NA, -1, 350],
+        )
+
+    def testScaledFromFloats(self):
+        decoded = decodeFixedDecimalColumn(pd.Series([0.29, numpy.nan]), 2, "scaled")
+        self.assertEqual(decoded.tolist(), [29, pd.NA])
+
+    def testDecimal(self):
+        decoded = decodeFixedDecimalColumn(self.values, 2, "decimal")
+        self.assertEqual(
+            decoded.tolist(),
+            [Decimal("12345678901234567.89"), None, Decimal("-0.01"), Decimal("3.50")],
+        )
+
+    def testInvalidMode(self):
+        with self.assertRaises(ValueError):
+            checkFixedDecimal("int")
+
+
+class TestFixedDecimalRoundTrip(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {"price": [Decimal("1234567.89"), None, Decimal("-0.01")]}
+        )
+
+    def write(self, filename, metadata):
+        with Datafile(filename, create_new=True) as db:
+            db.writeData(self.data, "data", metadata=metadata)
+        with Datafile(filename) as db:
+            return db.getData(fixed_decimal="decimal")
+
+    def testYxdb(self):
+        metadata = {"price": {"type": "Fixed Decimal", "length": (19, 2)}}
+        self.assertEqual(
+            self.write("fixeddecimal.yxdb", metadata)["price"].tolist(),
+            [Decimal("1234567.89"), None, Decimal("-0.01")],
+        )
+
+    def testSqlite(self):
+        metadata = {"price": {"type_length": "decimal(19,2)"}}
+        self.assertEqual(
+            self.write("fixeddecimal.sqlite", metadata)["price"].tolist(),
+            [Decimal("1234567.89"), None, Decimal("-0.01")],
+        )
+
+    def testSqliteKeepsEveryDigit(self):
+        # (more significant digits than a float holds)
+        self.data = pd.DataFrame(
+            {"price": [Decimal("1234567890123456.78"), Decimal("-9876543210987.65")]}
+        )
+        metadata = {"price": {"type_length": "decimal(19,2)"}}
+        self.assertEqual(
+            self.write("fixeddecimal.sqlite", metadata)["price"].tolist(),
+            [Decimal("1234567890123456.78"), Decimal("-9876543210987.65")],
+        )
+        with Datafile("fixeddecimal.sqlite") as db:
+            self.assertEqual(db.getMetadata()[0]["type"], "decimal(19,2)")
+            self.assertEqual(
+                db.getData(fixed_decimal="scaled")["price"].tolist(),
+                [123456789012345678, -987654321098765],
+            )
+
+    def testWriteDataReturnsTheInput(self):
+        with Datafile("fixeddecimal.sqlite", create_new=True) as db:
+            written = db.writeData(
+                self.data, "data", metadata={"price": {"type_length": "decimal(19,2)"}}
+            )
+        self.assertIs(written, self.data)
+
+    def testScaledThroughAlteryxWrite(self):
+        scaled = pd.DataFrame({"price": [123456789, -1]})
+        write(
+            scaled,
+            3,
+            columns={
+                "price": {"type": "Fixed Decimal", "length": (19, 2), "scaled": True}
+            },
+        )
+        with Datafile("output_3.yxdb") as db:
+            self.assertEqual(
+                db.getData(fixed_decimal="scaled")["price"].tolist(), [123456789, -1]
+            )
+            self.assertEqual(db.getData()["price"].tolist(), [1234567.89, -0.01])
+
+    def tearDown(self):
+        deleteFile("fixeddecimal.yxdb")
+        deleteFile("fixeddecimal.sqlite")
+        deleteFile("output_3.yxdb")
@@ -0,0 +1,117 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from unittest import TestCase
+from unittest.mock import patch
+import numpy
+import pandas as pd
+from ayx.Alteryx import write, enableStats, getStats
+from ayx.Compiled import pyxdb
+from ayx.Datafiles import Datafile, encodeColumn
+from ayx.helpers import deleteFile
+
+
+class TestEncodeColumn(TestCase):
+    def testInt(self):
+        encoded = encodeColumn(pd.Series([1.0, numpy.nan, 3.0]), "int")
+        self.assertEqual(encoded.tolist(), [1, None, 3])
+        self.assertIs(type(encoded[0]), int)
+
+    def testNullableInt(self):
+        encoded = encodeColumn(pd.Series([1, None], dtype="Int64"), "int")
+        self.assertEqual(encoded.tolist(), [1, None])
+
+    def testBool(self):
+        encoded = encodeColumn(pd.Series([True, None, False], dtype=object), "bool")
+        self.assertEqual(encoded.tolist(), [True, None, False])
+        self.assertIs(type(encoded[0]), bool)
+
+    def testFloat(self):
+        encoded = encodeColumn(pd.Series([1, 2]), "float")
+        self.assertEqual(encoded.tolist(), [1.0, 2.0])
+        self.assertIs(type(encoded[0]), float)
+
+    def testBigInts(self):
+        encoded = encodeColumn(pd.Series([2**70, None], dtype=object), "int")
+        self.assertEqual(encoded.tolist(), [2**70, None])
+
+    def testStrings(self):
+        values = pd.Series(["a", numpy.nan, None, pd.NA], dtype=object)
+        self.assertEqual(encodeColumn(values).tolist(), ["a", None, None, None])
+
+    def testDates(self):
+        values = pd.Series(pd.to_datetime(["2020-01-02", None]))
+        self.assertEqual(encodeColumn(values, "Date").tolist(), ["2020-01-02", None])
+
+
+class TestNullsRoundTrip(TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {
+                "text": ["a", numpy.nan, None],
+                "number": [1.5, numpy.nan, 3.0],
+            }
+        )
+        self.metadata = {
+            "text": {"type": "V_WString", "length": (100,)},
+            "number": {"type": "Double", "length": (8,)},
+        }
+
+    def write(self, filename, metadata=None):
+        with Datafile(filename, create_new=True) as db:
+            db.writeData(self.data, "data", metadata=metadata)
+        with Datafile(filename) as db:
+            return db.getData()
+
+    def testSameNullsInSqliteAndYxdb(self):
+        sqlite_data = self.write("nulls.sqlite")
+        yxdb_data = self.write("nulls.yxdb", self.metadata)
+        self.assertEqual(sqlite_data["text"].tolist(), ["a", None, None])
+        self.assertEqual(yxdb_data["text"].tolist(), ["a", None, None])
+        self.assertTrue(yxdb_data["number"].isna().tolist()[1])
+        self.assertTrue(sqlite_data["number"].isna().tolist()[1])
+
+    def tearDown(self):
+        deleteFile("nulls.sqlite")
+        deleteFile("nulls.yxdb")
+
+
+class TestWritePeakMemory(TestCase):
+    def setUp(self):
+        rows = 200000
+        self.data = pd.DataFrame(
+            {
+                "number": numpy.arange(rows, dtype=numpy.float64),
+                "count": numpy.arange(rows),
+                "flag": numpy.arange(rows) % 2 == 0,
+            }
+        )
+        self.data.loc[::7, "number"] = numpy.nan
+        enableStats(True, track_memory=True)
+        getStats(reset=True)
+
+    def testBatchesBoundPeakMemory(self):
+        # (the records are dropped rather than kept by the extension, so
+        # only the memory used to encode them is measured)
+        with patch.object(pyxdb.AlteryxYXDB, "append_records", lambda self, rows: None):
+            write(self.data, 5, batch_size=1000)
+        memory = getStats()[-1]["memory"]["writeData"]
+        # (the whole frame as python objects would be several times its size)
+        self.assertLess(
+            memory["traced_peak_bytes"], self.data.memory_usage(index=False).sum()
+        )
+
+    def tearDown(self):
+        enableStats(False)
+        getStats(reset=True)
+        deleteFile("output_5.yxdb")
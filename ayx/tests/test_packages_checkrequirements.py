@@ -0,0 +1,57 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os, shutil, tempfile
+from unittest import TestCase
+from ayx import Settings
+from ayx.Package import checkRequirements, getEnvironmentIndex, environmentIndexFilepath
+
+
+class TestCheckRequirements(TestCase):
+
+    def testSatisfied(self):
+        result = checkRequirements(['pandas', 'pandas>=0.1', 'IPython', 'os'])
+        self.assertTrue(all(result.values()))
+
+    def testNotSatisfied(self):
+        result = checkRequirements(['pandas<0.1', 'abcdef11', 'abcdef11>=1.0'])
+        self.assertFalse(any(result.values()))
+
+    def testMarkerNotApplicable(self):
+        result = checkRequirements('abcdef11; python_version < "3"')
+        self.assertTrue(result['abcdef11; python_version < "3"'])
+
+    def testInvalidType(self):
+        for value in [1, None, ['pandas', 2]]:
+            self.assertRaises(TypeError, checkRequirements, value)
+
+
+class TestEnvironmentIndexCache(TestCase):
+
+    def setUp(self):
+        self.cache_directory = Settings.cache_directory
+        Settings.cache_directory = tempfile.mkdtemp()
+
+    def testIndexCachedOnDisk(self):
+        index = getEnvironmentIndex(refresh=True)
+        self.assertTrue(os.path.isfile(environmentIndexFilepath()))
+        self.assertIn('pandas', index['distributions'])
+        self.assertIn('pandas', index['module_set'])
+
+    def testIndexReused(self):
+        index = getEnvironmentIndex(refresh=True)
+        self.assertIs(getEnvironmentIndex(), index)
+
+    def tearDown(self):
+        shutil.rmtree(Settings.cache_directory, ignore_errors=True)
+        Settings.cache_directory = self.cache_directory
@@ -0,0 +1,72 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import os, sys, tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from ayx.Package import installPackages
+from ayx.Utils import runSubprocess
+
+
+pip_success = {'msg': '', 'success': True, 'err': None, 'err_type': None}
+
+
+class TestInstallSkipIfSatisfied(TestCase):
+
+    @patch('ayx.Package.runSubprocess', return_value=pip_success)
+    def testSatisfiedSkipsPip(self, run_subprocess):
+        installPackages(['pandas', 'IPython>=0.1'])
+        run_subprocess.assert_not_called()
+
+    @patch('ayx.Package.runSubprocess', return_value=pip_success)
+    def testOnlyUnsatisfiedInstalled(self, run_subprocess):
+        installPackages(['pandas', 'abcdef11', 'pandas<0.1'])
+        pip_args = run_subprocess.call_args[0][0][3:]
+        self.assertEqual(pip_args, ['install', 'abcdef11', 'pandas<0.1'])
+
+    @patch('ayx.Package.runSubprocess', return_value=pip_success)
+    def testForce(self, run_subprocess):
+        installPackages('pandas', force=True)
+        run_subprocess.assert_called_once()
+
+    @patch('ayx.Package.runSubprocess', return_value=pip_success)
+    def testUpgrade(self, run_subprocess):
+        installPackages('pandas', ['install', '--upgrade'])
+        run_subprocess.assert_called_once()
+
+
+class TestInstallWheelhouse(TestCase):
+
+    @patch('ayx.Package.runSubprocess', return_value=pip_success)
+    def testWheelhouseArgs(self, run_subprocess):
+        wheelhouse = tempfile.gettempdir()
+        installPackages('abcdef11', wheelhouse=wheelhouse)
+        pip_args = run_subprocess.call_args[0][0][3:]
+        self.assertIn('--no-index', pip_args)
+        self.assertIn(os.path.abspath(wheelhouse), pip_args)
+
+    def testMissingWheelhouse(self):
+        self.assertRaises(ValueError, installPackages, 'abcdef11', wheelhouse='not_a_dir')
+
+
+class TestStreamSubprocess(TestCase):
+
+    def testStreamOutput(self):
+        result = runSubprocess([sys.executable, '-c', 'print("a"); print("b")'], stream=True)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['msg'], 'a\nb')
+
+    def testStreamFailure(self):
+        result = runSubprocess([sys.executable, '-c', 'import abcdef11'], stream=True)
+        self.assertFalse(result['success'])
+        self.assertEqual(result['err_type'], 'ModuleNotFoundError')
@@ -20,11 +20,13 @@ class TestInstalledPackageCheck(TestCase):
     def setUp(self):
         self.installed_packages = [
             'os',
+            'os.path',
             'pandas',
             'IPython'
             ]
         self.not_installed_packages = [
-            'abcdef11'
+            'abcdef11',
+            'os.abcdef11'
             ]
 
     def testInstalled(self):
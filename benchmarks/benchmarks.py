@@ -0,0 +1,249 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+### benchmarks are written in the airspeed velocity (asv) style: each class
+### has params/param_names, setup() and teardown() are called for every
+### combination of params, and methods prefixed with time_ (or peakmem_) are
+### measured. they can be run with asv, or with run_benchmarks.py (which
+### stores the results as a json baseline that later runs can compare to)
+import os, time
+from contextlib import redirect_stdout
+from ayx import Alteryx, Settings
+from ayx.DatastreamUtils import MetadataTools
+from ayx.Compression import isCodecAvailable
+from benchmarks.synthetic import BenchmarkWorkspace, makeDataFrame
+
+file_formats = ["sqlite", "yxdb"]
+row_counts = [1000, 100000, 1000000, 10000000]
+schema_widths = ["narrow", "wide"]
+data_kinds = ["numeric", "string"]
+batch_sizes = [1, 100, 10000, "auto"]
+
+
+# batch sizes only apply to the yxdb reader/writer, so skip the redundant
+# sqlite combinations (raising NotImplementedError in setup is how asv skips)
+def skipIrrelevantBatchSize(fileformat, batch_size):
+    if fileformat == "sqlite" and batch_size != batch_sizes[0]:
+        raise NotImplementedError("batch_size is not used by sqlite")
+
+
+# the ayx functions print a status line for every call -- keep the benchmark
+# output readable (the cost of printing is still included in the timing)
+def quietly(function, *args, **kwargs):
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        return function(*args, **kwargs)
+
+
+class ReadSuite:
+    params = (file_formats, row_counts, schema_widths, data_kinds, batch_sizes)
+    param_names = ["fileformat", "rows", "width", "kind", "batch_size"]
+    timeout = 3600
+
+    def setup(self, fileformat, rows, width, kind, batch_size):
+        skipIrrelevantBatchSize(fileformat, batch_size)
+        self.workspace = BenchmarkWorkspace(fileformat)
+        self.workspace.open()
+        self.workspace.addInput(
+            "#1", makeDataFrame(rows, width, kind), batch_size=batch_sizes[-1]
+        )
+
+    def teardown(self, fileformat, rows, width, kind, batch_size):
+        self.workspace.close()
+
+    def time_read(self, fileformat, rows, width, kind, batch_size):
+        quietly(Alteryx.read, "#1", batch_size=batch_size)
+
+    def peakmem_read(self, fileformat, rows, width, kind, batch_size):
+        quietly(Alteryx.read, "#1", batch_size=batch_size)
+
+
+class ReadMetadataSuite:
+    params = (file_formats, schema_widths, data_kinds)
+    param_names = ["fileformat", "width", "kind"]
+
+    def setup(self, fileformat, width, kind):
+        self.workspace = BenchmarkWorkspace(fileformat)
+        self.workspace.open()
+        self.data = makeDataFrame(1000, width, kind)
+        self.workspace.addInput("#1", self.data)
+
+    def teardown(self, fileformat, width, kind):
+        self.workspace.close()
+
+    def time_readMetadata_connection(self, fileformat, width, kind):
+        quietly(Alteryx.readMetadata, "#1")
+
+    def time_readMetadata_dataframe(self, fileformat, width, kind):
+        quietly(Alteryx.readMetadata, self.data)
+
+
+class WriteSuite:
+    params = (file_formats, row_counts, schema_widths, data_kinds, batch_sizes)
+    param_names = ["fileformat", "rows", "width", "kind", "batch_size"]
+    timeout = 3600
+
+    def setup(self, fileformat, rows, width, kind, batch_size):
+        skipIrrelevantBatchSize(fileformat, batch_size)
+        self.workspace = BenchmarkWorkspace(fileformat)
+        self.workspace.open()
+        self.data = makeDataFrame(rows, width, kind)
+
+    def teardown(self, fileformat, rows, width, kind, batch_size):
+        self.workspace.close()
+
+    def time_write(self, fileformat, rows, width, kind, batch_size):
+        quietly(Alteryx.write, self.data, 1, batch_size=batch_size)
+
+    def peakmem_write(self, fileformat, rows, width, kind, batch_size):
+        quietly(Alteryx.write, self.data, 1, batch_size=batch_size)
+
+
+class MetadataToolsSuite:
+    params = (file_formats, schema_widths, data_kinds)
+    param_names = ["fileformat", "width", "kind"]
+
+    def setup(self, fileformat, width, kind):
+        self.dtypes = [str(dtype) for dtype in makeDataFrame(10, width, kind).dtypes]
+
+    # the same pandas -> yxdb -> output format conversions made by
+    # CachedData.write for every column
+    def time_convertTypeString(self, fileformat, width, kind):
+        metadata_tools = MetadataTools()
+        for dtype in self.dtypes:
+            yxdb = metadata_tools.convertTypeString(
+                dtype, from_context="pandas", to_context="yxdb"
+            )
+            converted = metadata_tools.convertTypeString(
+                "{} {}".format(yxdb["type"], yxdb["length"]),
+                from_context="yxdb",
+                to_context=fileformat,
+            )
+            metadata_tools.supplementWithDefaultLengths(
+                converted["type"], converted["length"], context=fileformat
+            )
+
+    def time_MetadataTools_init(self, fileformat, width, kind):
+        MetadataTools()
+
+
+class WritePlotSuite:
+    params = (file_formats, [1, 16, 128])
+    param_names = ["fileformat", "figures"]
+
+    def setup(self, fileformat, figures):
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        # measure rendering, not the cache of already rendered figures
+        self.plot_cache_size = Settings.plot_cache_size
+        Settings.plot_cache_size = 0
+        self.workspace = BenchmarkWorkspace(fileformat)
+        self.workspace.open()
+        self.figures = []
+        for index in range(figures):
+            figure, axes = plt.subplots()
+            axes.plot(range(index + 100))
+            self.figures.append(figure)
+
+    def teardown(self, fileformat, figures):
+        import matplotlib.pyplot as plt
+
+        for figure in self.figures:
+            plt.close(figure)
+        self.workspace.close()
+        Settings.plot_cache_size = self.plot_cache_size
+
+    # one writePlot call per figure (each call replaces the previous output)
+    def time_writePlot(self, fileformat, figures):
+        for figure in self.figures:
+            quietly(Alteryx.writePlot, figure, 1, output_type="blob")
+
+    def time_writePlots(self, fileformat, figures):
+        quietly(Alteryx.writePlots, self.figures, 1, output_type="blob")
+
+
+# temp file compression codecs (None for uncompressed), and the bandwidths of
+# the drive the temp files are handed over on, in MB/s (None for local disk)
+compression_codecs = [None, "lz4", "zstd", "gzip"]
+link_bandwidths = [None, 1000, 100, 10]
+
+
+# compression trades cpu time for fewer bytes moved -- the crossover point is
+# the bandwidth at which the codec's time is repaid by the transfer time
+# saved. the local temp directory can't be made slower, so the transfer of
+# the temp file over a link of the given bandwidth is modelled (by sleeping
+# for size / bandwidth) and added to the measured write and read times
+class CompressionSuite:
+    params = (file_formats, [100000, 1000000], data_kinds, compression_codecs)
+    param_names = ["fileformat", "rows", "kind", "compression"]
+    timeout = 3600
+
+    def setup(self, fileformat, rows, kind, compression):
+        if compression is not None and not isCodecAvailable(compression):
+            raise NotImplementedError("{} is not installed".format(compression))
+        self.workspace = BenchmarkWorkspace(fileformat, compression=compression)
+        self.workspace.open()
+        self.data = makeDataFrame(rows, "narrow", kind)
+        self.workspace.addInput("#1", self.data)
+        self.output_filename = "output_1.{}".format(self.workspace.outputExtension())
+
+    def teardown(self, fileformat, rows, kind, compression):
+        self.workspace.close()
+
+    def transfer(self, filename, bandwidth):
+        if bandwidth is not None:
+            time.sleep(os.path.getsize(filename) / (bandwidth * 1024 * 1024))
+
+    def time_write(self, fileformat, rows, kind, compression):
+        quietly(Alteryx.write, self.data, 1)
+
+    def time_read(self, fileformat, rows, kind, compression):
+        quietly(Alteryx.read, "#1")
+
+    # bytes handed over per output -- with the times above, the crossover
+    # bandwidth is (codec seconds) / (bytes saved) for each codec
+    def track_output_bytes(self, fileformat, rows, kind, compression):
+        quietly(Alteryx.write, self.data, 1)
+        return os.path.getsize(self.output_filename)
+
+    track_output_bytes.unit = "bytes"
+
+
+class CompressionCrossoverSuite(CompressionSuite):
+    params = (file_formats, [1000000], data_kinds, compression_codecs, link_bandwidths)
+    param_names = ["fileformat", "rows", "kind", "compression", "bandwidth"]
+
+    def setup(self, fileformat, rows, kind, compression, bandwidth):
+        CompressionSuite.setup(self, fileformat, rows, kind, compression)
+        self.input_filename = self.workspace.input_connections["#1"]
+
+    def teardown(self, fileformat, rows, kind, compression, bandwidth):
+        CompressionSuite.teardown(self, fileformat, rows, kind, compression)
+
+    def time_write(self, fileformat, rows, kind, compression, bandwidth):
+        quietly(Alteryx.write, self.data, 1)
+        self.transfer(self.output_filename, bandwidth)
+
+    def time_read(self, fileformat, rows, kind, compression, bandwidth):
+        self.transfer(self.input_filename, bandwidth)
+        quietly(Alteryx.read, "#1")
+
+    def track_output_bytes(self, fileformat, rows, kind, compression, bandwidth):
+        return CompressionSuite.track_output_bytes(
+            self, fileformat, rows, kind, compression
+        )
+
+    track_output_bytes.unit = "bytes"
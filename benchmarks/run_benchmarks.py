@@ -0,0 +1,181 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+### minimal runner for the asv-style benchmarks in benchmarks.py (so that a
+### full asv install isn't needed to check for regressions). run from the
+### repo root:
+###
+###     python -m benchmarks.run_benchmarks --rows 1000 100000
+###     python -m benchmarks.run_benchmarks --compare benchmarks/results/1.0.19.json
+###
+### each run is saved as a json baseline in benchmarks/results/<label>.json
+### (the label defaults to the ayx version being benchmarked)
+import os, re, sys, json, time, platform, argparse, itertools, statistics
+from ayx.version import version
+from benchmarks import benchmarks
+
+results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# default row counts (the 1M and 10M row inputs take a long time to generate,
+# so they have to be asked for explicitly with --rows)
+default_row_counts = [1000, 100000]
+
+
+def benchmarkClasses():
+    return [
+        getattr(benchmarks, name)
+        for name in dir(benchmarks)
+        if name.endswith("Suite") and isinstance(getattr(benchmarks, name), type)
+    ]
+
+
+def benchmarkName(cls, method_name, param_values):
+    return "{}.{}({})".format(
+        cls.__name__, method_name, ", ".join(str(value) for value in param_values)
+    )
+
+
+def runBenchmarks(row_counts=None, match=None, repeat=3):
+    if row_counts is None:
+        row_counts = default_row_counts
+    results = {}
+    for cls in benchmarkClasses():
+        param_names = list(getattr(cls, "param_names", []))
+        params = [list(values) for values in getattr(cls, "params", [])]
+        if "rows" in param_names:
+            params[param_names.index("rows")] = row_counts
+        method_names = [name for name in dir(cls) if name.startswith("time_")]
+        for param_values in itertools.product(*params):
+            names = {
+                method_name: benchmarkName(cls, method_name, param_values)
+                for method_name in method_names
+            }
+            if match is not None:
+                names = {
+                    key: value
+                    for key, value in names.items()
+                    if re.search(match, value)
+                }
+            if len(names) == 0:
+                continue
+            suite = cls()
+            try:
+                if hasattr(suite, "setup"):
+                    suite.setup(*param_values)
+            except NotImplementedError:
+                continue
+            try:
+                for method_name, name in sorted(names.items()):
+                    timings = []
+                    try:
+                        for _ in range(repeat):
+                            start = time.perf_counter()
+                            getattr(suite, method_name)(*param_values)
+                            timings.append(time.perf_counter() - start)
+                    except Exception as err:
+                        results[name] = {
+                            "error": "{}: {}".format(type(err).__name__, err)
+                        }
+                        print("{:<90} failed ({})".format(name, results[name]["error"]))
+                        continue
+                    results[name] = {
+                        "min": min(timings),
+                        "median": statistics.median(timings),
+                        "repeat": repeat,
+                    }
+                    print("{:<90} {:>12.6f}s".format(name, results[name]["min"]))
+            finally:
+                if hasattr(suite, "teardown"):
+                    suite.teardown(*param_values)
+    return results
+
+
+def saveResults(results, label=None):
+    if label is None:
+        label = version
+    os.makedirs(results_dir, exist_ok=True)
+    filepath = os.path.join(results_dir, "{}.json".format(label))
+    with open(filepath, "w") as fp:
+        json.dump(
+            {
+                "version": version,
+                "label": label,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            fp,
+            indent=2,
+            sort_keys=True,
+        )
+    return filepath
+
+
+# compare the min timings of two runs -- returns the names of the benchmarks
+# that got slower by more than the threshold ratio
+def compareResults(results, baseline_filepath, threshold=1.2):
+    with open(baseline_filepath) as fp:
+        baseline = json.load(fp)
+    print(
+        "\ncomparing to baseline {} (version {}):".format(
+            baseline_filepath, baseline["version"]
+        )
+    )
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name].get("min")
+        after = results[name].get("min")
+        if before is None or after is None or before == 0:
+            continue
+        ratio = after / before
+        flag = ""
+        if ratio > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "improved"
+        print("{:<90} {:>8.2f}x {}".format(name, ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run the ayx benchmark suite")
+    parser.add_argument("--rows", type=int, nargs="+", default=None)
+    parser.add_argument("--match", default=None, help="regex to filter benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--label", default=None, help="baseline name (default: version)"
+    )
+    parser.add_argument("--compare", default=None, help="baseline json to compare to")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    results = runBenchmarks(row_counts=args.rows, match=args.match, repeat=args.repeat)
+    filepath = saveResults(results, label=args.label)
+    print("\nresults saved to {}".format(filepath))
+
+    if args.compare is not None:
+        regressions = compareResults(results, args.compare, threshold=args.threshold)
+        if len(regressions) > 0:
+            print("\n{} benchmark(s) regressed".format(len(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
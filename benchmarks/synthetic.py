@@ -0,0 +1,152 @@
+# Copyright (C) 2018 Alteryx, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+### helpers for generating synthetic input data (and the jupyterPipes.json
+### config that points to it) so that the benchmarks can exercise the same
+### code paths that are used when the workflow is run in Alteryx
+import os, json, shutil, tempfile
+from contextlib import redirect_stdout
+import numpy
+import pandas as pd
+from ayx.CachedData import CachedData
+from ayx.Compression import codec_extensions
+
+# number of columns in each schema width
+schema_widths = {"narrow": 4, "wide": 64}
+
+# words used to build string-heavy columns
+_vocabulary_size = 1000
+_word_length = 12
+
+
+def makeDataFrame(rows, width="narrow", kind="numeric", seed=0):
+    if width not in schema_widths:
+        raise ValueError(
+            "width must be one of: {}".format(", ".join(schema_widths.keys()))
+        )
+    if kind not in ("numeric", "string"):
+        raise ValueError('kind must be "numeric" or "string"')
+
+    random_state = numpy.random.RandomState(seed)
+    # build the string vocabulary once (generating random strings for every
+    # cell would make generating the 10M row inputs take longer than the
+    # benchmarks themselves)
+    letters = numpy.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocabulary = numpy.array(
+        [
+            "".join(random_state.choice(letters, _word_length))
+            for _ in range(_vocabulary_size)
+        ],
+        dtype=object,
+    )
+
+    data = {}
+    for col_i in range(schema_widths[width]):
+        colname = "field_{}".format(col_i)
+        # string-heavy data is all strings except for a single id column,
+        # numeric-heavy data rotates through int, float and bool columns
+        if kind == "string" and col_i > 0:
+            data[colname] = vocabulary[
+                random_state.randint(0, _vocabulary_size, size=rows)
+            ]
+        elif col_i % 3 == 0:
+            data[colname] = random_state.randint(-(2**31), 2**31, size=rows)
+        elif col_i % 3 == 1:
+            data[colname] = random_state.standard_normal(rows)
+        else:
+            data[colname] = random_state.randint(0, 2, size=rows).astype(bool)
+    return pd.DataFrame(data)
+
+
+# a temporary working directory containing a jupyterPipes.json config and
+# any number of cached input connections
+#
+#        with BenchmarkWorkspace("yxdb") as workspace:
+#            workspace.addInput("#1", makeDataFrame(1000))
+#            Alteryx.read("#1")
+#
+class BenchmarkWorkspace(object):
+    def __init__(self, temp_file_format="sqlite", compression=None):
+        self.temp_file_format = temp_file_format
+        self.compression = compression
+        self.directory = None
+        self.input_connections = {}
+        self.__original_directory = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def open(self):
+        self.__original_directory = os.getcwd()
+        self.directory = tempfile.mkdtemp(prefix="ayx_benchmark_")
+        os.chdir(self.directory)
+        self.writeConfig()
+
+    def close(self):
+        if self.__original_directory is not None:
+            os.chdir(self.__original_directory)
+            self.__original_directory = None
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def writeConfig(self):
+        config = {
+            "Constants": {
+                "Engine.GuiInteraction": "0",
+                "Engine.TempFilePath": self.directory,
+                "Engine.WorkflowDirectory": self.directory,
+            },
+            "input_connections": self.input_connections,
+            "temp_file_format": self.temp_file_format,
+            "temp_file_compression": self.compression,
+        }
+        with open(os.path.join(self.directory, "jupyterPipes.json"), "w") as fp:
+            json.dump(config, fp)
+
+    # write a dataframe out using the regular output code path, and then
+    # rename the output file so that it looks like a cached input connection
+    def addInput(self, connection_name, pandas_df, fileformat=None, batch_size="auto"):
+        if fileformat is None:
+            fileformat = self.temp_file_format
+        extension = self.outputExtension(fileformat)
+        filename = "input_{}.{}".format(len(self.input_connections), extension)
+
+        # the output format is read from the config, so temporarily point it
+        # at the requested format
+        temp_file_format = self.temp_file_format
+        self.temp_file_format = fileformat
+        self.writeConfig()
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                CachedData().write(pandas_df, 1, batch_size=batch_size)
+            os.replace("output_1.{}".format(extension), filename)
+        finally:
+            self.temp_file_format = temp_file_format
+
+        self.input_connections[connection_name] = filename
+        self.writeConfig()
+        return filename
+
+    # extension of the files written in a format (eg, sqlite.lz4 if compressed)
+    def outputExtension(self, fileformat=None):
+        if fileformat is None:
+            fileformat = self.temp_file_format
+        if self.compression is None:
+            return fileformat
+        return ".".join([fileformat, codec_extensions[self.compression]])